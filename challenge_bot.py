@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import asyncio
 import json
 import os
 import pathlib
@@ -10,8 +11,12 @@ from discord.ext import commands, tasks
 from dotenv import load_dotenv
 
 from constants import TZ_ET
+from provider.nba.live_fetcher import LIVE_FETCHER
 from provider.nba.nba_provider import NBAProvider, NBA_PROVIDER
+from provider.registry import REGISTRY
 from provider.topshot.challenge.challenge import Challenge
+from provider.topshot.challenge.trackers.tracker import Tracker
+from service.runtime import run_blocking
 from utils import update_channel_messages
 
 load_dotenv()
@@ -46,7 +51,7 @@ def load_challenges():
         return loaded['message'], [Challenge.build_from_dict(challenge) for challenge in loaded['challenges']]
 
 
-CHALLENGE_PROVIDER = ChallengeProvider()
+CHALLENGE_PROVIDER = REGISTRY.register('challenge', ChallengeProvider)
 CHANNEL_NAMEs = ["⚡-fc-tracker"]
 MESSAGE_CHANNELS = []
 PREVIOUS_MESSAGE_IDS = {}
@@ -65,6 +70,10 @@ async def on_ready():
                 await purge_channel(channel)
                 MESSAGE_CHANNELS.append(channel)
 
+    # providers are built concurrently after login, the tracker starts once they are loaded
+    states = await run_blocking(REGISTRY.warm_up, ['nba', 'challenge'])
+    print(f"Providers: {states}")
+
     get_current_challenge.start()
 
 
@@ -72,8 +81,19 @@ async def on_ready():
 async def get_current_challenge():
     messages = [NBAProvider.get_scoreboard_message(CHALLENGE_PROVIDER.headline)]
 
+    game_ids = []
+    playbyplay_game_ids = []
+    for challenge in CHALLENGE_PROVIDER.challenges:
+        game_ids.extend(challenge.game_ids)
+        playbyplay_game_ids.extend(challenge.get_playbyplay_game_ids())
+
+    games_stats, _ = await asyncio.gather(
+        Tracker.load_games_stats(game_ids),
+        LIVE_FETCHER.fetch_playbyplays(playbyplay_game_ids)
+    )
+
     for challenge in CHALLENGE_PROVIDER.challenges:
-        challenge_messages = challenge.get_formatted_messages()
+        challenge_messages = await run_blocking(challenge.get_formatted_messages, games_stats)
         if challenge_messages:
             messages += challenge_messages
 
@@ -89,11 +109,16 @@ async def purge_channel(channel):
         PREVIOUS_MESSAGE_IDS[channel.id] = []
 
 
+@bot.command(name="status")
+async def status(ctx):
+    await ctx.channel.send(REGISTRY.formatted_status())
+
+
 @bot.command(name="reload")
 async def reload(ctx):
     try:
-        NBA_PROVIDER.reload()
-        CHALLENGE_PROVIDER.reload()
+        await run_blocking(NBA_PROVIDER.reload)
+        await run_blocking(CHALLENGE_PROVIDER.reload)
     except Exception as err:
         await ctx.channel.send(f'Failed: ${err}.')
         return
@@ -113,6 +113,14 @@ EMPTY_PLAYER_COLLECTION = {
     "team": 0
 }
 
+# collection points of a moment by tier, and the collection column of each play type
+MOMENT_TIER_POINTS = {'Common': 2, 'Fandom': 5, 'Rare': 10, 'Legendary': 25}
+PLAY_TYPE_COLUMNS = {
+    'Dunk': 'dunk', '3 Pointer': 'three_pointer', 'Assist': 'assist', 'Steal': 'steal', 'Block': 'block_shot',
+    'Jump Shot': 'jump_shot', 'Hook Shot': 'hook_shot', 'Handles': 'handle', 'Layup': 'layup', 'Reel': 'reel',
+    'Redemption': 'dunk'
+}
+
 # Get the timezone object for New York
 TZ_ET = pytz.timezone('America/New_York')
 
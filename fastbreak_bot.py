@@ -6,10 +6,13 @@ import discord
 from discord.ext import commands, tasks
 from dotenv import load_dotenv
 
+from provider.nba.live_fetcher import LIVE_FETCHER
 from provider.nba.nba_provider import NBA_PROVIDER
+from provider.registry import REGISTRY
 from service.fastbreak.lineup import LINEUP_SERVICE
 from service.fastbreak.ranking import RANK_SERVICE
-from service.fastbreak.views import MainPage
+from service.fastbreak.views import FASTBREAK_PROVIDERS, MainPage
+from service.runtime import run_blocking
 
 # config bot
 load_dotenv()
@@ -33,8 +36,25 @@ ADMIN_CHANNEL_IDS = []
 FB_EMOJI_ID = 1193465233054908416
 
 
+async def warm_up_providers() -> bool:
+    """
+    Build the providers which are not ready yet, a provider which failed is retried once its backoff passed.
+
+    :return: whether all providers are ready
+    """
+    if REGISTRY.are_ready(FASTBREAK_PROVIDERS):
+        return True
+
+    states = await run_blocking(REGISTRY.warm_up, FASTBREAK_PROVIDERS)
+    print(f"Providers: {states}")
+    return REGISTRY.are_ready(FASTBREAK_PROVIDERS)
+
+
 @bot.event
 async def on_ready():
+    # providers are built concurrently after login, before any view can reach them from the event loop
+    await warm_up_providers()
+
     for guild in bot.guilds:
         for channel in guild.channels:
             if channel.name in ADMIN_CHANNEL_NAMES:
@@ -60,19 +80,35 @@ async def reload(context):
     if context.channel.id not in ADMIN_CHANNEL_IDS:
         return
 
-    NBA_PROVIDER.reload()
-    LINEUP_SERVICE.reload()
-    RANK_SERVICE.reload()
+    await run_blocking(NBA_PROVIDER.reload)
+    await run_blocking(LINEUP_SERVICE.reload)
+    await run_blocking(RANK_SERVICE.reload)
 
     await context.channel.send("reloaded")
 
 
+@bot.command(name='status', help="[Admin] Show the loading state of the providers")
+async def status(context):
+    if context.channel.id not in ADMIN_CHANNEL_IDS:
+        return
+
+    await context.channel.send(REGISTRY.formatted_status())
+
+
 ############
 # Routines
 ############
 @tasks.loop(minutes=2)
 async def update_stats():
-    RANK_SERVICE.update()
+    # an error raised out of a routine stops it for good, the routine skips its tick until the providers are ready
+    if not await warm_up_providers():
+        return
+
+    try:
+        await LIVE_FETCHER.fetch_boxscores(RANK_SERVICE.games)
+        await run_blocking(RANK_SERVICE.update)
+    except Exception as err:
+        print(f"Failed to update stats: {err}")
 
 
 @tasks.loop(minutes=2)
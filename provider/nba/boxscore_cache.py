@@ -0,0 +1,107 @@
+import copy
+import datetime
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from nba_api.live.nba.endpoints import boxscore
+
+LIVE_TTL_SECONDS = 20.0
+SCHEDULED_TTL_SECONDS = 60.0
+
+
+class BoxscoreCache:
+    """
+    Process-wide cache of live boxscores, shared by every caller that needs a game's boxscore.
+
+    The time to live of an entry depends on the game status:
+      - scheduled games (status 1) are kept until tip-off,
+      - live games (status 2) are kept for a few seconds,
+      - final games (status 3) never expire.
+    """
+
+    def __init__(self, live_ttl: float = LIVE_TTL_SECONDS, scheduled_ttl: float = SCHEDULED_TTL_SECONDS):
+        self.live_ttl = live_ttl
+        self.scheduled_ttl = scheduled_ttl
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+
+    def get(self, game_id: str) -> Dict[str, Any]:
+        """
+        Get the boxscore of a game, fetching it from the NBA CDN only when the cached copy expired.
+
+        The returned dictionary is a copy, callers are free to enrich it.
+
+        :param: game_id: game id
+        :return: the 'game' section of the live boxscore
+        :raise: any error raised by the nba_api client when the boxscore is not available
+        """
+        game = self.get_cached(game_id)
+        if game is None:
+            game = boxscore.BoxScore(game_id=game_id).get_dict()['game']
+            self.put(game_id, game)
+            game = copy.deepcopy(game)
+
+        return game
+
+    def get_cached(self, game_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a copy of the cached boxscore of a game without hitting the network.
+
+        :param: game_id: game id
+        :return: the 'game' section of the live boxscore, or None if it is not cached or expired
+        """
+        with self.lock:
+            entry = self.entries.get(game_id)
+
+        if entry is None or entry['expires_at'] < time.time():
+            return None
+
+        return copy.deepcopy(entry['game'])
+
+    def put(self, game_id: str, game: Dict[str, Any]) -> None:
+        """
+        Store a freshly downloaded boxscore.
+
+        :param: game_id: game id
+        :param: game: the 'game' section of the live boxscore
+        """
+        with self.lock:
+            self.entries[game_id] = {
+                'game': game,
+                'expires_at': self.__expires_at(game),
+            }
+
+    def invalidate(self, game_id: Optional[str] = None) -> None:
+        """
+        Drop one game from the cache, or all games when no game id is provided.
+
+        :param: game_id: game id
+        """
+        with self.lock:
+            if game_id is None:
+                self.entries = {}
+            else:
+                self.entries.pop(game_id, None)
+
+    def __expires_at(self, game: Dict[str, Any]) -> float:
+        now = time.time()
+        status = game.get('gameStatus')
+
+        if status == 3:
+            return float('inf')
+
+        if status == 1:
+            try:
+                tip_off = datetime.datetime.strptime(game['gameTimeUTC'], '%Y-%m-%dT%H:%M:%SZ') \
+                    .replace(tzinfo=datetime.timezone.utc).timestamp()
+            except (KeyError, TypeError, ValueError):
+                return now + self.scheduled_ttl
+
+            # the game should have started already, check again soon
+            return max(tip_off, now + self.live_ttl)
+
+        return now + self.live_ttl
+
+
+BOXSCORE_CACHE = BoxscoreCache()
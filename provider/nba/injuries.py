@@ -1,21 +1,34 @@
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+PARSER = 'html.parser'
 
 espn_url = "https://www.espn.com/nba/injuries"
 cbs_url = "https://www.cbssports.com/nba/injuries/"
+HEADERS = {"Connection": "keep-alive", "Accept": "*/*", "User-Agent": "PostmanRuntime/7.34.0"}
 
+INJURIES_TTL_SECONDS = 15 * 60
+REQUEST_TIMEOUT_SECONDS = 10
+
+# only build the injury tables, skip the rest of the page
+CBS_TABLES = SoupStrainer(class_='TableBase')
+ESPN_TABLES = SoupStrainer(class_='Table__TBODY')
 
-def load_injuries():
-    response = requests.get(cbs_url, headers={"Connection": "keep-alive", "Accept": "*/*", "User-Agent": "PostmanRuntime/7.34.0"})
-    time.sleep(1)
-    soup = BeautifulSoup(response.content)
-    # cbs teams
-    teams = soup.find_all(class_='TableBase')
+
+def parse_cbs_injuries(content: bytes) -> Dict[str, str]:
+    """
+    :param: content: html of the CBS injury page
+    :return: a dictionary of {player_name: status}
+    """
+    soup = BeautifulSoup(content, PARSER, parse_only=CBS_TABLES)
 
     result = {}
-    for team in teams:
+    for team in soup.find_all(class_='TableBase'):
         for player in team.contents[1].contents[0].contents[0].contents[2].contents:
             player_name = player.contents[0].contents[1].contents[0].contents[0].contents[0]
             status = player.contents[4].contents[0].strip()
@@ -25,19 +38,171 @@ def load_injuries():
                 status = f"OUT season"
             result[player_name] = status
 
-    response = requests.get(espn_url, headers={"Connection": "keep-alive", "Accept": "*/*", "User-Agent": "PostmanRuntime/7.34.0"})
-    soup = BeautifulSoup(response.content)
-    # espn teams
-    records = soup.find_all(class_='Table__TBODY')
-    for team in records:
+    return result
+
+
+def parse_espn_injuries(content: bytes) -> Dict[str, str]:
+    """
+    :param: content: html of the ESPN injury page
+    :return: a dictionary of {player_name: status}
+    """
+    soup = BeautifulSoup(content, PARSER, parse_only=ESPN_TABLES)
+
+    result = {}
+    for team in soup.find_all(class_='Table__TBODY'):
         for player in team.contents:
             player_name = player.contents[0].contents[0].contents[0]
             if player_name not in result:
-                status = player.contents[3].contents[0].contents[0]
-                result[player_name] = status
+                result[player_name] = player.contents[3].contents[0].contents[0]
 
     return result
 
 
+def merge_injuries(cbs: Dict[str, str], espn: Dict[str, str]) -> Dict[str, str]:
+    """
+    CBS statuses win, ESPN only fills the players missing from CBS.
+    """
+    result = dict(cbs)
+    for player_name, status in espn.items():
+        if player_name not in result:
+            result[player_name] = status
+
+    return result
+
+
+class InjurySource:
+    """
+    One injury page, downloaded with conditional requests: an unchanged page is not parsed again.
+    """
+
+    def __init__(self, name, url, parse):
+        self.name = name
+        self.url = url
+        self.parse = parse
+        self.etag = None
+        self.last_modified = None
+        self.injuries: Dict[str, str] = {}
+
+    def fetch(self, session: requests.Session) -> Dict[str, str]:
+        """
+        :return: the latest injuries of the page, the previous ones if the page did not change or is not available
+        """
+        headers = dict(HEADERS)
+        if self.etag is not None:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified is not None:
+            headers['If-Modified-Since'] = self.last_modified
+
+        try:
+            response = session.get(self.url, headers=headers, timeout=REQUEST_TIMEOUT_SECONDS)
+        except requests.RequestException as err:
+            print(f"Failed to download {self.name} injuries: {err}")
+            return self.injuries
+
+        if response.status_code == 304:
+            return self.injuries
+        if response.status_code != 200:
+            print(f"Failed to download {self.name} injuries: status {response.status_code}")
+            return self.injuries
+
+        try:
+            injuries = self.parse(response.content)
+        except (AttributeError, IndexError) as err:
+            print(f"Failed to parse {self.name} injuries: {err}")
+            return self.injuries
+
+        self.etag = response.headers.get('ETag')
+        self.last_modified = response.headers.get('Last-Modified')
+        self.injuries = injuries
+        return injuries
+
+
+class InjuryReport:
+    """
+    Injury statuses of all players, merged from CBS and ESPN.
+
+    Both pages are downloaded in parallel. Readers always get the last merged report without waiting for the network,
+    a background thread refreshes it every `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float = INJURIES_TTL_SECONDS):
+        self.ttl = ttl
+        self.sources = [
+            InjurySource('CBS', cbs_url, parse_cbs_injuries),
+            InjurySource('ESPN', espn_url, parse_espn_injuries),
+        ]
+        self.session = requests.Session()
+        self.injuries: Dict[str, str] = {}
+        self.loaded_at = 0.0
+        self.lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+        self.stopped = threading.Event()
+
+    def refresh(self) -> Dict[str, str]:
+        """
+        Download both pages now and publish the merged report.
+
+        :return: a dictionary of {player_name: status}
+        """
+        with self.lock:
+            with ThreadPoolExecutor(max_workers=len(self.sources)) as executor:
+                cbs, espn = executor.map(lambda source: source.fetch(self.session), self.sources)
+
+            self.injuries = merge_injuries(cbs, espn)
+            self.loaded_at = time.time()
+            return self.injuries
+
+    def get(self) -> Dict[str, str]:
+        """
+        :return: the last merged report, never blocks on the network
+        """
+        return self.injuries
+
+    def is_expired(self) -> bool:
+        return self.loaded_at + self.ttl < time.time()
+
+    def start(self) -> None:
+        """
+        Start the background refresh, does nothing if it is already running.
+        """
+        if self.thread is not None and self.thread.is_alive():
+            return
+
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.__run, name="vgn-injuries", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+
+    def __run(self):
+        while not self.stopped.is_set():
+            if self.is_expired():
+                try:
+                    self.refresh()
+                except Exception as err:
+                    print(f"Failed to refresh injuries: {err}")
+            self.stopped.wait(min(self.ttl, 60))
+
+
+INJURY_REPORT = InjuryReport()
+
+
+def load_injuries():
+    return INJURY_REPORT.refresh()
+
+
 if __name__ == '__main__':
-    print(load_injuries())
+    import sys
+
+    # offline: python -m provider.nba.injuries <cbs.html> <espn.html>
+    if len(sys.argv) == 3:
+        with open(sys.argv[1], 'rb') as cbs_file, open(sys.argv[2], 'rb') as espn_file:
+            cbs_content, espn_content = cbs_file.read(), espn_file.read()
+
+        start = time.time()
+        report = merge_injuries(parse_cbs_injuries(cbs_content), parse_espn_injuries(espn_content))
+        print(f"parsed {len(report)} injuries in {(time.time() - start) * 1000:.1f}ms")
+        print(report)
+    else:
+        print(load_injuries())
@@ -0,0 +1,116 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+from provider.nba.boxscore_cache import BOXSCORE_CACHE
+from provider.nba.playbyplay_cache import PLAYBYPLAY_CACHE
+
+BOXSCORE_URL = "https://cdn.nba.com/static/json/liveData/boxscore/boxscore_{}.json"
+PLAYBYPLAY_URL = "https://cdn.nba.com/static/json/liveData/playbyplay/playbyplay_{}.json"
+HEADERS = {
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "Origin": "https://www.nba.com",
+    "Referer": "https://www.nba.com/",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/120.0.0.0 Safari/537.36",
+}
+
+
+class LiveFetcher:
+    """
+    Download the live boxscores and play-by-play feeds of many games in parallel.
+
+    All requests go through one pooled aiohttp session and at most `concurrency` of them are in flight at a time.
+    Downloaded feeds are stored in the shared BOXSCORE_CACHE and PLAYBYPLAY_CACHE, so synchronous callers of the
+    same cycle read them without touching the network again.
+    """
+
+    def __init__(self, concurrency: int = 8, timeout: float = 10.0):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self.session is None or self.session.closed or self.loop is not loop:
+            self.loop = loop
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+            self.session = aiohttp.ClientSession(
+                headers=HEADERS,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+            )
+
+        return self.session
+
+    async def __fetch_json(self, url: str) -> Optional[Dict[str, Any]]:
+        session = self.__get_session()
+        async with self.semaphore:
+            try:
+                async with session.get(url) as response:
+                    if response.status != 200:
+                        return None
+                    return await response.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                print(f"Failed to fetch {url}: {err}")
+                return None
+
+    async def __fetch_boxscore(self, game_id: str) -> Optional[Dict[str, Any]]:
+        game = BOXSCORE_CACHE.get_cached(game_id)
+        if game is not None:
+            return game
+
+        loaded = await self.__fetch_json(BOXSCORE_URL.format(game_id))
+        if loaded is None or 'game' not in loaded:
+            return None
+
+        BOXSCORE_CACHE.put(game_id, loaded['game'])
+        return BOXSCORE_CACHE.get_cached(game_id)
+
+    async def __fetch_playbyplay(self, game_id: str) -> Optional[List[Dict[str, Any]]]:
+        actions = PLAYBYPLAY_CACHE.get_cached(game_id)
+        if actions is not None:
+            return actions
+
+        loaded = await self.__fetch_json(PLAYBYPLAY_URL.format(game_id))
+        if loaded is None or 'game' not in loaded:
+            return None
+
+        PLAYBYPLAY_CACHE.put(game_id, loaded['game']['actions'])
+        return loaded['game']['actions']
+
+    async def fetch_boxscores(self, game_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Download the boxscores of all games concurrently.
+
+        :param: game_ids: list of game ids
+        :return: a dictionary of {game_id: boxscore 'game' section or None if unavailable}
+        """
+        game_ids = list(dict.fromkeys(game_ids))
+        games = await asyncio.gather(*[self.__fetch_boxscore(game_id) for game_id in game_ids])
+        return dict(zip(game_ids, games))
+
+    async def fetch_playbyplays(self, game_ids: List[str]) -> Dict[str, Optional[List[Dict[str, Any]]]]:
+        """
+        Download the play-by-play actions of all games concurrently.
+
+        :param: game_ids: list of game ids
+        :return: a dictionary of {game_id: list of actions or None if unavailable}
+        """
+        game_ids = list(dict.fromkeys(game_ids))
+        actions = await asyncio.gather(*[self.__fetch_playbyplay(game_id) for game_id in game_ids])
+        return dict(zip(game_ids, actions))
+
+    async def close(self) -> None:
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+
+LIVE_FETCHER = LiveFetcher()
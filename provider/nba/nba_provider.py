@@ -1,13 +1,13 @@
 import datetime
-import json
-import os.path
-import pathlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
-from nba_api.live.nba.endpoints import scoreboard, boxscore
-
-from provider.nba.injuries import load_injuries
-from provider.nba.schedule import download_schedule
+from provider.nba.boxscore_cache import BOXSCORE_CACHE
+from provider.nba.injuries import INJURY_REPORT
+from provider.nba.schedule import download_schedule, load_stored_schedule
+from provider.nba.scoreboard_cache import SCOREBOARD_CACHE
+from provider.registry import REGISTRY
 from repository.vgn_players import get_all_team_players
 from utils import parse_dash_date, to_slash_date, parse_slash_date
 
@@ -28,38 +28,34 @@ class NBAProvider:
         self.game_schedule = {}
         self.game_dates = {}
         self.game_teams = {}
+        self.team_games = {}
+        self.schedule_validators = None
         self.team_players = {}
         self.players = []
         self.latest_date = ""
         self.coming_date = ""
-        self.injuries = {}
+        # the admin command and the ranking refresh may reload at the same time
+        self.lock = threading.RLock()
 
         self.reload()
 
-    def __load_schedule(self):
-        with open(os.path.join(pathlib.Path(__file__).parent.resolve(), 'data/game_dates.json'), 'r') as f:
-            new_schedule = json.load(f)
+    def __load_schedule(self, indexes):
+        new_schedule = indexes['date_games']
 
         self.game_schedule.update(new_schedule)
         self.game_dates.update({game_id: date for date, games in new_schedule.items() for game_id in games})
-        self.game_teams.update({game_id: games[game_id] for date, games in new_schedule.items() for game_id in games})
+        self.game_teams.update(indexes['game_teams'])
+        self.team_games = indexes['team_games']
         self.latest_date = list(new_schedule.keys())[-1]
-        self.set_coming_game_date()
-
-    def __load_all_players(self):
-        self.team_players, self.players = get_all_team_players(True)
-
-    def __load_injuries(self):
-        self.injuries = load_injuries()
 
     @staticmethod
     def get_scoreboard():
         """
-        Get latest scoreboard.
+        Get latest scoreboard, concurrent and repeated calls within a few seconds share one download.
 
         :return: scoreboard in dictionary
         """
-        return scoreboard.ScoreBoard().get_dict()['scoreboard']
+        return SCOREBOARD_CACHE.get()
 
     def get_games_on_date(self, date):
         """
@@ -110,7 +106,7 @@ class NBAProvider:
 
         for game_id in games_teams:
             try:
-                game_stats = boxscore.BoxScore(game_id=game_id).get_dict()['game']
+                game_stats = BOXSCORE_CACHE.get(game_id)
             except Exception:
                 continue
 
@@ -128,6 +124,15 @@ class NBAProvider:
 
         return result
 
+    def get_games_for_team(self, team):
+        """
+        Get all game ids of a team in the season.
+
+        :param: team: team tri code
+        :return: list of game ids
+        """
+        return self.team_games.get(team, [])
+
     def get_players_for_team(self, team):
         return self.team_players[team]
 
@@ -135,7 +140,7 @@ class NBAProvider:
         return self.players
 
     def get_player_injury(self, player_name):
-        injury = self.injuries.get(player_name)
+        injury = INJURY_REPORT.get().get(player_name)
         if injury is None:
             return None
 
@@ -178,10 +183,30 @@ class NBAProvider:
             self.coming_date = "N/A"
 
     def reload(self):
-        download_schedule()
-        self.__load_schedule()
-        self.__load_all_players()
-        self.__load_injuries()
+        with self.lock:
+            self.__reload()
+
+    def __reload(self):
+        # the schedule, the players and the injuries come from independent sources, load them in parallel
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            # only ask for the changes once a schedule is loaded
+            schedule = executor.submit(download_schedule, self.schedule_validators if self.game_schedule else None)
+            players = executor.submit(get_all_team_players, True)
+            # the injury report refreshes itself in the background, only wait for it when it is stale
+            injuries = executor.submit(INJURY_REPORT.refresh) if INJURY_REPORT.is_expired() else None
+
+            indexes, self.schedule_validators = schedule.result()
+            if indexes is not None:
+                self.__load_schedule(indexes)
+            elif not self.game_schedule:
+                self.__load_schedule(load_stored_schedule())
+            self.set_coming_game_date()
+
+            self.team_players, self.players = players.result()
+            if injuries is not None:
+                injuries.result()
+
+        INJURY_REPORT.start()
 
     @staticmethod
     def get_scoreboard_message(headline):
@@ -207,7 +232,7 @@ class NBAProvider:
         return message
 
 
-NBA_PROVIDER = NBAProvider()
+NBA_PROVIDER = REGISTRY.register('nba', NBAProvider)
 
 
 if __name__ == '__main__':
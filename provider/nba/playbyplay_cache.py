@@ -0,0 +1,206 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from nba_api.live.nba.endpoints import PlayByPlay
+
+from provider.nba.boxscore_cache import LIVE_TTL_SECONDS
+
+
+# indexed action kinds: any made shot (free throws included) and made three-pointers
+MADE_SHOT = "PTS"
+MADE_THREE = "3PM"
+
+
+def action_kinds(action: Dict[str, Any]) -> List[str]:
+    if action.get('shotResult', '') != 'Made':
+        return []
+    if action['actionType'] == '3pt':
+        return [MADE_SHOT, MADE_THREE]
+    return [MADE_SHOT]
+
+
+def action_order(action: Dict[str, Any]) -> int:
+    return action.get('orderNumber', action['actionNumber'])
+
+
+class ActionIndex:
+    """
+    Running index of the first and last made shot and three-pointer of a game, of each team and of each player.
+
+    Actions are consumed incrementally: an action number already seen with the same contents is skipped, so refreshing
+    a game only costs the new actions. When an action seen before was corrected or removed from the feed, the bounds
+    can not be moved back incrementally and the index is rebuilt from the current actions. Actions are ordered by their
+    order number, action numbers are not always increasing.
+    """
+
+    def __init__(self):
+        self.__reset()
+
+    def __reset(self):
+        # {action number: action}
+        self.actions: Dict[int, Dict[str, Any]] = {}
+        self.count = 0
+        # {kind: [first action, last action]}
+        self.game: Dict[str, List[Dict[str, Any]]] = {}
+        # {tricode: {kind: [first action, last action]}}
+        self.teams: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        # {person id: {kind: [first action, last action]}}
+        self.players: Dict[int, Dict[str, List[Dict[str, Any]]]] = {}
+
+    def consume(self, actions: List[Dict[str, Any]]) -> int:
+        """
+        :param: actions: all actions of the game, as downloaded
+        :return: the number of new actions
+        """
+        kept = set()
+        new_actions = set()
+        rebuild = False
+        for action in actions:
+            previous = self.actions.get(action['actionNumber'])
+            if previous is None:
+                new_actions.add(action['actionNumber'])
+            elif previous is not action and previous != action:
+                rebuild = True
+            else:
+                kept.add(action['actionNumber'])
+
+        if rebuild or len(kept) < len(self.actions):
+            self.__reset()
+
+        for action in actions:
+            if action['actionNumber'] in self.actions:
+                continue
+
+            self.actions[action['actionNumber']] = action
+            for kind in action_kinds(action):
+                self.__index(self.game, kind, action)
+                self.__index(self.teams.setdefault(action.get('teamTricode'), {}), kind, action)
+                self.__index(self.players.setdefault(action.get('personId'), {}), kind, action)
+
+        self.count = len(self.actions)
+        return len(new_actions)
+
+    def first(self, kind: str, players: Optional[Set[int]] = None) -> Optional[Dict[str, Any]]:
+        """
+        :param: kind: MADE_SHOT or MADE_THREE
+        :param: players: only consider the actions of these players, all players when empty
+        :return: the first action of the kind, None if there is none
+        """
+        return self.__pick(kind, players, 0, min)
+
+    def last(self, kind: str, players: Optional[Set[int]] = None) -> Optional[Dict[str, Any]]:
+        """
+        :param: kind: MADE_SHOT or MADE_THREE
+        :param: players: only consider the actions of these players, all players when empty
+        :return: the last action of the kind, None if there is none
+        """
+        return self.__pick(kind, players, 1, max)
+
+    def first_of_team(self, kind: str, team: str) -> Optional[Dict[str, Any]]:
+        bounds = self.teams.get(team, {}).get(kind)
+        return None if bounds is None else bounds[0]
+
+    def last_of_team(self, kind: str, team: str) -> Optional[Dict[str, Any]]:
+        bounds = self.teams.get(team, {}).get(kind)
+        return None if bounds is None else bounds[1]
+
+    def __pick(self, kind, players, side, choose):
+        if not players:
+            bounds = self.game.get(kind)
+            return None if bounds is None else bounds[side]
+
+        candidates = [self.players[p][kind][side] for p in players if kind in self.players.get(p, {})]
+        if len(candidates) == 0:
+            return None
+
+        return choose(candidates, key=action_order)
+
+    @staticmethod
+    def __index(bounds: Dict[str, List[Dict[str, Any]]], kind: str, action: Dict[str, Any]) -> None:
+        if kind not in bounds:
+            bounds[kind] = [action, action]
+            return
+
+        if action_order(action) < action_order(bounds[kind][0]):
+            bounds[kind][0] = action
+        if action_order(action) > action_order(bounds[kind][1]):
+            bounds[kind][1] = action
+
+
+class PlayByPlayCache:
+    """
+    Process-wide cache of live play-by-play actions.
+
+    Entries of live games expire after a few seconds, entries of ended games never expire. Each game also keeps an
+    ActionIndex fed with the new actions of every download.
+    """
+
+    def __init__(self, live_ttl: float = LIVE_TTL_SECONDS):
+        self.live_ttl = live_ttl
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.indexes: Dict[str, ActionIndex] = {}
+        self.lock = threading.Lock()
+
+    def get(self, game_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the play-by-play actions of a game, fetching them only when the cached copy expired.
+
+        The returned list is shared, callers must not modify it.
+
+        :param: game_id: game id
+        :return: list of actions
+        :raise: any error raised by the nba_api client when the play-by-play is not available
+        """
+        actions = self.get_cached(game_id)
+        if actions is None:
+            actions = PlayByPlay(game_id).get_dict()['game']['actions']
+            self.put(game_id, actions)
+
+        return actions
+
+    def get_index(self, game_id: str) -> ActionIndex:
+        """
+        Get the action index of a game, refreshing the actions first when the cached copy expired.
+
+        :param: game_id: game id
+        :return: the action index of the game
+        :raise: any error raised by the nba_api client when the play-by-play is not available
+        """
+        self.get(game_id)
+        with self.lock:
+            return self.indexes[game_id]
+
+    def get_cached(self, game_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the cached play-by-play actions of a game without hitting the network.
+
+        :param: game_id: game id
+        :return: list of actions, or None if they are not cached or expired
+        """
+        with self.lock:
+            entry = self.entries.get(game_id)
+
+        if entry is None or entry['expires_at'] < time.time():
+            return None
+
+        return entry['actions']
+
+    def put(self, game_id: str, actions: List[Dict[str, Any]]) -> None:
+        """
+        Store freshly downloaded play-by-play actions.
+
+        :param: game_id: game id
+        :param: actions: list of actions
+        """
+        ended = len(actions) > 0 and actions[-1]['actionType'] == 'game' and actions[-1]['subType'] == 'end'
+
+        with self.lock:
+            self.entries[game_id] = {
+                'actions': actions,
+                'expires_at': float('inf') if ended else time.time() + self.live_ttl,
+            }
+            self.indexes.setdefault(game_id, ActionIndex()).consume(actions)
+
+
+PLAYBYPLAY_CACHE = PlayByPlayCache()
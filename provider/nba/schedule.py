@@ -4,44 +4,110 @@ import pathlib
 
 import requests
 
+SCHEDULE_URL = 'https://cdn.nba.com/static/json/staticData/scheduleLeagueV2.json'
 
-def download_schedule():
-    url = 'https://cdn.nba.com/static/json/staticData/scheduleLeagueV2.json'
-    response = requests.get(url)
 
-    if response.status_code == 200:
-        data = response.json()
-        with open(os.path.join(pathlib.Path(__file__).parent.resolve(), "resource/scheduleLeagueV2.json"), 'w') as file:
-            json.dump(data, file)
+def download_schedule(validators=None):
+    """
+    Download the league schedule, conditionally when validators of a previous download are provided.
 
-        store_dates_games_teams(data)
-    else:
+    :param: validators: {'etag', 'last_modified'} returned by a previous download, or None for a full download
+    :return: (schedule indexes or None when the schedule did not change or the request failed, new validators)
+    """
+    validators = validators or {}
+    headers = {}
+    if validators.get('etag') is not None:
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified') is not None:
+        headers['If-Modified-Since'] = validators['last_modified']
+
+    try:
+        response = requests.get(SCHEDULE_URL, headers=headers, timeout=30)
+    except requests.RequestException as err:
+        print(f'Request failed: {err}')
+        return None, validators
+
+    if response.status_code == 304:
+        return None, validators
+
+    if response.status_code != 200:
         print(f'Request failed with status code {response.status_code}')
+        return None, validators
+
+    indexes = build_schedule_indexes(response.json())
+    store_dates_games_teams(indexes)
+
+    return indexes, {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+    }
 
 
-def store_dates_games_teams(schedule_json):
+def build_schedule_indexes(schedule_json):
+    """
+    Build the in-memory schedule indexes from the league schedule.
+
+    :param: schedule_json: the downloaded scheduleLeagueV2 document
+    :return: a dictionary of
+        'date_games': {date: {game_id: {homeTeam, awayTeam}}},
+        'game_teams': {game_id: {homeTeam, awayTeam}},
+        'team_games': {team: [game_id]}
+    """
     games_dates = {}
     games_teams = {}
+    teams_games = {}
 
     for gamesOnDate in schedule_json['leagueSchedule']['gameDates']:
         date = gamesOnDate['gameDate'][:10]
         games_dates[date] = {}
 
         for game in gamesOnDate['games']:
-            games_dates[date][game['gameId']] = {
-                'homeTeam': game['homeTeam']['teamTricode'],
-                'awayTeam': game['awayTeam']['teamTricode']
-            }
-            games_teams[game['gameId']] = {
+            teams = {
                 'homeTeam': game['homeTeam']['teamTricode'],
                 'awayTeam': game['awayTeam']['teamTricode']
             }
+            games_dates[date][game['gameId']] = teams
+            games_teams[game['gameId']] = teams
+            for team in teams.values():
+                teams_games.setdefault(team, []).append(game['gameId'])
+
+    return {
+        'date_games': games_dates,
+        'game_teams': games_teams,
+        'team_games': teams_games,
+    }
+
+
+def load_stored_schedule():
+    """
+    Load the schedule indexes from the last stored download, used when the schedule can't be downloaded.
+
+    :return: the schedule indexes, see build_schedule_indexes
+    """
+    with open(os.path.join(pathlib.Path(__file__).parent.resolve(), 'data/game_dates.json'), 'r') as f:
+        games_dates = json.load(f)
+
+    games_teams = {}
+    teams_games = {}
+    for date, games in games_dates.items():
+        for game_id, teams in games.items():
+            games_teams[game_id] = teams
+            for team in teams.values():
+                teams_games.setdefault(team, []).append(game_id)
+
+    return {
+        'date_games': games_dates,
+        'game_teams': games_teams,
+        'team_games': teams_games,
+    }
+
 
+def store_dates_games_teams(indexes):
     with open(os.path.join(pathlib.Path(__file__).parent.resolve(), 'data/game_dates.json'), 'w') as output_file:
-        json.dump(games_dates, output_file, indent=2)
+        json.dump(indexes['date_games'], output_file, indent=2)
 
     with open(os.path.join(pathlib.Path(__file__).parent.resolve(), 'data/game_teams.json'), 'w') as output_file:
-        json.dump(games_teams, output_file, indent=2)
+        json.dump(indexes['game_teams'], output_file, indent=2)
 
 
 if __name__ == '__main__':
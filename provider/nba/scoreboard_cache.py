@@ -0,0 +1,104 @@
+import copy
+import datetime
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from nba_api.live.nba.endpoints import scoreboard
+
+from provider.nba.boxscore_cache import LIVE_TTL_SECONDS
+
+IDLE_TTL_SECONDS = 120.0
+
+
+class ScoreboardCache:
+    """
+    Process-wide cache of today's live scoreboard with single-flight loading.
+
+    Concurrent callers finding the cache expired share one request: the first one downloads the scoreboard, the
+    others wait for its result. The time to live depends on the games:
+      - while any game is live, the scoreboard is kept for a few seconds,
+      - before the first tip-off, it is kept until the tip-off (at most IDLE_TTL_SECONDS),
+      - with no game or all games final, it is kept for IDLE_TTL_SECONDS.
+    """
+
+    def __init__(self, live_ttl: float = LIVE_TTL_SECONDS, idle_ttl: float = IDLE_TTL_SECONDS):
+        self.live_ttl = live_ttl
+        self.idle_ttl = idle_ttl
+        self.scoreboard: Optional[Dict[str, Any]] = None
+        self.expires_at = 0.0
+        self.lock = threading.Lock()
+        self.in_flight: Optional[threading.Event] = None
+        self.error: Optional[Exception] = None
+
+    def get(self) -> Dict[str, Any]:
+        """
+        Get the latest scoreboard, downloading it only when the cached copy expired.
+
+        The returned dictionary is a copy, callers are free to modify it.
+
+        :return: the 'scoreboard' section of the live scoreboard
+        :raise: any error raised by the nba_api client when the scoreboard is not available
+        """
+        with self.lock:
+            if self.scoreboard is not None and self.expires_at >= time.time():
+                return copy.deepcopy(self.scoreboard)
+
+            in_flight = self.in_flight
+            leader = in_flight is None
+            if leader:
+                in_flight = threading.Event()
+                self.in_flight = in_flight
+
+        if not leader:
+            in_flight.wait()
+            with self.lock:
+                if self.error is not None:
+                    raise self.error
+                return copy.deepcopy(self.scoreboard)
+
+        try:
+            loaded = scoreboard.ScoreBoard().get_dict()['scoreboard']
+        except Exception as err:
+            with self.lock:
+                self.error = err
+                self.in_flight = None
+            in_flight.set()
+            raise
+
+        with self.lock:
+            self.scoreboard = loaded
+            self.expires_at = self.__expires_at(loaded)
+            self.error = None
+            self.in_flight = None
+        in_flight.set()
+
+        return copy.deepcopy(loaded)
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self.expires_at = 0.0
+
+    def __expires_at(self, loaded: Dict[str, Any]) -> float:
+        now = time.time()
+        games = loaded.get('games', [])
+
+        if any(game['gameStatus'] == 2 for game in games):
+            return now + self.live_ttl
+
+        scheduled = [game for game in games if game['gameStatus'] == 1]
+        if len(scheduled) == 0:
+            return now + self.idle_ttl
+
+        tip_offs = []
+        for game in scheduled:
+            try:
+                tip_offs.append(datetime.datetime.strptime(game['gameTimeUTC'], '%Y-%m-%dT%H:%M:%SZ')
+                                .replace(tzinfo=datetime.timezone.utc).timestamp())
+            except (KeyError, TypeError, ValueError):
+                return now + self.live_ttl
+
+        return min(max(min(tip_offs), now + self.live_ttl), now + self.idle_ttl)
+
+
+SCOREBOARD_CACHE = ScoreboardCache()
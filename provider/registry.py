@@ -0,0 +1,152 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+PENDING = "PENDING"
+LOADING = "LOADING"
+READY = "READY"
+FAILED = "FAILED"
+
+# a provider which failed to build is not built again before this delay, callers get the last error meanwhile
+RETRY_SECONDS = 60.0
+
+
+class ProviderEntry:
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self.factory = factory
+        self.instance = None
+        self.state = PENDING
+        self.error: Optional[Exception] = None
+        self.load_seconds = 0.0
+        self.failed_at = 0.0
+        self.lock = threading.Lock()
+
+
+class ProviderRegistry:
+    """
+    Registry of the module-level provider singletons.
+
+    A provider is built on first use instead of at import time, so importing a module never does network or
+    database I/O. Each provider has its own lock: concurrent first uses wait for one build, and independent providers
+    can be warmed up in parallel. A provider which failed to build is retried on its next use once RETRY_SECONDS
+    passed, earlier uses raise the last error without building.
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, ProviderEntry] = {}
+
+    def register(self, name: str, factory: Callable[[], Any]) -> 'LazyProvider':
+        """
+        Register a provider factory.
+
+        :param: name: unique provider name
+        :param: factory: callable building the provider
+        :return: a proxy forwarding attribute access to the provider, building it on first use
+        """
+        self.entries[name] = ProviderEntry(name, factory)
+        return LazyProvider(self, name)
+
+    def get(self, name: str) -> Any:
+        """
+        Get a provider, building it if it is not built yet.
+
+        :param: name: provider name
+        :return: the provider instance
+        :raise: the factory error if the provider failed to build
+        """
+        entry = self.entries[name]
+        if entry.state == READY:
+            return entry.instance
+
+        with entry.lock:
+            if entry.state == READY:
+                return entry.instance
+            if entry.state == FAILED and time.time() - entry.failed_at < RETRY_SECONDS:
+                raise entry.error
+
+            entry.state = LOADING
+            start = time.time()
+            try:
+                entry.instance = entry.factory()
+            except Exception as err:
+                entry.state = FAILED
+                entry.error = err
+                entry.failed_at = time.time()
+                raise
+            finally:
+                entry.load_seconds = time.time() - start
+
+            entry.error = None
+            entry.state = READY
+            return entry.instance
+
+    def warm_up(self, names: Optional[List[str]] = None) -> Dict[str, str]:
+        """
+        Build providers concurrently, a provider depending on another one waits for it on first use.
+
+        :param: names: provider names, all registered providers by default
+        :return: a dictionary of {name: state}
+        """
+        if names is None:
+            names = list(self.entries.keys())
+        if len(names) == 0:
+            return {}
+
+        def build(name):
+            try:
+                self.get(name)
+            except Exception as err:
+                print(f"Failed to load provider {name}: {err}")
+
+        with ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="vgn-warm-up") as executor:
+            list(executor.map(build, names))
+
+        return {name: self.entries[name].state for name in names}
+
+    def is_ready(self, name: str) -> bool:
+        return self.entries[name].state == READY
+
+    def are_ready(self, names: List[str]) -> bool:
+        """
+        Check providers without building them, interaction handlers use it to answer instead of blocking on a build.
+        """
+        return all(self.is_ready(name) for name in names)
+
+    def status(self) -> Dict[str, str]:
+        return {name: entry.state for name, entry in self.entries.items()}
+
+    def formatted_status(self) -> str:
+        message = "**Providers**\n"
+        for name, entry in self.entries.items():
+            message += f"{name}: **{entry.state}**"
+            if entry.state == READY or entry.state == FAILED:
+                message += f" ({entry.load_seconds:.1f}s)"
+            if entry.error is not None:
+                message += f" {entry.error}"
+            message += "\n"
+
+        return message
+
+
+class LazyProvider:
+    """
+    Stand-in for a module-level provider singleton, every attribute access is forwarded to the real provider.
+    """
+
+    def __init__(self, registry: ProviderRegistry, name: str):
+        object.__setattr__(self, '_registry', registry)
+        object.__setattr__(self, '_name', name)
+
+    def __getattr__(self, item):
+        return getattr(self._registry.get(self._name), item)
+
+    def __setattr__(self, key, value):
+        setattr(self._registry.get(self._name), key, value)
+
+    def __repr__(self):
+        return f"<LazyProvider {self._name} {self._registry.entries[self._name].state}>"
+
+
+REGISTRY = ProviderRegistry()
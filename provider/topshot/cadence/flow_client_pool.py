@@ -0,0 +1,105 @@
+import asyncio
+import itertools
+from typing import List, Optional, Tuple
+
+from flow_py_sdk import flow_client, Script
+from flow_py_sdk.cadence import Value
+from flow_py_sdk.client import AccessAPI
+from grpclib.const import Status
+from grpclib.exceptions import GRPCError, StreamTerminatedError
+
+FLOW_HOST = "access.mainnet.nodes.onflow.org"
+FLOW_PORT = 9000
+
+
+def is_transport_error(err: Exception) -> bool:
+    """
+    :param: err: error raised by a Flow access call
+    :return: whether the channel itself failed, script and request errors leave the channel usable
+    """
+    if isinstance(err, GRPCError):
+        return err.status == Status.UNAVAILABLE
+
+    return isinstance(err, (StreamTerminatedError, OSError))
+
+
+class FlowClientPool:
+    """
+    Shared Flow access clients, reused across script executions.
+
+    A client holds one gRPC channel, and a channel multiplexes concurrent calls over one HTTP/2 connection, so a few
+    clients are enough for many concurrent scripts. Clients are bound to the event loop they were created in and are
+    created again in a new loop. A client whose channel failed is dropped, the next call opens a new channel, while a
+failed script keeps its client.
+    """
+
+    def __init__(self, size: int = 4, host: str = FLOW_HOST, port: int = FLOW_PORT):
+        self.size = size
+        self.host = host
+        self.port = port
+        self.clients: List[Optional[AccessAPI]] = [None] * size
+        self.next_client = itertools.cycle(range(size))
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __get_client(self) -> Tuple[int, AccessAPI]:
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            # channels of a previous loop can not be used anymore
+            self.loop = loop
+            self.close()
+
+        idx = next(self.next_client)
+        if self.clients[idx] is None:
+            self.clients[idx] = flow_client(host=self.host, port=self.port)
+
+        return idx, self.clients[idx]
+
+    async def execute_script(self, script: Script, block_height: Optional[int] = None) -> Optional[Value]:
+        """
+        Execute a script on one of the pooled clients.
+
+        :param: script: the script
+        :param: block_height: execute against this block, the latest block by default
+        :return: the script result
+        :raise: any error of the Flow access node
+        """
+        idx, client = self.__get_client()
+        try:
+            return await client.execute_script(script=script, at_block_height=block_height)
+        except Exception as err:
+            if is_transport_error(err):
+                self.__drop(idx, client)
+            raise
+
+    async def get_latest_block_height(self) -> int:
+        idx, client = self.__get_client()
+        try:
+            header = await client.get_latest_block_header(is_sealed=True)
+        except Exception as err:
+            if is_transport_error(err):
+                self.__drop(idx, client)
+            raise
+
+        return header.height
+
+    def __drop(self, idx: int, client: AccessAPI) -> None:
+        if self.clients[idx] is client:
+            self.clients[idx] = None
+            self.__close(client)
+
+    @staticmethod
+    def __close(client: AccessAPI) -> None:
+        try:
+            client.channel.close()
+        except (RuntimeError, OSError) as err:
+            # the loop of the channel may already be closed
+            print(f"Failed to close Flow channel: {err}")
+
+    def close(self) -> None:
+        for client in self.clients:
+            if client is not None:
+                self.__close(client)
+        self.clients = [None] * self.size
+
+
+FLOW_CLIENTS = FlowClientPool()
@@ -1,22 +1,31 @@
 import asyncio
 
-from flow_py_sdk import flow_client, cadence, Script
+from flow_py_sdk import cadence, Script
+
+from provider.topshot.cadence.flow_client_pool import FLOW_CLIENTS
+
+# moments read by one script execution, large collections are read in parallel pages
+PAGE_SIZE = 2000
 
 
 async def get_collection_for_trade(address):
-    script = Script(
-        code="""
+    pages = await execute_paged_script(address, """
                 import TopShot from 0x0b2a3299cc857e29
 
-                pub fun main(account: Address): {UInt32:{UInt32:{String:String}}} {
+                pub fun main(account: Address, start: Int, end: Int): {UInt32:{UInt32:{String:String}}} {
                     let acct = getAccount(account)
 
                     let collectionRef = acct.getCapability(/public/MomentCollection)
                                             .borrow<&{TopShot.MomentCollectionPublic}>()!
 
-                    let res: {UInt32:{UInt32:{String:String}}} = {}                        
+                    let res: {UInt32:{UInt32:{String:String}}} = {}
+
+                    let ids = collectionRef.getIDs()
+                    var i = start
+                    while i < end && i < ids.length {
+                        let momentId = ids[i]
+                        i = i + 1
 
-                    for momentId in collectionRef.getIDs() {
                         // Borrow a reference to the specified moment
                         let moment = collectionRef.borrowMoment(id: momentId)
                             ?? panic("Could not borrow a reference to the specified moment")
@@ -24,7 +33,7 @@ async def get_collection_for_trade(address):
                         // Get the moment's metadata to access its play and Set IDs
                         let data = moment.data
 
-                        // Use the moment's play ID 
+                        // Use the moment's play ID
                         // to get all the metadata associated with that play
                         let metadata = TopShot.getPlayMetaData(playID: data.playID) ?? panic("Play doesn't exist")
 
@@ -45,55 +54,53 @@ async def get_collection_for_trade(address):
 
                     return res
                 }
-            """,
-        arguments=[cadence.Address.from_hex(address)],
-    )
+            """)
 
-    async with flow_client(
-            host="access.mainnet.nodes.onflow.org", port=9000
-    ) as client:
-        complex_script = await client.execute_script(
-            script=script
-            # , block_id
-            # , block_height
-        )
-        sets = {}
-
-        for set_item in complex_script.value:
+    sets = {}
+    for page in pages:
+        for set_item in page.value:
             set_id = int(str(set_item.key))
-            sets[set_id] = {}
+            if set_id not in sets:
+                sets[set_id] = {}
 
             for play_item in set_item.value.value:
                 play_id = int(str(play_item.key))
-                sets[set_id][play_id] = {}
+                play_info = {str(field.key): str(field.value) for field in play_item.value.value}
 
-                for play_info in play_item.value.value:
-                    sets[set_id][play_id][str(play_info.key)] = str(play_info.value)
+                if play_id in sets[set_id]:
+                    # the play shows up in several pages, add the counts up
+                    count = int(sets[set_id][play_id]['Count']) + int(play_info['Count'])
+                    play_info['Count'] = str(count)
+                sets[set_id][play_id] = play_info
 
     return sets
 
 
 async def get_account_plays(address):
-    script = Script(
-        code="""
+    pages = await execute_paged_script(address, """
                 import TopShot from 0x0b2a3299cc857e29
 
-                pub fun main(account: Address): {UInt32:{UInt32:UInt32}} {
+                pub fun main(account: Address, start: Int, end: Int): {UInt32:{UInt32:UInt32}} {
                     let acct = getAccount(account)
 
                     let collectionRef = acct.getCapability(/public/MomentCollection)
                                             .borrow<&{TopShot.MomentCollectionPublic}>()!
 
-                    let res: {UInt32:{UInt32:UInt32}} = {}                        
+                    let res: {UInt32:{UInt32:UInt32}} = {}
+
+                    let ids = collectionRef.getIDs()
+                    var i = start
+                    while i < end && i < ids.length {
+                        let id = ids[i]
+                        i = i + 1
 
-                    for id in collectionRef.getIDs() {
                         // Borrow a reference to the specified moment
                         let token = collectionRef.borrowMoment(id: id)
                             ?? panic("Could not borrow a reference to the specified moment")
 
                         // Get the moment's metadata to access its play and Set IDs
                         let data = token.data
-                        
+
                         if res.containsKey(data.playID) == false {
                             let playCountPerSet: {UInt32:UInt32} = {}
                             playCountPerSet.insert(key: data.setID, 1)
@@ -107,35 +114,94 @@ async def get_account_plays(address):
                                 count = count + 1
                                 playCountPerSet.insert(key: data.setID, count)
                             }
-                            
+
                             res.insert(key: data.playID, playCountPerSet)
                         }
                     }
 
                     return res
                 }
+            """)
+
+    plays = {}
+    for page in pages:
+        for play in page.value:
+            play_count_per_set = plays.setdefault(play.key.value, {})
+            for set in play.value.value:
+                play_count_per_set[set.key.value] = play_count_per_set.get(set.key.value, 0) + set.value.value
+
+    return plays
+
+
+async def get_account_moment_ids(address):
+    """
+    Get the ids of all moments of an account, a much lighter script than get_account_plays.
+
+    :param: address: flow address
+    :return: list of moment ids
+    """
+    script = Script(
+        code="""
+                import TopShot from 0x0b2a3299cc857e29
+
+                pub fun main(account: Address): [UInt64] {
+                    let acct = getAccount(account)
+
+                    let collectionRef = acct.getCapability(/public/MomentCollection)
+                                            .borrow<&{TopShot.MomentCollectionPublic}>()!
+
+                    return collectionRef.getIDs()
+                }
             """,
         arguments=[cadence.Address.from_hex(address)],
     )
 
-    async with flow_client(
-            host="access.mainnet.nodes.onflow.org", port=9000
-    ) as client:
-        complex_script = await client.execute_script(
-            script=script
-            # , block_id
-            # , block_height
-        )
-        plays = {}
-
-        for play in complex_script.value:
-            play_count_per_set = {}
-            for set in play.value.value:
-                play_count_per_set[set.key.value] = set.value.value
+    complex_script = await FLOW_CLIENTS.execute_script(script)
+    return [moment_id.value for moment_id in complex_script.value]
 
-            plays[play.key.value] = play_count_per_set
 
-    return plays
+async def get_account_moment_count(address, block_height=None):
+    script = Script(
+        code="""
+                import TopShot from 0x0b2a3299cc857e29
+
+                pub fun main(account: Address): Int {
+                    let acct = getAccount(account)
+
+                    let collectionRef = acct.getCapability(/public/MomentCollection)
+                                            .borrow<&{TopShot.MomentCollectionPublic}>()!
+
+                    return collectionRef.getIDs().length
+                }
+            """,
+        arguments=[cadence.Address.from_hex(address)],
+    )
+
+    complex_script = await FLOW_CLIENTS.execute_script(script, block_height)
+    return complex_script.value
+
+
+async def execute_paged_script(address, code, page_size=PAGE_SIZE):
+    """
+    Execute a collection script taking (account, start, end) arguments over all pages of an account in parallel.
+
+    All pages read the same sealed block, so a collection changing meanwhile still gives consistent pages.
+
+    :param: address: flow address
+    :param: code: cadence code of the script, reading the moments from index start (included) to end (excluded)
+    :param: page_size: number of moments per page
+    :return: list of the page results
+    """
+    block_height = await FLOW_CLIENTS.get_latest_block_height()
+    count = await get_account_moment_count(address, block_height)
+
+    scripts = [
+        Script(code=code, arguments=[cadence.Address.from_hex(address), cadence.Int(start),
+                                     cadence.Int(start + page_size)])
+        for start in range(0, max(count, 1), page_size)
+    ]
+
+    return await asyncio.gather(*[FLOW_CLIENTS.execute_script(script, block_height) for script in scripts])
 
 
 if __name__ == '__main__':
@@ -3,7 +3,9 @@ import json
 import os
 import pathlib
 
-from flow_py_sdk import flow_client, Script
+from flow_py_sdk import Script
+
+from provider.topshot.cadence.flow_client_pool import FLOW_CLIENTS
 
 
 async def get_all_plays():
@@ -32,38 +34,31 @@ async def get_all_plays():
         arguments=[],
     )
 
-    async with flow_client(
-            host="access.mainnet.nodes.onflow.org", port=9000
-    ) as client:
-        complex_script = await client.execute_script(
-            script=script
-            # , block_id
-            # , block_height
-        )
+    complex_script = await FLOW_CLIENTS.execute_script(script)
 
-        player_plays = {}
+    player_plays = {}
 
-        for play_item in complex_script.value:
-            for field in play_item.value.value:
-                if field.key.value == "FullName":
-                    player_name = field.value.value
-                if field.key.value == "DateOfMoment":
-                    date = field.value.value[:10]
-                if field.key.value == "PlayCategory":
-                    category = field.value.value
+    for play_item in complex_script.value:
+        for field in play_item.value.value:
+            if field.key.value == "FullName":
+                player_name = field.value.value
+            if field.key.value == "DateOfMoment":
+                date = field.value.value[:10]
+            if field.key.value == "PlayCategory":
+                category = field.value.value
 
-            if player_name not in player_plays:
-                player_plays[player_name] = {}
+        if player_name not in player_plays:
+            player_plays[player_name] = {}
 
-            if date not in player_plays[player_name]:
-                player_plays[player_name][date] = {}
+        if date not in player_plays[player_name]:
+            player_plays[player_name][date] = {}
 
-            player_plays[player_name][date][category] = play_item.key.value
+        player_plays[player_name][date][category] = play_item.key.value
 
-        with open(os.path.join(pathlib.Path(__file__).parent.resolve(), "result/cadence_plays.json"), 'w') as output_file:
-            json.dump(player_plays, output_file, indent=2)
+    with open(os.path.join(pathlib.Path(__file__).parent.resolve(), "result/cadence_plays.json"), 'w') as output_file:
+        json.dump(player_plays, output_file, indent=2)
 
-        return player_plays
+    return player_plays
 
 
 if __name__ == '__main__':
@@ -120,21 +120,22 @@ class Bucket:
 
     def get_filtered_games_players(self, games_teams) -> Dict[str, List[int]]:
         game_players = NBA_PROVIDER.get_players_for_games(games_teams)
+        if len(self.player_filters) == 0:
+            return game_players
 
-        # apply player filters if exist
-        for f in self.player_filters:
-            for game_id in game_players:
-                game_players[game_id] = f.filter_players(game_players[game_id])
+        # all player filters fused into one set of allowed players
+        allowed = set(self.player_filters[0].allowed_players())
+        for f in self.player_filters[1:]:
+            allowed &= f.allowed_players()
 
+        result = {}
+        for game_id, players in game_players.items():
+            players = allowed.intersection(players)
             # remove games without qualified players
-            games_to_remove = []
-            for game_id in game_players.keys():
-                if len(game_players[game_id]) == 0:
-                    games_to_remove.append(game_id)
-            for game_id in games_to_remove:
-                game_players.pop(game_id)
+            if len(players) > 0:
+                result[game_id] = players
 
-        return game_players
+        return result
 
     def get_current_scores(self,
                            games_stats: Dict[str, Tuple[Optional[Dict[str, Any]], bool, Optional[Dict[str, Any]]]]) -> \
@@ -1,6 +1,8 @@
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional, Set
 
-from provider.topshot.challenge.buckets.bucket import Bucket
+from provider.nba.playbyplay_cache import PLAYBYPLAY_CACHE
+
+from provider.topshot.challenge.buckets.bucket import Bucket, BucketType
 from provider.topshot.challenge.buckets.segment_bucket import SegmentBucket
 from provider.topshot.challenge.player_filter import TopshotFilter
 from provider.topshot.challenge.team_filter import TeamFilter
@@ -22,6 +24,9 @@ class Challenge:
         self.title = title
         self.buckets: List[Bucket] = []
         self.game_ids: List[str] = []
+        # {bucket index: (fingerprint of the bucket games, formatted chunks, has results)}
+        self.rendered_buckets: Dict[int, Tuple[tuple, List[str], bool]] = {}
+        self.frozen_buckets: Set[int] = set()
 
     def build_bucket(self, description: str, is_wildcard: bool, bucket_type: str, count: int, is_team: bool) -> None:
         """Create a new Bucket object and add it to the list of buckets in the challenge.
@@ -74,7 +79,34 @@ class Challenge:
         """
         self.buckets[bucket_idx].add_player_filter(player_filter)
 
-    def get_formatted_messages(self) -> List[str]:
+    def get_playbyplay_game_ids(self) -> List[str]:
+        """Get the games tracked by play-by-play buckets of the challenge.
+
+        Returns:
+            List[str]: a list of game ids
+        """
+        game_ids = []
+        for bucket in self.buckets:
+            if bucket.bucket_type == BucketType.PBP:
+                game_ids.extend(bucket.games)
+
+        return list(dict.fromkeys(game_ids))
+
+    def get_formatted_messages(
+            self, games_stats: Optional[Dict[str, Tuple[Optional[Dict[str, Any]], bool, Optional[Dict[str, Any]]]]] = None
+    ) -> List[str]:
+        """Format the current ranking of every bucket.
+
+        A bucket is only ranked and formatted again when the stats of its games changed since the last call, and it
+        is not checked anymore once all its games are final.
+
+        Args:
+            games_stats: prefetched (game_boxscore, isFinal, game_info) tuples by game id, games missing from it are
+                loaded one by one
+
+        Returns:
+            List[str]: a list of messages
+        """
         messages = []
         msg = ""
         new_msg = "-" * 40
@@ -82,59 +114,97 @@ class Challenge:
 
         msg, new_msg = truncate_message(messages, msg, new_msg, 1950)
 
-        games_stats = {}
+        games_stats = {} if games_stats is None else dict(games_stats)
         for game_id in self.game_ids:
-            games_stats[game_id] = Tracker.load_game_stats(game_id)
+            if game_id not in games_stats:
+                games_stats[game_id] = Tracker.load_game_stats(game_id)
+
+        # fingerprints are taken before any bucket is ranked, trackers enrich the player statistics
+        fingerprints = {game_id: game_fingerprint(games_stats.get(game_id)) for game_id in self.game_ids}
+
+        for idx, bucket in enumerate(self.buckets):
+            if idx not in self.frozen_buckets:
+                fingerprint = self.__bucket_fingerprint(bucket, fingerprints)
+                rendered = self.rendered_buckets.get(idx)
+                if rendered is None or rendered[0] != fingerprint:
+                    self.rendered_buckets[idx] = (fingerprint, *self.format_bucket(bucket, games_stats))
+
+                if all(is_game_final(games_stats.get(game_id)) for game_id in bucket.games):
+                    self.frozen_buckets.add(idx)
+
+            # replay the chunks, the messages are split exactly as if the bucket was formatted now
+            _, chunks, has_results = self.rendered_buckets[idx]
+            for chunk in chunks:
+                msg, _ = truncate_message(messages, msg, chunk, 1950)
+            if has_results and msg.endswith("\n") and not msg.endswith("\n\n"):
+                msg += "\n"
 
-        for bucket in self.buckets:
-            new_msg += ":bar_chart: **{}** ".format(bucket.description)
+        if msg != "":
+            messages.append(msg)
+        return messages
 
-            for tier_breaker in bucket.tracker.tier_breakers:
-                new_msg += "[{}] ".format(','.join(tier_breaker.stats))
+    def format_bucket(
+            self, bucket: Bucket,
+            games_stats: Dict[str, Tuple[Optional[Dict[str, Any]], bool, Optional[Dict[str, Any]]]]
+    ) -> Tuple[List[str], bool]:
+        """Rank a bucket and format it into chunks, each chunk is a piece of text which is never split across messages.
 
-            new_msg += "\n"
+        Args:
+            bucket (Bucket): the bucket to format
+            games_stats: (game_boxscore, isFinal, game_info) tuples by game id
+
+        Returns:
+            Tuple[List[str], bool]: a list of chunks and whether the bucket has any result
+        """
+        chunks = []
+        new_msg = ":bar_chart: **{}** ".format(bucket.description)
 
-            bucket_results = bucket.get_current_scores(games_stats)
+        for tier_breaker in bucket.tracker.tier_breakers:
+            new_msg += "[{}] ".format(','.join(tier_breaker.stats))
 
-            if len(bucket_results) == 0:
-                new_msg += "\n"
-                msg, new_msg = truncate_message(messages, msg, new_msg, 1950)
-                continue
+        new_msg += "\n"
 
-            for result in bucket_results:
-                hit, scores = result
+        bucket_results = bucket.get_current_scores(games_stats)
 
-                if len(scores) == 0:
-                    continue
+        if len(bucket_results) == 0:
+            chunks.append(new_msg + "\n")
+            return chunks, False
 
-                msg, new_msg = self.format_ranking(scores[:hit], new_msg, messages, msg, -1)
-                msg, new_msg = self.format_ranking(scores[hit:min(len(scores), 30)], new_msg, messages, msg, hit)
+        for result in bucket_results:
+            hit, scores = result
 
-                new_msg += "\n"
+            if len(scores) == 0:
+                continue
 
-            msg, new_msg = truncate_message(messages, msg, new_msg, 1950)
-            if msg.endswith("\n") and not msg.endswith("\n\n"):
-                msg += "\n"
+            new_msg = self.format_ranking(scores[:hit], new_msg, chunks, -1)
+            new_msg = self.format_ranking(scores[hit:min(len(scores), 30)], new_msg, chunks, hit)
 
-        if msg != "":
-            messages.append(msg)
-        return messages
+            new_msg += "\n"
+
+        chunks.append(new_msg)
+        return chunks, True
+
+    @staticmethod
+    def __bucket_fingerprint(bucket: Bucket, fingerprints: Dict[str, tuple]) -> tuple:
+        fingerprint = tuple(fingerprints.get(game_id) for game_id in bucket.games)
+        if bucket.bucket_type == BucketType.PBP:
+            actions = [PLAYBYPLAY_CACHE.get_cached(game_id) for game_id in bucket.games]
+            fingerprint += tuple(None if game_actions is None else len(game_actions) for game_actions in actions)
+
+        return fingerprint
 
     @staticmethod
-    def format_ranking(
-            ranking: List[Dict[str, Any]], new_message: str, messages: List[str], message: str, offset: int = 0
-    ) -> Tuple[str, str]:
-        """Format a list of scores into a string and truncate it if it exceeds the character limit.
+    def format_ranking(ranking: List[Dict[str, Any]], new_message: str, chunks: List[str], offset: int = 0) -> str:
+        """Format a list of scores into chunks, one chunk per line.
 
         Args:
             ranking (List[Dict[str, Any]]): a list of rank dictionaries
-            new_message (str): the new message to append the formatted scores to
-            messages (List[str]): a list of messages
-            message (str): the current message being built
+            new_message (str): the pending text, it goes in the first chunk
+            chunks (List[str]): a list of chunks
             offset (int): the rank offset
 
         Returns:
-            Tuple[str, str]: a tuple containing the updated message and new_message
+            str: the pending text after the ranking
         """
         for i, rank in enumerate(ranking):
             if offset < 0:
@@ -159,9 +229,10 @@ class Challenge:
                     rank['score']['game']['statusText'],
                 )
 
-            message, new_message = truncate_message(messages, message, new_message, 1950)
+            chunks.append(new_message)
+            new_message = ""
 
-        return message, new_message
+        return new_message
 
     @staticmethod
     def build_from_dict(dict_obj):
@@ -182,3 +253,44 @@ class Challenge:
                 challenge.add_bucket(Bucket.build_from_dict(bucket))
 
         return challenge
+
+
+# player statistics added by the trackers, not part of the boxscore
+ENRICHED_STATS = {'order', 'teamWin'}
+
+
+def game_fingerprint(game: Optional[Tuple[Optional[Dict[str, Any]], bool, Optional[Dict[str, Any]]]]) -> tuple:
+    """
+    Summarize everything the trackers read from a game: status, clock, score and player statistics.
+
+    :param: game: (game_boxscore, isFinal, game_info) tuple
+    :return: a tuple which changes whenever a tracker result may change
+    """
+    if game is None:
+        return ()
+
+    game_stats, game_final, _ = game
+    if game_stats is None:
+        return (game_final,)
+
+    teams = []
+    for team in ['homeTeam', 'awayTeam']:
+        teams.append((
+            game_stats[team]['teamTricode'],
+            game_stats[team]['score'],
+            tuple(
+                (player['personId'], player['status'], player['order'],
+                 tuple(value for stat, value in player['statistics'].items() if stat not in ENRICHED_STATS))
+                for player in game_stats[team]['players']
+            ),
+        ))
+
+    return (game_stats['gameStatus'], game_stats['gameStatusText'], game_stats['period'], game_stats['gameClock'],
+            tuple(teams))
+
+
+def is_game_final(game: Optional[Tuple[Optional[Dict[str, Any]], bool, Optional[Dict[str, Any]]]]) -> bool:
+    """
+    :return: True only if the game boxscore is available and the game ended, a missing boxscore may show up later
+    """
+    return game is not None and game[0] is not None and game[0]['gameStatus'] == 3
@@ -2,11 +2,31 @@ from typing import List, Set
 
 from provider.topshot.ts_provider import TS_PROVIDER
 
+EMPTY: Set[int] = frozenset()
+
 
 class PlayerFilter:
-    def filter_players(self, player_ids: Set[int]) -> Set[int]:
+    def allowed_players(self) -> Set[int]:
+        """
+        Get all players passing the filter.
+
+        Returns:
+            Set[int]: A set of player IDs, never modify it.
+        """
         pass
 
+    def filter_players(self, player_ids: Set[int]) -> Set[int]:
+        """
+        Filter a set of player IDs.
+
+        Args:
+            player_ids (Set[int]): A set of player IDs to filter.
+
+        Returns:
+            Set[int]: A set of player IDs that passed the filter.
+        """
+        return self.allowed_players().intersection(player_ids)
+
 
 class TopshotFilter(PlayerFilter):
     def __init__(self, series: List[str], tags: List[str]):
@@ -19,38 +39,22 @@ class TopshotFilter(PlayerFilter):
         self.series = series
         self.badges = tags
 
-    def filter_players(self, player_ids: Set[int]) -> Set[int]:
+    def allowed_players(self) -> Set[int]:
         """
-        Filter a set of player IDs based on the tags associated with the TopshotFilter object.
-
-        Args:
-            player_ids (Set[int]): A set of player IDs to filter.
+        Get the players holding all badges of the filter in at least one of its series.
 
         Returns:
-            Set[int]: A set of player IDs that passed the filter.
+            Set[int]: A set of player IDs.
         """
-        filtered = set()
-        for player_id in player_ids:
-            if player_id not in TS_PROVIDER.player_moments:
-                continue
-
-            matched = True
-            for series in self.series:
-                matched = False
-                all_badges = True
-                for badge in self.badges:
-                    if badge not in TS_PROVIDER.player_moments[player_id]['badges'][series] or \
-                            not TS_PROVIDER.player_moments[player_id]['badges'][series][badge]:
-                        all_badges = False
-                        break
-                if all_badges:
-                    matched = True
-                    break
+        if len(self.series) == 0 or len(self.badges) == 0:
+            return TS_PROVIDER.known_player_ids
 
-            if matched:
-                filtered.add(player_id)
+        allowed = set()
+        for series in self.series:
+            holders = [TS_PROVIDER.badge_players.get((series, badge), EMPTY) for badge in self.badges]
+            allowed |= holders[0].intersection(*holders[1:])
 
-        return filtered
+        return allowed
 
 
 class PlayerIDFilter(PlayerFilter):
@@ -61,29 +65,16 @@ class PlayerIDFilter(PlayerFilter):
         Args:
             ids (List[str]): A list of tags used to filter players.
         """
-        self.ids = [int(i) for i in ids]
+        self.ids = {int(i) for i in ids}
 
-    def filter_players(self, player_ids: Set[int]) -> Set[int]:
+    def allowed_players(self) -> Set[int]:
         """
-        Filter a set of player IDs based on the tags associated with the TopshotFilter object.
-
-        Args:
-            player_ids (Set[int]): A set of player IDs to filter.
+        Get the players of the filter who have moments.
 
         Returns:
-            Set[int]: A set of player IDs that passed the filter.
+            Set[int]: A set of player IDs.
         """
-        filtered = set()
-        for player_id in player_ids:
-            if player_id not in self.ids:
-                continue
-
-            if player_id not in TS_PROVIDER.player_moments:
-                continue
-
-            filtered.add(player_id)
-
-        return filtered
+        return TS_PROVIDER.known_player_ids & self.ids
 
 
 class TopshotSetFilter(PlayerFilter):
@@ -96,24 +87,11 @@ class TopshotSetFilter(PlayerFilter):
         """
         self.set = int(set)
 
-    def filter_players(self, player_ids: Set[int]) -> Set[int]:
+    def allowed_players(self) -> Set[int]:
         """
-        Filter a set of player IDs based on the tags associated with the TopshotFilter object.
-
-        Args:
-            player_ids (Set[int]): A set of player IDs to filter.
+        Get the players with a moment in the set.
 
         Returns:
-            Set[int]: A set of player IDs that passed the filter.
+            Set[int]: A set of player IDs.
         """
-        filtered = set()
-        for player_id in player_ids:
-            if player_id not in TS_PROVIDER.player_moments:
-                continue
-
-            if self.set not in TS_PROVIDER.player_moments[player_id]['sets']:
-                continue
-
-            filtered.add(player_id)
-
-        return filtered
+        return TS_PROVIDER.set_players.get(self.set, EMPTY)
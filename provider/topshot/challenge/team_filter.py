@@ -1,7 +1,6 @@
 from typing import Set
 
-from nba_api.live.nba.endpoints import boxscore
-
+from provider.nba.boxscore_cache import BOXSCORE_CACHE
 from provider.nba.nba_provider import EAST_CONFERENCE, WEST_CONFERENCE
 from utils import get_lead_team
 
@@ -29,7 +28,7 @@ class TeamFilter:
         """
         if self.tag == "WIN" or self.tag == "LOSE":
             try:
-                game_boxscore = boxscore.BoxScore(game_id=game_id).get_dict()['game']
+                game_boxscore = BOXSCORE_CACHE.get(game_id)
             except:
                 return set()
 
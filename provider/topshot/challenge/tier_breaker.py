@@ -1,6 +1,8 @@
 import re
 from typing import Dict, List, Any, Optional, Set, Tuple
 
+from provider.nba.playbyplay_cache import ActionIndex, MADE_SHOT, MADE_THREE
+
 STATS_MAP = {
     "PTS": "points",
     "FGA": "fieldGoalsAttempted",
@@ -125,6 +127,22 @@ class TierBreaker:
 
         return None
 
+    def get_indexed_action(self, index: ActionIndex, players: Optional[Set] = None) -> Optional[Dict]:
+        """
+        Get the action that breaks the tier from the action index of a game, same result as `get_action`.
+
+        :param: index: action index of a game
+        :param: players: set of player ids whose actions should be considered for tier breaking
+        :return: action that breaks the tier, or None if no such action exists
+        """
+        if self.stats[0] not in [MADE_SHOT, MADE_THREE]:
+            return None
+
+        if self.order == "DESC":
+            return index.last(self.stats[0], players)
+
+        return index.first(self.stats[0], players)
+
 
 class Qualifier(TierBreaker):
     def __init__(self, stats: List[str], target: int) -> None:
@@ -1,9 +1,42 @@
+import heapq
 from typing import List, Dict, Any, Union, Tuple, Optional
 
 from provider.topshot.challenge.tier_breaker import TierBreaker, Qualifier
 from provider.topshot.challenge.trackers.tracker import Tracker
 from utils import equals
 
+SORT_LIMIT = 60
+
+
+class Descending:
+    """
+    Wraps a non-numeric sort value to invert its order.
+    """
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __lt__(self, other: 'Descending') -> bool:
+        return other.value < self.value
+
+    def __eq__(self, other: 'Descending') -> bool:
+        return self.value == other.value
+
+
+def sort_value(value: Any, descending: bool) -> Any:
+    """
+    :param: value: a tier breaker score
+    :param: descending: whether higher scores rank first
+    :return: a value whose ascending order is the ranking order
+    """
+    if not descending:
+        return value
+    if isinstance(value, (int, float)):
+        return -value
+
+    return Descending(value)
+
 
 class LeaderBoardTracker(Tracker):
     """
@@ -129,86 +162,73 @@ class LeaderBoardTracker(Tracker):
         :return: a tuple containing the total number of teams/players and a list of dictionaries containing team/player
                 information and scores
         """
-        # Sort the keys in descending order based on the scores for each tier breaker, as specified by the order of the
-        # tier breakers in the leaderboard tracker
-        keys_sorted = list(scores.keys())
-        keys_sorted.sort(reverse=self.tier_breakers[0].order == "DESC", key=lambda k: scores[k]['stats'][0])
-
-        length = len(keys_sorted)
-        if length > 60:
-            length = 60
-            keys_sorted = keys_sorted[0:60]  # only keep top 60 records to save time
+        # Only keep top 60 records by the first tier breaker to save time. The heap selection keeps ties in the
+        # insertion order of `scores`, like a stable sort does.
+        select = heapq.nlargest if self.tier_breakers[0].order == "DESC" else heapq.nsmallest
+        keys_sorted = [key for key, _ in select(SORT_LIMIT, scores.items(), key=lambda item: item[1]['stats'][0])]
 
-        # Append the top 2 * count (or at least 5) players/teams to the sorted_stats list, sorted by their total scores
-        # across all tier breakers, as well as any players/teams with the same total score as the last player/team in
-        # the sorted_stats list
+        # Keep the top 2 * count (or at least 5) players/teams, as well as any players/teams with the same score as
+        # the last kept one and players/teams whose games are not ended yet
         num_to_return = max(5, self.count * 2) if not all_final else self.count
-        keys_sorted_and_filtered_by_first_tier = []
-        idx = 0
-        hit = 0
-        while len(keys_sorted_and_filtered_by_first_tier) < num_to_return and idx < length:
-            if hit < self.count:
-                keys_sorted_and_filtered_by_first_tier.append(keys_sorted[idx])
-                hit += 1
-                idx += 1
-
-                if hit <= self.count:
-                    while idx < length and scores[keys_sorted[idx - 1]]['stats'][0] == scores[keys_sorted[idx]]['stats'][0]:
-                        keys_sorted_and_filtered_by_first_tier.append(keys_sorted[idx])
-                        hit += 1
-                        idx += 1
-                else:
-                    while idx < length and scores[keys_sorted[idx - 1]]['stats'][0] == scores[keys_sorted[idx]]['stats'][0]:
-                        if scores[keys_sorted[idx]]['game']['status'] != 3:
-                            keys_sorted_and_filtered_by_first_tier.append(keys_sorted[idx])
-                        idx += 1
-            elif scores[keys_sorted[idx]]['game']['status'] != 3:
-                keys_sorted_and_filtered_by_first_tier.append(keys_sorted[idx])
-                idx += 1
-
-                while idx < length and scores[keys_sorted[idx - 1]]['stats'][0] == scores[keys_sorted[idx]]['stats'][0]:
-                    if scores[keys_sorted[idx]]['game']['status'] != 3:
-                        keys_sorted_and_filtered_by_first_tier.append(keys_sorted[idx])
-                    idx += 1
-            else:
-                idx += 1
-
-        keys_sorted = keys_sorted_and_filtered_by_first_tier
-        for i in range(len(self.tier_breakers) - 1, -1, -1):
-            keys_sorted.sort(reverse=self.tier_breakers[i].order == "DESC", key=lambda k: scores[k]['stats'][i])
-        length = len(keys_sorted)
+        _, keys_sorted = self.__select(keys_sorted, [scores[key]['stats'][0] for key in keys_sorted], scores,
+                                       num_to_return)
+
+        # one composite key per kept entry, in the order of the tier breakers
+        descending = [tier_breaker.order == "DESC" for tier_breaker in self.tier_breakers]
+        sort_keys = {
+            key: tuple(sort_value(stat, desc) for stat, desc in zip(scores[key]['stats'], descending))
+            for key in keys_sorted
+        }
+        keys_sorted.sort(key=lambda k: sort_keys[k])
+        hit, keys_sorted = self.__select(keys_sorted, [scores[key]['stats'] for key in keys_sorted], scores,
+                                         num_to_return)
+
+        return hit, [{"name": key, "score": scores[key]} for key in keys_sorted]
+
+    def __select(self, keys: List[str], ties: List[Any], scores: Dict[str, Dict[str, Any]], num_to_return: int) \
+            -> Tuple[int, List[str]]:
+        """
+        Walk the sorted keys and keep the top `count` entries with their ties, then only the entries of unfinished
+        games, until `num_to_return` entries are kept.
 
-        scores_sorted_by_all_tiers = []
+        :param: keys: sorted keys
+        :param: ties: the sort key of each key, entries with equal sort keys are tied
+        :param: scores: dictionary mapping names to dictionaries containing score statistics
+        :param: num_to_return: maximum number of entries to keep, ties of the kept entries may exceed it
+        :return: the number of ranked entries and the kept keys
+        """
+        length = len(keys)
+        selected = []
         idx = 0
         hit = 0
-        while len(scores_sorted_by_all_tiers) < num_to_return and idx < length:
+        while len(selected) < num_to_return and idx < length:
             if hit < self.count:
-                scores_sorted_by_all_tiers.append({"name": keys_sorted[idx], "score": scores[keys_sorted[idx]]})
+                selected.append(keys[idx])
                 hit += 1
                 idx += 1
 
                 if hit <= self.count:
-                    while idx < length and equals(scores[keys_sorted[idx - 1]]['stats'], scores[keys_sorted[idx]]['stats']):
-                        scores_sorted_by_all_tiers.append({"name": keys_sorted[idx], "score": scores[keys_sorted[idx]]})
+                    while idx < length and ties[idx - 1] == ties[idx]:
+                        selected.append(keys[idx])
                         hit += 1
                         idx += 1
                 else:
-                    while idx < length and equals(scores[keys_sorted[idx - 1]]['stats'], scores[keys_sorted[idx]]['stats']):
-                        if scores[keys_sorted[idx]]['game']['status'] != 3:
-                            scores_sorted_by_all_tiers.append({"name": keys_sorted[idx], "score": scores[keys_sorted[idx]]})
+                    while idx < length and ties[idx - 1] == ties[idx]:
+                        if scores[keys[idx]]['game']['status'] != 3:
+                            selected.append(keys[idx])
                         idx += 1
-            elif scores[keys_sorted[idx]]['game']['status'] != 3:
-                scores_sorted_by_all_tiers.append({"name": keys_sorted[idx], "score": scores[keys_sorted[idx]]})
+            elif scores[keys[idx]]['game']['status'] != 3:
+                selected.append(keys[idx])
                 idx += 1
 
-                while idx < length and equals(scores[keys_sorted[idx - 1]]['stats'], scores[keys_sorted[idx]]['stats']):
-                    if scores[keys_sorted[idx]]['game']['status'] != 3:
-                        scores_sorted_by_all_tiers.append({"name": keys_sorted[idx], "score": scores[keys_sorted[idx]]})
+                while idx < length and ties[idx - 1] == ties[idx]:
+                    if scores[keys[idx]]['game']['status'] != 3:
+                        selected.append(keys[idx])
                     idx += 1
             else:
                 idx += 1
 
-        return hit, scores_sorted_by_all_tiers
+        return hit, selected
 
 
 class QualifierTracker(LeaderBoardTracker):
@@ -300,3 +320,33 @@ class QualifierTracker(LeaderBoardTracker):
                 idx += 1
 
         return passed, sorted_stats
+
+
+if __name__ == '__main__':
+    import random
+    import time
+
+    random.seed(3)
+
+    def random_scores(entries):
+        return {
+            f"Player {i}/00223{i % 40:05d}": {
+                'game': {'status': random.choice([2, 3, 3])},
+                'stats': [random.randint(0, 40), random.randint(0, 15), random.choice(['W', 'L'])],
+            }
+            for i in range(entries)
+        }
+
+    tracker = LeaderBoardTracker(10)
+    tracker.add_tier_breaker(TierBreaker(['PTS'], 'DESC'))
+    tracker.add_tier_breaker(TierBreaker(['AST'], 'ASC'))
+    tracker.add_tier_breaker(TierBreaker(['WIN'], 'DESC'))
+
+    # a multi-date challenge tracks thousands of player-game entries
+    for size in [500, 5000, 20000]:
+        all_scores = random_scores(size)
+        start = time.time()
+        for _ in range(20):
+            top_hit, ranked = tracker.sort(all_scores, False)
+        print(f"{size} entries: {(time.time() - start) * 1000 / 20:.2f}ms per sort, {top_hit} ranked, "
+              f"{len(ranked)} shown")
@@ -1,7 +1,6 @@
 from typing import List, Dict, Any, Tuple, Optional
 
-from nba_api.live.nba.endpoints import PlayByPlay
-
+from provider.nba.playbyplay_cache import PLAYBYPLAY_CACHE
 from provider.topshot.challenge.tier_breaker import TierBreaker
 from provider.topshot.challenge.trackers.tracker import Tracker
 from utils import get_game_info
@@ -50,16 +49,16 @@ class PlayByPlayTracker(Tracker):
             if game_stats is None:
                 continue
 
-            actions = PlayByPlay(game_id).get_dict()['game']['actions']
+            index = PLAYBYPLAY_CACHE.get_index(game_id)
             # Skip games with no actions.
-            if len(actions) == 0:
+            if index.count == 0:
                 continue
 
             # Get the game information.
             game_info = get_game_info(game_stats)
 
             # Get the action that matches the tier breaker.
-            hit = self.tier_breakers[0].get_action(actions)
+            hit = self.tier_breakers[0].get_indexed_action(index)
 
             # If an action was found, add it to the result.
             if hit is not None:
@@ -103,14 +102,14 @@ class PlayByPlayTracker(Tracker):
             if game_stats is None:
                 continue
 
-            actions = PlayByPlay(game_id).get_dict()['game']['actions']
+            index = PLAYBYPLAY_CACHE.get_index(game_id)
             # Skip games with no actions.
-            if len(actions) == 0:
+            if index.count == 0:
                 continue
 
             game_info = get_game_info(game_stats)
 
-            hit = self.tier_breakers[0].get_action(actions, set(games_players[game_id]))
+            hit = self.tier_breakers[0].get_indexed_action(index, set(games_players[game_id]))
 
             if hit is not None:
                 result.append({
@@ -1,7 +1,7 @@
 from typing import Dict, List, Any, Tuple, Optional
 
-from nba_api.live.nba.endpoints import boxscore
-
+from provider.nba.boxscore_cache import BOXSCORE_CACHE
+from provider.nba.live_fetcher import LIVE_FETCHER
 from provider.topshot.challenge.tier_breaker import TierBreaker
 from utils import get_game_info
 
@@ -48,8 +48,32 @@ class Tracker:
         :return: a tuple containing the game statistics, a boolean indicating whether the game has ended, and the game information
         """
         try:
-            game_boxscore = boxscore.BoxScore(game_id=game_id).get_dict()['game']
+            game_boxscore = BOXSCORE_CACHE.get(game_id)
         except Exception:
+            game_boxscore = None
+
+        return Tracker.build_game_stats(game_boxscore)
+
+    @staticmethod
+    async def load_games_stats(game_ids: List[str]) -> Dict[str, Tuple[Optional[Dict[str, Any]], bool, Optional[Dict[str, Any]]]]:
+        """
+        Load game statistics for all given game ids concurrently.
+
+        :param: game_ids: a list of game ids
+        :return: a dictionary of game_id to (game_boxscore, isFinal, game_info) tuple
+        """
+        games = await LIVE_FETCHER.fetch_boxscores(game_ids)
+        return {game_id: Tracker.build_game_stats(game_boxscore) for game_id, game_boxscore in games.items()}
+
+    @staticmethod
+    def build_game_stats(game_boxscore: Optional[Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], bool, Optional[Dict[str, Any]]]:
+        """
+        Build the (game_boxscore, isFinal, game_info) tuple of a downloaded boxscore.
+
+        :param: game_boxscore: the boxscore of a game, None if it is not available
+        :return: a tuple containing the game statistics, a boolean indicating whether the game has ended, and the game information
+        """
+        if game_boxscore is None:
             return None, True, None
 
         if game_boxscore['gameStatus'] == 1:
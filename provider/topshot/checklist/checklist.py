@@ -1,69 +1,142 @@
 import asyncio
+import threading
+from typing import Dict, List, Tuple
 
 from provider.topshot.cadence.flow_collections import get_account_plays
-from provider.topshot.ts_provider import TS_PROVIDER, TS_PROVIDER
+from provider.topshot.ts_provider import TS_PROVIDER
+
+SET_CHECKLIST = 'set'
+TEAM_CHECKLIST = 'team'
+
+
+class ChecklistEngine:
+    """
+    Inverted index of all set and team checklists.
+
+    A set checklist slot is a play of the set, owned when the collection has the play in that set. A team checklist
+    slot is a player, owned when the collection has any play of the player. The engine keeps postings from
+    (play, set) and from play to the checklist slots they fill, so checking a collection is one pass over its plays
+    instead of a pass over the whole catalog.
+    """
+
+    def __init__(self, set_checklists, team_checklists):
+        self.sources = (set_checklists, team_checklists)
+        # [(type, name, slot count)], in the order check_sets_and_teams reports them
+        self.checklists: List[Tuple[str, str, int]] = []
+        # {(play_id, set_id): checklist index}
+        self.set_postings: Dict[Tuple[int, int], int] = {}
+        # {play_id: [(checklist index, slot)]}
+        self.play_postings: Dict[int, List[Tuple[int, str]]] = {}
+
+        for set_id, checklist in set_checklists.items():
+            idx = self.__add(SET_CHECKLIST, checklist['name'], checklist['count'])
+            for play_id in checklist['moments']:
+                self.set_postings[(int(play_id), int(set_id))] = idx
+
+        for team, checklists in team_checklists.items():
+            team_sets = [(f"{team} {series}", checklist) for series, checklist in checklists['series'].items()]
+            team_sets.append((f"{team} contemporary", checklists['contemporary']))
+            team_sets.append((f"{team} all", checklists['all']))
+
+            for name, checklist in team_sets:
+                idx = self.__add(TEAM_CHECKLIST, name, checklist['count'])
+                for player_id, player in checklist['players'].items():
+                    for play_id in player['plays']:
+                        self.play_postings.setdefault(play_id, []).append((idx, player_id))
+
+    def __add(self, checklist_type: str, name: str, count: int) -> int:
+        self.checklists.append((checklist_type, name, count))
+        return len(self.checklists) - 1
+
+    def get_progress(self, plays: Dict[int, Dict[int, int]]) -> Dict[int, int]:
+        """
+        Count the owned slots of every checklist the collection has a play of.
+
+        :param: plays: collection in {play_id: {set_id: count}}
+        :return: a dictionary of {checklist index: owned slots}
+        """
+        set_owned: Dict[int, int] = {}
+        team_owned: Dict[int, set] = {}
+
+        for play_id, sets in plays.items():
+            for set_id in sets:
+                idx = self.set_postings.get((play_id, set_id))
+                if idx is not None:
+                    set_owned[idx] = set_owned.get(idx, 0) + 1
+
+            for idx, slot in self.play_postings.get(play_id, []):
+                team_owned.setdefault(idx, set()).add(slot)
+
+        progress = set_owned
+        for idx, slots in team_owned.items():
+            progress[idx] = len(slots)
+
+        return progress
+
+    def get_complete(self, plays: Dict[int, Dict[int, int]]) -> Tuple[List[str], List[str]]:
+        """
+        :param: plays: collection in {play_id: {set_id: count}}
+        :return: names of the completed set checklists and of the completed team checklists
+        """
+        progress = self.get_progress(plays)
+
+        complete_sets = []
+        complete_teams = []
+        for idx, (checklist_type, name, count) in enumerate(self.checklists):
+            if progress.get(idx, 0) != count:
+                continue
+
+            if checklist_type == SET_CHECKLIST:
+                complete_sets.append(name)
+            else:
+                complete_teams.append(name)
+
+        return complete_sets, complete_teams
+
+    def get_near_complete(self, plays: Dict[int, Dict[int, int]], max_missing: int = 2) \
+            -> List[Tuple[str, str, int, int]]:
+        """
+        :param: plays: collection in {play_id: {set_id: count}}
+        :param: max_missing: maximum number of missing slots
+        :return: a list of (type, name, owned slots, slot count), the closest to completion first
+        """
+        near_complete = []
+        for idx, owned in self.get_progress(plays).items():
+            checklist_type, name, count = self.checklists[idx]
+            if 0 < count - owned <= max_missing:
+                near_complete.append((checklist_type, name, owned, count))
+
+        near_complete.sort(key=lambda checklist: (checklist[3] - checklist[2], -checklist[3], checklist[1]))
+        return near_complete
+
+
+ENGINE_LOCK = threading.Lock()
+ENGINE = None
+
+
+def get_checklist_engine() -> ChecklistEngine:
+    """
+    Get the checklist engine, rebuilt whenever the Top Shot data is reloaded.
+    """
+    global ENGINE
+
+    sources = (TS_PROVIDER.set_checklists, TS_PROVIDER.team_checklists)
+    engine = ENGINE
+    if engine is not None and engine.sources[0] is sources[0] and engine.sources[1] is sources[1]:
+        return engine
+
+    with ENGINE_LOCK:
+        if ENGINE is None or ENGINE.sources[0] is not sources[0] or ENGINE.sources[1] is not sources[1]:
+            ENGINE = ChecklistEngine(*sources)
+        return ENGINE
 
 
 def check_sets_and_teams(plays):
-    complete_sets = []
-    complete_teams = []
-
-    for set in TS_PROVIDER.set_checklists:
-        set_id = int(set)
-        count = 0
-        for play in TS_PROVIDER.set_checklists[set]['moments']:
-            play_id = int(play)
-            if play_id in plays and set_id in plays[play_id]:
-                count += 1
-        if count == TS_PROVIDER.set_checklists[set]['count']:
-            complete_sets.append(TS_PROVIDER.set_checklists[set]['name'])
-
-    for team in TS_PROVIDER.team_checklists:
-        complete_team_sets = []
-        for series in TS_PROVIDER.team_checklists[team]['series']:
-            count = 0
-            for player in TS_PROVIDER.team_checklists[team]['series'][series]['players']:
-                found = False
-                for play_id in TS_PROVIDER.team_checklists[team]['series'][series]['players'][player]['plays']:
-                    if play_id in plays:
-                        found = True
-                        break
-                if found:
-                    count += 1
-
-            if count == TS_PROVIDER.team_checklists[team]['series'][series]['count']:
-                complete_team_sets.append(f"{team} {series}")
-
-        count = 0
-        for player in TS_PROVIDER.team_checklists[team]['contemporary']['players']:
-            found = False
-            for play_id in TS_PROVIDER.team_checklists[team]['contemporary']['players'][player]['plays']:
-                if play_id in plays:
-                    found = True
-                    break
-            if found:
-                count += 1
-
-        if count == TS_PROVIDER.team_checklists[team]['contemporary']['count']:
-            complete_team_sets.append(f"{team} contemporary")
-
-        count = 0
-        for player in TS_PROVIDER.team_checklists[team]['all']['players']:
-            found = False
-            for play_id in TS_PROVIDER.team_checklists[team]['all']['players'][player]['plays']:
-                if play_id in plays:
-                    found = True
-                    break
-            if found:
-                count += 1
-
-        if count == TS_PROVIDER.team_checklists[team]['all']['count']:
-            complete_team_sets.append(f"{team} all")
-
-        if len(complete_team_sets) > 0:
-            complete_teams.extend(complete_team_sets)
-
-    return complete_sets, complete_teams
+    return get_checklist_engine().get_complete(plays)
+
+
+def get_near_complete_checklists(plays, max_missing=2):
+    return get_checklist_engine().get_near_complete(plays, max_missing)
 
 
 if __name__ == '__main__':
@@ -73,3 +146,5 @@ if __name__ == '__main__':
         print(set)
     for team in teams:
         print(team)
+    for checklist_type, name, owned, count in get_near_complete_checklists(plays):
+        print(f"{name}: {owned}/{count}")
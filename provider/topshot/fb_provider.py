@@ -3,6 +3,7 @@ import json
 import os
 import pathlib
 from provider.nba.nba_provider import NBA_PROVIDER
+from provider.registry import REGISTRY
 from utils import parse_slash_date, to_slash_date
 
 
@@ -51,7 +52,7 @@ def load_fb_data():
     return result
 
 
-FB_PROVIDER = FastBreakProvider()
+FB_PROVIDER = REGISTRY.register('fastbreak', FastBreakProvider)
 
 
 if __name__ == '__main__':
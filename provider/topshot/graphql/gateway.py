@@ -0,0 +1,185 @@
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from gql import gql, Client, GraphQLRequest
+from gql.client import AsyncClientSession
+from graphql import DocumentNode
+from gql.transport.aiohttp import AIOHTTPTransport
+from gql.transport.exceptions import TransportQueryError
+
+TOPSHOT_GRAPHQL_URL = "https://public-api.nbatopshot.com/graphql"
+# requests per second sent to the Top Shot API by the whole process, and the burst allowed after idling
+TOPSHOT_RATE = 8.0
+TOPSHOT_BURST = 16
+TOPSHOT_TIMEOUT_SECONDS = 30
+
+
+class TokenBucket:
+    """
+    Async token bucket, `rate` tokens per second up to `burst` tokens.
+
+    Each caller reserves a token, possibly pushing the bucket negative, and sleeps until its token is refilled. Waiting
+    callers are served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
+
+
+class GraphQLGateway:
+    """
+    Process-wide access to a GraphQL API.
+
+    All queries share one keep-alive session, so connection and TLS setup are paid once per event loop instead of once
+    per call. Identical queries in flight at the same time are sent once and share the result, and every HTTP request
+    takes a token of one global rate limiter.
+
+    `execute_batch` sends several operations in one HTTP request when the endpoint accepts batched payloads, otherwise
+    it runs them concurrently over the shared session.
+    """
+
+    def __init__(self, url: str = TOPSHOT_GRAPHQL_URL, rate: float = TOPSHOT_RATE, burst: int = TOPSHOT_BURST,
+                 timeout: int = TOPSHOT_TIMEOUT_SECONDS, batching: bool = False):
+        self.url = url
+        self.timeout = timeout
+        self.batching = batching
+        self.limiter = TokenBucket(rate, burst)
+        # {query text: parsed document}, requests are built per call since they carry the variables
+        self.documents: Dict[str, DocumentNode] = {}
+        self.client: Optional[Client] = None
+        self.session: Optional[AsyncClientSession] = None
+        self.lock: Optional[asyncio.Lock] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        # {(query text, variables): task}
+        self.in_flight: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    def __check_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            # the session and tasks of a previous loop can not be used anymore
+            self.loop = loop
+            self.lock = asyncio.Lock()
+            self.client = None
+            self.session = None
+            self.in_flight = {}
+
+    async def __get_session(self) -> AsyncClientSession:
+        self.__check_loop()
+        if self.session is not None:
+            return self.session
+
+        async with self.lock:
+            if self.session is None:
+                transport = AIOHTTPTransport(url=self.url, timeout=self.timeout)
+                self.client = Client(transport=transport, fetch_schema_from_transport=False)
+                self.session = await self.client.connect_async()
+
+        return self.session
+
+    async def __reset_session(self, session: AsyncClientSession) -> None:
+        if self.session is not session:
+            return
+
+        client = self.client
+        self.client = None
+        self.session = None
+        try:
+            await client.close_async()
+        except Exception as err:
+            print(f"Failed to close GraphQL session: {err}")
+
+    def __get_document(self, query: str) -> DocumentNode:
+        document = self.documents.get(query)
+        if document is None:
+            document = gql(query).document
+            self.documents[query] = document
+
+        return document
+
+    async def __send(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        session = await self.__get_session()
+        await self.limiter.acquire()
+        try:
+            return await session.execute(GraphQLRequest(self.__get_document(query), variable_values=variables))
+        except TransportQueryError:
+            # the API answered with errors, the session is fine
+            raise
+        except Exception:
+            await self.__reset_session(session)
+            raise
+
+    async def execute(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Execute one operation, joining an identical operation already in flight.
+
+        :param: query: GraphQL query text
+        :param: variables: variable values of the query
+        :return: the data of the result
+        :raise: TransportQueryError if the API returned errors, any transport error otherwise
+        """
+        self.__check_loop()
+        variables = variables or {}
+        key = (query, json.dumps(variables, sort_keys=True))
+
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.__send(query, variables))
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self.__forget(key, done))
+
+        # a cancelled caller must not cancel the request the other callers wait for
+        return await asyncio.shield(task)
+
+    def __forget(self, key: Tuple[str, str], task: asyncio.Task) -> None:
+        if self.in_flight.get(key) is task:
+            self.in_flight.pop(key)
+        if not task.cancelled():
+            # the error is raised to the callers, mark it retrieved when no caller is left
+            task.exception()
+
+    async def execute_batch(self, operations: List[Tuple[str, Dict[str, Any]]], return_exceptions: bool = False) \
+            -> List[Any]:
+        """
+        Execute several operations.
+
+        :param: operations: list of (query text, variables)
+        :param: return_exceptions: return the error of a failed operation in its place instead of raising it
+        :return: list of the data of each result, in the order of the operations
+        """
+        if not self.batching or len(operations) <= 1:
+            return await asyncio.gather(*[self.execute(query, variables) for query, variables in operations],
+                                        return_exceptions=return_exceptions)
+
+        session = await self.__get_session()
+        requests = [GraphQLRequest(self.__get_document(query), variable_values=variables)
+                    for query, variables in operations]
+        await self.limiter.acquire()
+        try:
+            return await session.execute_batch(requests)
+        except Exception as err:
+            if not isinstance(err, TransportQueryError):
+                await self.__reset_session(session)
+            if return_exceptions:
+                return [err] * len(operations)
+            raise
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.__reset_session(self.session)
+
+
+TOPSHOT_GRAPHQL = GraphQLGateway()
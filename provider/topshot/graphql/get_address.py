@@ -1,76 +1,51 @@
-from gql import gql, Client
-from gql.transport.aiohttp import AIOHTTPTransport
-from gql.transport.exceptions import TransportQueryError
-
+import asyncio
 
-async def get_flow_address(topshot_username):
-    # Select your transport with a defined url endpoint
-    transport = AIOHTTPTransport(url="https://public-api.nbatopshot.com/graphql")
+from gql.transport.exceptions import TransportQueryError
 
-    # Create a GraphQL client using the defined transport
-    client = Client(transport=transport, fetch_schema_from_transport=False)
+from provider.topshot.graphql.gateway import TOPSHOT_GRAPHQL
 
-    query = gql(
-        """
-        query ProfilePage_getUserProfileByUsername($input: getUserProfileByUsernameInput!) {
-            getUserProfileByUsername(input: $input) {
-                publicInfo {
-                  ...UserFragment
-                }
+# one query for both lookups, concurrent lookups of the same user share one request
+USER_PROFILE_QUERY = """
+    query ProfilePage_getUserProfileByUsername($input: getUserProfileByUsernameInput!) {
+        getUserProfileByUsername(input: $input) {
+            publicInfo {
+              ...UserFragment
             }
         }
-    
-        fragment UserFragment on UserPublicInfo {
-            username
-            flowAddress
-        }
-    """
-    )
+    }
+
+    fragment UserFragment on UserPublicInfo {
+        username
+        flowAddress
+        favoriteTeamID
+    }
+"""
 
-    # Execute the query on the transport
+
+async def get_user_public_info(topshot_username):
     try:
-        result = await client.execute_async(query, variable_values={"input": {"username": topshot_username}})
+        result = await TOPSHOT_GRAPHQL.execute(USER_PROFILE_QUERY, {"input": {"username": topshot_username}})
     except TransportQueryError:
         return None
 
-    return result['getUserProfileByUsername']['publicInfo']['flowAddress']
+    return result['getUserProfileByUsername']['publicInfo']
 
 
-async def get_flow_account_info(topshot_username):
-    # Select your transport with a defined url endpoint
-    transport = AIOHTTPTransport(url="https://public-api.nbatopshot.com/graphql")
+async def get_flow_address(topshot_username):
+    public_info = await get_user_public_info(topshot_username)
+    if public_info is None:
+        return None
 
-    # Create a GraphQL client using the defined transport
-    client = Client(transport=transport, fetch_schema_from_transport=False)
+    return public_info['flowAddress']
 
-    query = gql(
-        """
-        query ProfilePage_getUserProfileByUsername($input: getUserProfileByUsernameInput!) {
-            getUserProfileByUsername(input: $input) {
-                publicInfo {
-                  ...UserFragment
-                }
-            }
-        }
-    
-        fragment UserFragment on UserPublicInfo {
-            username
-            flowAddress
-            favoriteTeamID
-        }
-    """
-    )
 
-    # Execute the query on the transport
-    try:
-        result = await client.execute_async(query, variable_values={"input": {"username": topshot_username}})
-    except TransportQueryError:
+async def get_flow_account_info(topshot_username):
+    public_info = await get_user_public_info(topshot_username)
+    if public_info is None:
         return None, None, None
 
-    return result['getUserProfileByUsername']['publicInfo']['username'], \
-           result['getUserProfileByUsername']['publicInfo']['flowAddress'], \
-           result['getUserProfileByUsername']['publicInfo']['favoriteTeamID']
+    return public_info['username'], public_info['flowAddress'], public_info['favoriteTeamID']
 
 
 if __name__ == '__main__':
-    print(get_flow_address('MingDynastyVase'))
+    print(asyncio.run(get_flow_address('MingDynastyVase')))
@@ -1,7 +1,39 @@
+import asyncio
 import time
 
-from gql import gql, Client
-from gql.transport.aiohttp import AIOHTTPTransport
+from provider.topshot.graphql.gateway import TOPSHOT_GRAPHQL
+
+# listings returned per search, a full page may leave out listed plays
+LISTINGS_LIMIT = 12
+
+LISTINGS_QUERY = """
+    query SearchMomentListingsDefault($byPlayers: [ID], $byTagNames: [String!], $byTeams: [ID], $byPrice: PriceRangeFilterInput, $orderBy: MomentListingSortType, $byGameDate: DateRangeFilterInput, $byCreatedAt: DateRangeFilterInput, $byListingType: [MomentListingType], $bySets: [ID], $bySeries: [ID], $bySetVisuals: [VisualIdType], $byPrimaryPlayerPosition: [PlayerPosition], $bySerialNumber: IntegerRangeFilterInput, $searchInput: BaseSearchInput!) {
+      searchMomentListings(input: {filters: {byPlayers: $byPlayers, byTagNames: $byTagNames, byGameDate: $byGameDate, byCreatedAt: $byCreatedAt, byTeams: $byTeams, byPrice: $byPrice, byListingType: $byListingType, byPrimaryPlayerPosition: $byPrimaryPlayerPosition, bySets: $bySets, bySeries: $bySeries, bySetVisuals: $bySetVisuals, bySerialNumber: $bySerialNumber}, sortBy: $orderBy, searchInput: $searchInput}) {
+        data {
+          searchSummary {
+            data {
+              ... on MomentListings {
+                data {
+                  ... on MomentListing {
+                    play {
+                      flowID
+                      stats {
+                        playerName
+                        playerID
+                      }
+                    }
+                    priceRange {
+                      min
+                    }
+                  }
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+"""
 
 
 def get_low_asks(result_dict):
@@ -19,48 +51,24 @@ def get_low_asks(result_dict):
 
 
 async def get_listing_prices(set_id, player_ids, team_ids):
-    # Select your transport with a defined url endpoint
-    transport = AIOHTTPTransport(url="https://public-api.nbatopshot.com/graphql")
+    prices, _ = await get_listing_page(set_id, player_ids, team_ids)
+    return prices
 
-    # Create a GraphQL client using the defined transport
-    client = Client(transport=transport, fetch_schema_from_transport=False)
 
+async def get_listing_page(set_id, player_ids, team_ids):
+    """
+    :param: set_id: set uuid
+    :param: player_ids: filter by these players
+    :param: team_ids: filter by these teams
+    :return: the low asks in {play flow id: price}, and whether the page was full, a play missing from a full page
+             may still be listed
+    """
     if len(player_ids) == 0:
         print("{}: Set: {}, Teams: {}...".format(time.strftime("%H:%M:%S", time.localtime()), set_id, team_ids))
     else:
         print("{}: Set: {}, Plays: {}...".format(time.strftime("%H:%M:%S", time.localtime()), set_id, player_ids))
 
-    query = gql("""
-        query SearchMomentListingsDefault($byPlayers: [ID], $byTagNames: [String!], $byTeams: [ID], $byPrice: PriceRangeFilterInput, $orderBy: MomentListingSortType, $byGameDate: DateRangeFilterInput, $byCreatedAt: DateRangeFilterInput, $byListingType: [MomentListingType], $bySets: [ID], $bySeries: [ID], $bySetVisuals: [VisualIdType], $byPrimaryPlayerPosition: [PlayerPosition], $bySerialNumber: IntegerRangeFilterInput, $searchInput: BaseSearchInput!) {
-          searchMomentListings(input: {filters: {byPlayers: $byPlayers, byTagNames: $byTagNames, byGameDate: $byGameDate, byCreatedAt: $byCreatedAt, byTeams: $byTeams, byPrice: $byPrice, byListingType: $byListingType, byPrimaryPlayerPosition: $byPrimaryPlayerPosition, bySets: $bySets, bySeries: $bySeries, bySetVisuals: $bySetVisuals, bySerialNumber: $bySerialNumber}, sortBy: $orderBy, searchInput: $searchInput}) {
-            data {
-              searchSummary {
-                data {
-                  ... on MomentListings {
-                    data {
-                      ... on MomentListing {
-                        play {
-                          flowID
-                          stats {
-                            playerName
-                            playerID
-                          }
-                        }
-                        priceRange {
-                          min
-                        }
-                      }
-                    }
-                  }
-                }
-              }
-            }
-          }
-        }
-    """
-    )
-
-    # Execute the query on the transport
+    # Execute the query on the shared gateway
     input_variables = {
       "byPrice": { "min": None, "max": None },
       "byPower": { "min": None, "max": None },
@@ -77,15 +85,14 @@ async def get_listing_prices(set_id, player_ids, team_ids):
       "byTagNames": [],
       "byTeams": team_ids,
       "byListingType": [ "BY_USERS" ],
-      "searchInput": { "pagination": { "cursor": "", "direction": "RIGHT", "limit": 12 } },
+      "searchInput": { "pagination": { "cursor": "", "direction": "RIGHT", "limit": LISTINGS_LIMIT } },
       "orderBy": "UPDATED_AT_DESC"
     }
-    result = await client.execute_async(query, variable_values=input_variables)
-
-    prices = get_low_asks(result)
+    result = await TOPSHOT_GRAPHQL.execute(LISTINGS_QUERY, input_variables)
 
-    return prices
+    listings = result['searchMomentListings']['data']['searchSummary']['data']['data']
+    return get_low_asks(result), len(listings) >= LISTINGS_LIMIT
 
 
 if __name__ == '__main__':
-    print(get_listing_prices("208ae30a-a4fe-42d4-9e51-e6fd1ad2a7a9", ["203482"]))
+    print(asyncio.run(get_listing_prices("208ae30a-a4fe-42d4-9e51-e6fd1ad2a7a9", ["203482"], [])))
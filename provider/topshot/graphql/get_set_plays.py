@@ -1,57 +1,49 @@
 import asyncio
 
-from gql import gql, Client
-from gql.transport.aiohttp import AIOHTTPTransport
 from gql.transport.exceptions import TransportQueryError
 
-
-async def get_set_plays(set_id):
-    # Select your transport with a defined url endpoint
-    transport = AIOHTTPTransport(url="https://public-api.nbatopshot.com/graphql")
-
-    # Create a GraphQL client using the defined transport
-    client = Client(transport=transport, fetch_schema_from_transport=False)
-
-    query = gql(
-        """
-        query getSet ($input: GetSetInput!) {
-            getSet (input: $input) {
-                set {
+from provider.topshot.graphql.gateway import TOPSHOT_GRAPHQL
+
+SET_QUERY = """
+    query getSet ($input: GetSetInput!) {
+        getSet (input: $input) {
+            set {
+                id
+                sortID
+                version
+                flowId
+                flowName
+                flowSeriesNumber
+                flowLocked
+                setVisualId
+                plays {
                     id
-                    sortID
                     version
-                    flowId
-                    flowName
-                    flowSeriesNumber
-                    flowLocked
-                    setVisualId
-                    plays {
-                        id
-                        version
-                        flowID
-                        sortID
-                        status
-                        stats {
-                            playerID
-                            playerName
-                            firstName
-                            lastName
-                            jerseyNumber
-                            teamAtMoment
-                            playCategory
-                            quarter
-                            dateOfMoment
-                        }
+                    flowID
+                    sortID
+                    status
+                    stats {
+                        playerID
+                        playerName
+                        firstName
+                        lastName
+                        jerseyNumber
+                        teamAtMoment
+                        playCategory
+                        quarter
+                        dateOfMoment
                     }
                 }
             }
         }
-    """
-    )
+    }
+"""
 
-    # Execute the query on the transport
+
+async def get_set_plays(set_id):
+    # Execute the query on the shared gateway
     try:
-        result = await client.execute_async(query, variable_values={"input": {"setID": set_id}})
+        result = await TOPSHOT_GRAPHQL.execute(SET_QUERY, {"input": {"setID": set_id}})
     except Exception as err:
         return None
 
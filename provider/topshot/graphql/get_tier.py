@@ -1,7 +1,35 @@
 import asyncio
 
-from gql import gql, Client
-from gql.transport.aiohttp import AIOHTTPTransport
+from provider.topshot.graphql.gateway import TOPSHOT_GRAPHQL
+
+LISTING_TIERS_QUERY = """
+    query SearchMomentListingsDefault($byPlayers: [ID], $byTagNames: [String!], $byTeams: [ID], $byPrice: PriceRangeFilterInput, $orderBy: MomentListingSortType, $byGameDate: DateRangeFilterInput, $byCreatedAt: DateRangeFilterInput, $byListingType: [MomentListingType], $bySets: [ID], $bySeries: [ID], $bySetVisuals: [VisualIdType], $byPrimaryPlayerPosition: [PlayerPosition], $bySerialNumber: IntegerRangeFilterInput, $searchInput: BaseSearchInput!) {
+      searchMomentListings(input: {filters: {byPlayers: $byPlayers, byTagNames: $byTagNames, byGameDate: $byGameDate, byCreatedAt: $byCreatedAt, byTeams: $byTeams, byPrice: $byPrice, byListingType: $byListingType, byPrimaryPlayerPosition: $byPrimaryPlayerPosition, bySets: $bySets, bySeries: $bySeries, bySetVisuals: $bySetVisuals, bySerialNumber: $bySerialNumber}, sortBy: $orderBy, searchInput: $searchInput}) {
+        data {
+          searchSummary {
+            data {
+              ... on MomentListings {
+                data {
+                  ... on MomentListing {
+                    play {
+                      flowID
+                      stats {
+                        playerName
+                        playerID
+                      }
+                    }
+                    set {
+                      setVisualId
+                    }
+                  }
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+"""
 
 
 def get_tiers(graphql_response):
@@ -15,43 +43,7 @@ def get_tiers(graphql_response):
 
 
 async def get_listing_tiers(series, player_id):
-    # Select your transport with a defined url endpoint
-    transport = AIOHTTPTransport(url="https://public-api.nbatopshot.com/graphql")
-
-    # Create a GraphQL client using the defined transport
-    client = Client(transport=transport, fetch_schema_from_transport=False)
-
-    query = gql("""
-        query SearchMomentListingsDefault($byPlayers: [ID], $byTagNames: [String!], $byTeams: [ID], $byPrice: PriceRangeFilterInput, $orderBy: MomentListingSortType, $byGameDate: DateRangeFilterInput, $byCreatedAt: DateRangeFilterInput, $byListingType: [MomentListingType], $bySets: [ID], $bySeries: [ID], $bySetVisuals: [VisualIdType], $byPrimaryPlayerPosition: [PlayerPosition], $bySerialNumber: IntegerRangeFilterInput, $searchInput: BaseSearchInput!) {
-          searchMomentListings(input: {filters: {byPlayers: $byPlayers, byTagNames: $byTagNames, byGameDate: $byGameDate, byCreatedAt: $byCreatedAt, byTeams: $byTeams, byPrice: $byPrice, byListingType: $byListingType, byPrimaryPlayerPosition: $byPrimaryPlayerPosition, bySets: $bySets, bySeries: $bySeries, bySetVisuals: $bySetVisuals, bySerialNumber: $bySerialNumber}, sortBy: $orderBy, searchInput: $searchInput}) {
-            data {
-              searchSummary {
-                data {
-                  ... on MomentListings {
-                    data {
-                      ... on MomentListing {
-                        play {
-                          flowID
-                          stats {
-                            playerName
-                            playerID
-                          }
-                        }
-                        set {
-                          setVisualId
-                        }
-                      }
-                    }
-                  }
-                }
-              }
-            }
-          }
-        }
-    """
-                )
-
-    # Execute the query on the transport
+    # Execute the query on the shared gateway
     input_variables = {
         "byPrice": {"min": None, "max": None},
         "byPower": {"min": None, "max": None},
@@ -71,7 +63,7 @@ async def get_listing_tiers(series, player_id):
         "searchInput": {"pagination": {"cursor": "", "direction": "RIGHT", "limit": 12}},
         "orderBy": "UPDATED_AT_DESC"
     }
-    result = await client.execute_async(query, variable_values=input_variables)
+    result = await TOPSHOT_GRAPHQL.execute(LISTING_TIERS_QUERY, input_variables)
 
     tiers = get_tiers(result)
 
@@ -0,0 +1,4 @@
+from provider.topshot.ts_provider import build_snapshot
+
+if __name__ == '__main__':
+    build_snapshot()
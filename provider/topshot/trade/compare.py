@@ -1,10 +1,9 @@
 import asyncio
-import random
 import time
 
 from provider.topshot.cadence.flow_collections import get_collection_for_trade
 from provider.topshot.graphql.get_address import get_flow_address
-from provider.topshot.graphql.get_price import get_listing_prices
+from provider.topshot.trade.price_resolver import PRICE_RESOLVER
 from provider.topshot.ts_provider import TS_PROVIDER
 
 
@@ -57,53 +56,7 @@ def remove_dupes(c1, c2, series_or_set):
 
 
 async def get_lowest_listing_price(collection):
-    for set_id in collection:
-        set_uuid = TS_PROVIDER.set_info[int(set_id)]["id"]
-        play_ids = list(collection[set_id].keys())
-
-        while len(play_ids) > 0:
-            unresolved_play_ids = []
-            start = 0
-            while start < len(play_ids):
-                upper_bound = min(start + 12, len(play_ids))
-
-                player_ids = [TS_PROVIDER.play_info[int(play_id)][0]['playerId'] for play_id in play_ids[start:upper_bound]]
-
-                team_ids = []
-
-                if None in player_ids:
-                    player_ids = [player_id for player_id in player_ids if player_id is not None]
-                    if len(player_ids) == 0:  # only team moments
-                        team_ids = [
-                            str(TS_PROVIDER.team_name_to_id[collection[set_id][play_id]['FullName']]['id'])
-                            for play_id in play_ids[start:upper_bound]
-                        ]
-
-                time.sleep(0.3)
-                listing_prices = await get_listing_prices(set_uuid, player_ids, team_ids)
-
-                if len(listing_prices) == 0:
-                    print("Empty response, retry after 0.3s")
-                    time.sleep(0.25)
-                    continue
-
-                for play_id in play_ids[start:upper_bound]:
-                    play_id_int = int(play_id)
-                    if play_id_int in listing_prices:
-                        collection[set_id][play_id]['LowAsk'] = listing_prices[play_id_int]
-                    else:
-                        unresolved_play_ids.append(play_id)
-
-                start = start + 12
-
-            if len(unresolved_play_ids) == len(play_ids):
-                play_ids = []
-                for play_id in unresolved_play_ids:
-                    play_ids.append(play_id)
-                    play_ids.append(play_id)
-            else:
-                random.shuffle(unresolved_play_ids)
-                play_ids = unresolved_play_ids
+    await PRICE_RESOLVER.resolve(collection)
 
 
 async def get_account_collection(topshot_username):
@@ -118,15 +71,17 @@ async def get_account_collection(topshot_username):
 async def compare_moments(ts_user1, ts_user2, series_or_set):
     c1, c2 = await asyncio.gather(*[get_account_collection(ts_user1), get_account_collection(ts_user2)])
     remove_dupes(c1, c2, series_or_set)
-    await asyncio.gather(*[get_lowest_listing_price(c1)])
-    await asyncio.gather(*[get_lowest_listing_price(c2)])
+    await PRICE_RESOLVER.resolve(c1, c2)
 
     return c1, c2
 
 
 if __name__ == '__main__':
-    loop = asyncio.get_event_loop()
-    c1, c2 = loop.run_until_complete(compare_moments("MingDynastyVase", "ubabu", 4))
+    loop = asyncio.new_event_loop()
+    for attempt in ['cold', 'cached']:
+        start = time.time()
+        c1, c2 = loop.run_until_complete(compare_moments("MingDynastyVase", "ubabu", 4))
+        print(f"{attempt} compare: {time.time() - start:.1f}s")
     loop.close()
 
     print(c1)
@@ -0,0 +1,206 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from provider.topshot.graphql.get_price import get_listing_page
+from provider.topshot.ts_provider import TS_PROVIDER
+
+# the listing search returns at most 12 plays, a play missing from a page is retried in smaller pages
+PAGE_SIZES = [12, 4, 1]
+PAGE_CONCURRENCY = 16
+PRICE_TTL_SECONDS = 5 * 60
+UNLISTED_TTL_SECONDS = 60
+CACHE_SIZE = 50000
+NOT_AVAILABLE = 'N/A'
+
+
+class ListingPriceCache:
+    """
+    Process-wide LRU cache of the low ask of each (set, play), shared by all trade requests.
+
+    Low asks expire after `ttl` seconds, plays found without any listing after `unlisted_ttl` seconds. The least
+    recently used entries are dropped beyond `max_size` entries.
+    """
+
+    def __init__(self, max_size: int = CACHE_SIZE, ttl: float = PRICE_TTL_SECONDS,
+                 unlisted_ttl: float = UNLISTED_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.unlisted_ttl = unlisted_ttl
+        # {(set_id, play_id): (low ask, expires_at)}
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, set_id: int, play_id: int) -> Tuple[bool, Optional[int]]:
+        """
+        :param: set_id: set flow id
+        :param: play_id: play flow id
+        :return: whether a fresh entry is cached, and the low ask, None if the play has no listing
+        """
+        key = (set_id, play_id)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return False, None
+
+            if entry[1] < time.time():
+                self.entries.pop(key)
+                return False, None
+
+            self.entries.move_to_end(key)
+            return True, entry[0]
+
+    def put(self, set_id: int, play_id: int, price: Optional[int]) -> None:
+        """
+        :param: set_id: set flow id
+        :param: play_id: play flow id
+        :param: price: the low ask, None if the play has no listing
+        """
+        key = (set_id, play_id)
+        ttl = self.ttl if price is not None else self.unlisted_ttl
+        with self.lock:
+            self.entries[key] = (price, time.time() + ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self.entries = OrderedDict()
+
+
+LISTING_PRICE_CACHE = ListingPriceCache()
+
+
+class PriceResolver:
+    """
+    Resolve the low asks of the plays of trade collections.
+
+    Cached plays cost no request. The other plays are grouped by set into pages of players, or of teams for team
+    moments, and the pages of all sets and of all collections are requested concurrently. Requests are spaced by the
+    token bucket of the shared Top Shot GraphQL gateway. A play missing from its page, or whose page failed, is
+    retried in smaller pages a bounded number of times, then reported as 'N/A'. Only a play missing from a page which
+    succeeded without reaching the listing limit is cached as unlisted.
+    """
+
+    def __init__(self, cache: ListingPriceCache = LISTING_PRICE_CACHE, page_sizes: List[int] = PAGE_SIZES,
+                 concurrency: int = PAGE_CONCURRENCY):
+        self.cache = cache
+        self.page_sizes = page_sizes
+        self.concurrency = concurrency
+
+    async def resolve(self, *collections) -> None:
+        """
+        Set the 'LowAsk' of every play of the collections, in place.
+
+        :param: collections: collections in {set_id: {play_id: {'FullName': name, 'Count': count}}}
+        """
+        # {(set_id, play_id): low ask or None}
+        prices: Dict[Tuple[int, int], Optional[int]] = {}
+        # {set_id: {play_id: full name}} of the plays to request
+        missing: Dict[int, Dict[int, str]] = {}
+
+        for collection in collections:
+            for set_id, plays in collection.items():
+                for play_id, play in plays.items():
+                    key = (int(set_id), int(play_id))
+                    if key in prices or key[0] in missing and key[1] in missing[key[0]]:
+                        continue
+
+                    found, price = self.cache.get(*key)
+                    if found:
+                        prices[key] = price
+                    else:
+                        missing.setdefault(key[0], {})[key[1]] = play['FullName']
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # plays not proven unlisted in the last round: their page failed or was full, or they fit no page
+        failed = set()
+        for page_size in self.page_sizes:
+            if len(missing) == 0:
+                break
+
+            pages = [page for set_id, plays in missing.items() for page in self.__pages(set_id, plays, page_size)]
+            paged = {(page[0], play_id) for page in pages for play_id in page[4]}
+            failed = {(set_id, play_id) for set_id, plays in missing.items() for play_id in plays} - paged
+            await asyncio.gather(*[self.__load_page(semaphore, prices, failed, *page) for page in pages])
+
+            missing = {
+                set_id: {play_id: name for play_id, name in plays.items() if (set_id, play_id) not in prices}
+                for set_id, plays in missing.items()
+            }
+            missing = {set_id: plays for set_id, plays in missing.items() if len(plays) > 0}
+
+        # plays still missing from a successful page which was not full have no listing, the others prove nothing
+        for set_id, plays in missing.items():
+            for play_id in plays:
+                if (set_id, play_id) not in failed:
+                    self.cache.put(set_id, play_id, None)
+
+        for collection in collections:
+            for set_id, plays in collection.items():
+                for play_id, play in plays.items():
+                    price = prices.get((int(set_id), int(play_id)))
+                    play['LowAsk'] = price if price is not None else NOT_AVAILABLE
+
+    @staticmethod
+    def __pages(set_id: int, plays: Dict[int, str], page_size: int) -> List[Tuple[int, str, List, List, List]]:
+        """
+        :return: list of (set_id, set uuid, player ids, team ids, play ids), a page filters either by players or by
+                 teams
+        """
+        set_uuid = TS_PROVIDER.set_info[set_id]['id']
+        player_ids = []
+        team_ids = []
+        # {(is team, player or team id): [play_id]}
+        filter_plays: Dict[Tuple[bool, str], List[int]] = {}
+
+        for play_id, name in plays.items():
+            play_info = TS_PROVIDER.play_info.get(play_id)
+            if play_info is None:
+                continue
+
+            player_id = play_info[0]['playerId']
+            if player_id is not None:
+                if (False, player_id) not in filter_plays:
+                    player_ids.append(player_id)
+                filter_plays.setdefault((False, player_id), []).append(play_id)
+            elif name in TS_PROVIDER.team_name_to_id:
+                team_id = str(TS_PROVIDER.team_name_to_id[name]['id'])
+                if (True, team_id) not in filter_plays:
+                    team_ids.append(team_id)
+                filter_plays.setdefault((True, team_id), []).append(play_id)
+
+        pages = []
+        for ids, is_team in [(player_ids, False), (team_ids, True)]:
+            for start in range(0, len(ids), page_size):
+                page_ids = ids[start:start + page_size]
+                page_plays = [play_id for filter_id in page_ids for play_id in filter_plays[(is_team, filter_id)]]
+                pages.append((set_id, set_uuid, [] if is_team else page_ids, page_ids if is_team else [], page_plays))
+
+        return pages
+
+    async def __load_page(self, semaphore: asyncio.Semaphore, prices: Dict[Tuple[int, int], Optional[int]],
+                          failed: set, set_id: int, set_uuid: str, player_ids: List, team_ids: List,
+                          play_ids: List[int]) -> None:
+        async with semaphore:
+            try:
+                listing_prices, full = await get_listing_page(set_uuid, player_ids, team_ids)
+            except Exception as err:
+                print(f"Failed to load listing prices of set {set_id}: {err}")
+                failed.update([(set_id, play_id) for play_id in play_ids])
+                return
+
+        # the page may return other plays of the same players, keep them for later requests
+        for play_id, price in listing_prices.items():
+            self.cache.put(set_id, play_id, price)
+            prices[(set_id, play_id)] = price
+
+        if full:
+            # the listings of the missing plays may be cut off by the page limit
+            failed.update([(set_id, play_id) for play_id in play_ids if play_id not in listing_prices])
+
+
+PRICE_RESOLVER = PriceResolver()
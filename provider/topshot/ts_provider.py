@@ -1,25 +1,250 @@
+import hashlib
 import json
 import os
 import pathlib
+import pickle
+import threading
+
+from constants import MOMENT_TIER_POINTS, PLAY_TYPE_COLUMNS
+
+RESOURCE_DIR = os.path.join(pathlib.Path(__file__).parent.resolve(), "moments/resource")
+SNAPSHOT_PATH = os.path.join(RESOURCE_DIR, "ts_snapshot.pickle")
+SNAPSHOT_SOURCES = [
+    os.path.join(RESOURCE_DIR, "enriched_plays.json"),
+    os.path.join(RESOURCE_DIR, "player_moments.json"),
+    os.path.join(RESOURCE_DIR, "sets.json"),
+    os.path.join(RESOURCE_DIR, "set_checklists.json"),
+    os.path.join(RESOURCE_DIR, "teams.json"),
+    os.path.join(RESOURCE_DIR, "team_checklists.json"),
+    os.path.join(pathlib.Path(__file__).parent.resolve(), "../../provider/nba/data/current_nba_players.json"),
+]
+SNAPSHOT_VERSION = 4
+
+# the moment fields read at runtime, the snapshot drops the others
+PLAY_FIELDS = ['setFlowId', 'playerId', 'tier', 'playType', 'badges', 'series']
 
 
 class TopshotProvider:
+    """
+    Top Shot reference data: plays, player moments, sets, teams and checklists.
+
+    The data is loaded on first access from a binary snapshot of the JSON resources, the snapshot is rebuilt
+    whenever one of the JSON sources changed since it was written.
+    """
+
     def __init__(self):
-        self.play_info = {}
-        self.player_moments = {}
-        self.set_info = {}
-        self.set_checklists = {}
-        self.team_name_to_id = {}
-        self.team_checklists = {}
-        self.reload()
+        self.data = None
+        self.lock = threading.Lock()
 
     def reload(self):
-        self.play_info = load_enriched_plays()
-        self.player_moments = load_player_moment_info()
-        self.set_info = load_set_data()
-        self.set_checklists = load_set_checklists()
-        self.team_name_to_id = load_team_data()
-        self.team_checklists = load_team_checklists()
+        data = load_snapshot()
+        with self.lock:
+            self.data = data
+
+    def __get(self, key):
+        if self.data is None:
+            with self.lock:
+                if self.data is None:
+                    self.data = load_snapshot()
+
+        return self.data[key]
+
+    @property
+    def play_info(self):
+        return self.__get('play_info')
+
+    @property
+    def player_moments(self):
+        return self.__get('player_moments')
+
+    @property
+    def set_info(self):
+        return self.__get('set_info')
+
+    @property
+    def set_checklists(self):
+        return self.__get('set_checklists')
+
+    @property
+    def team_name_to_id(self):
+        return self.__get('team_name_to_id')
+
+    @property
+    def team_checklists(self):
+        return self.__get('team_checklists')
+
+    @property
+    def badge_players(self):
+        """
+        :return: {(series, badge): {player_id}}, the players holding the badge in the series
+        """
+        return self.__get('player_index')['badge_players']
+
+    @property
+    def set_players(self):
+        """
+        :return: {set flow id: {player_id}}
+        """
+        return self.__get('player_index')['set_players']
+
+    @property
+    def known_player_ids(self):
+        """
+        :return: ids of all players with moments
+        """
+        return self.__get('player_index')['known_player_ids']
+
+    @property
+    def collection_plays(self):
+        """
+        :return: {(play_id, set_flow_id): collection record}, see build_collection_plays
+        """
+        return self.__get('collection_plays')
+
+    @property
+    def collection_plays_hash(self):
+        """
+        :return: content hash of the data collections are built from, it only changes when a collection may change
+        """
+        return self.__get('collection_plays_hash')
+
+
+def source_signatures():
+    signatures = {}
+    for path in SNAPSHOT_SOURCES:
+        stat = os.stat(path)
+        signatures[os.path.normpath(path)] = (stat.st_mtime_ns, stat.st_size)
+
+    return signatures
+
+
+def build_snapshot():
+    """
+    Compile the JSON resources into the binary snapshot loaded at runtime.
+
+    :return: the snapshot data
+    """
+    play_info = {
+        flow_id: [{field: moment[field] for field in PLAY_FIELDS} for moment in moments]
+        for flow_id, moments in load_enriched_plays().items()
+    }
+    player_moments = load_player_moment_info()
+    collection_plays = build_collection_plays(play_info, player_moments)
+    data = {
+        'play_info': play_info,
+        'player_moments': player_moments,
+        'player_index': build_player_index(player_moments),
+        'collection_plays': collection_plays,
+        'collection_plays_hash': hash_collection_plays(play_info, collection_plays),
+        'set_info': load_set_data(),
+        'set_checklists': load_set_checklists(),
+        'team_name_to_id': load_team_data(),
+        'team_checklists': load_team_checklists(),
+    }
+
+    snapshot = {
+        'version': SNAPSHOT_VERSION,
+        'sources': source_signatures(),
+        'data': data,
+    }
+    tmp_path = SNAPSHOT_PATH + ".tmp"
+    try:
+        with open(tmp_path, 'wb') as snapshot_file:
+            pickle.dump(snapshot, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, SNAPSHOT_PATH)
+    except OSError as err:
+        print(f"Failed to write Top Shot snapshot: {err}")
+
+    return data
+
+
+def build_player_index(player_moments):
+    """
+    Build the inverted indexes used by the player filters.
+
+    :param: player_moments: {player_id: moment info of the player}
+    :return: a dictionary of {'badge_players', 'set_players', 'known_player_ids'}
+    """
+    badge_players = {}
+    set_players = {}
+
+    for player_id, moments in player_moments.items():
+        for series, badges in moments['badges'].items():
+            for badge, owned in badges.items():
+                if owned:
+                    badge_players.setdefault((series, badge), set()).add(player_id)
+
+        for set_id in moments['sets']:
+            set_players.setdefault(set_id, set()).add(player_id)
+
+    return {
+        'badge_players': badge_players,
+        'set_players': set_players,
+        'known_player_ids': frozenset(player_moments.keys()),
+    }
+
+
+def build_collection_plays(play_info, player_moments):
+    """
+    Resolve every (play, set) into the record used to build VGN collections.
+
+    A record is a (player_id, column, tier points, badge count, debut count) tuple, the player id is None when the
+    moment does not count for any NBA player. Moments of an unknown tier or play type are left out.
+
+    :param: play_info: {play_id: list of the moments of the play, one per set}
+    :param: player_moments: {player_id: moment info of the player}
+    :return: a dictionary of {(play_id, set_flow_id): record}
+    """
+    result = {}
+    for play_id, moments in play_info.items():
+        for moment in moments:
+            key = (play_id, moment['setFlowId'])
+            if key in result:
+                continue  # the first moment of a set wins
+            if moment['tier'] not in MOMENT_TIER_POINTS or moment['playType'] not in PLAY_TYPE_COLUMNS:
+                continue
+
+            player_id = moment['playerId']
+            if player_id is None or player_id == 0 or not player_moments.get(player_id, {}).get('isNBA'):
+                player_id = None
+
+            debuts = sum([1 for badge in moment['badges'] if badge == 'TSD'])
+            result[key] = (
+                player_id,
+                PLAY_TYPE_COLUMNS[moment['playType']],
+                MOMENT_TIER_POINTS[moment['tier']],
+                len(moment['badges']) - debuts,
+                debuts,
+            )
+
+    return result
+
+
+def hash_collection_plays(play_info, collection_plays):
+    """
+    :param: play_info: {play_id: list of the moments of the play, one per set}
+    :param: collection_plays: {(play_id, set_flow_id): record}, see build_collection_plays
+    :return: sha1 of the known plays and of the collection records, independent of where the sources are stored
+    """
+    content = repr((sorted(play_info.keys()), sorted(collection_plays.items())))
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def load_snapshot():
+    """
+    Load the binary snapshot, rebuilding it first if it is missing or older than its JSON sources.
+
+    :return: the snapshot data
+    """
+    try:
+        with open(SNAPSHOT_PATH, 'rb') as snapshot_file:
+            snapshot = pickle.load(snapshot_file)
+        if snapshot.get('version') == SNAPSHOT_VERSION and snapshot.get('sources') == source_signatures():
+            return snapshot['data']
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass
+
+    return build_snapshot()
 
 
 def load_set_data():
@@ -1,4 +1,7 @@
+import threading
+
 import mysql.connector.pooling
+from mysql.connector.constants import ClientFlag
 
 from repository import DB_USERNAME, DB_PASSWORD, MYSQL_ENDPOINT_URL
 
@@ -6,7 +9,29 @@ config = {
     'user': DB_USERNAME,
     'password': DB_PASSWORD,
     'host': MYSQL_ENDPOINT_URL,
-    'database': 'vgn'
+    'database': 'vgn',
+    # UPDATE row counts include the matched rows whose values did not change
+    'client_flags': [ClientFlag.FOUND_ROWS],
 }
 
-CNX_POOL = mysql.connector.pooling.MySQLConnectionPool(pool_name='vgnPool', pool_size=5, **config)
+
+class LazyConnectionPool:
+    """
+    Connection pool opened on the first connection request, so importing a repository module never connects to MySQL.
+    """
+
+    def __init__(self, **pool_config):
+        self.pool_config = pool_config
+        self.pool = None
+        self.lock = threading.Lock()
+
+    def get_connection(self):
+        if self.pool is None:
+            with self.lock:
+                if self.pool is None:
+                    self.pool = mysql.connector.pooling.MySQLConnectionPool(**self.pool_config)
+
+        return self.pool.get_connection()
+
+
+CNX_POOL = LazyConnectionPool(pool_name='vgnPool', pool_size=5, **config)
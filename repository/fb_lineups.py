@@ -1,6 +1,5 @@
-import pandas as pd
-
 from repository.config import CNX_POOL
+from repository.repository import read_db
 
 
 def get_lineup(user_id, game_date):
@@ -23,11 +22,7 @@ def get_lineups(game_date):
         db_conn = CNX_POOL.get_connection()
         query = "SELECT * FROM vgn.fb_lineups WHERE game_date = '{}' ".format(game_date)
 
-        # Execute SQL query and store results in a pandas dataframe
-        df = pd.read_sql(query, db_conn)
-
-        # Convert dataframe to a dictionary with headers
-        lineups = df.to_dict('records')
+        lineups = read_db(db_conn, query)
 
         db_conn.commit()
         db_conn.close()
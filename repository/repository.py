@@ -1,4 +1,33 @@
-import pandas as pd
+from decimal import Decimal
+
+
+def read_db(db_conn, read_query):
+    """
+    Run a read query and return its rows as dictionaries keyed by column name.
+
+    Rows are built straight from a dictionary cursor: NULL stays None, integers stay integers and DECIMAL values
+    (SUM, AVG...) become floats.
+
+    Args:
+        db_conn: An open database connection.
+        read_query: The read query.
+
+    Returns:
+        A list of dictionaries, one per row.
+    """
+    cursor = db_conn.cursor(dictionary=True)
+    try:
+        cursor.execute(read_query)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    for row in rows:
+        for key, value in row.items():
+            if isinstance(value, Decimal):
+                row[key] = float(value)
+
+    return rows
 
 
 def rw_db(pool, write_query, read_query, write_objs=None, is_many=False):
@@ -15,11 +44,7 @@ def rw_db(pool, write_query, read_query, write_objs=None, is_many=False):
         else:
             cursor.execute(write_query)
 
-        # Execute SQL query and store results in a pandas dataframe
-        df = pd.read_sql(read_query, db_conn)
-
-        # Convert dataframe to a dictionary with headers
-        loaded = df.to_dict('records')
+        loaded = read_db(db_conn, read_query)
 
         db_conn.commit()
         db_conn.close()
@@ -30,3 +55,87 @@ def rw_db(pool, write_query, read_query, write_objs=None, is_many=False):
         return None, err
 
     return loaded, None
+
+
+def write_many(pool, write_query, write_objs, chunk_size=500):
+    """
+    Write many rows in one transaction with parameterized executemany batches.
+
+    When the batch fails, the transaction is rolled back and the rows are written again one by one, so the rows
+    that can be written still are and the failing ones are reported.
+
+    Args:
+        pool: The connection pool to write with.
+        write_query: The parameterized write query.
+        write_objs: A list of parameter tuples.
+        chunk_size: The number of rows sent per executemany batch.
+
+    Returns:
+        A list of (row, error) for the rows that failed.
+    """
+    db_conn = None
+    try:
+        db_conn = pool.get_connection()
+        db_conn.start_transaction()
+        cursor = db_conn.cursor()
+        for i in range(0, len(write_objs), chunk_size):
+            cursor.executemany(write_query, write_objs[i:i + chunk_size])
+        db_conn.commit()
+        db_conn.close()
+        return []
+    except Exception as err:
+        print("DB error: {}, retrying row by row.".format(err))
+        if db_conn is not None:
+            db_conn.rollback()
+            db_conn.close()
+
+    failed = []
+    db_conn = None
+    try:
+        db_conn = pool.get_connection()
+        cursor = db_conn.cursor()
+        for row in write_objs:
+            try:
+                cursor.execute(write_query, row)
+            except Exception as err:
+                failed.append((row, err))
+        db_conn.commit()
+        db_conn.close()
+    except Exception as err:
+        if db_conn is not None:
+            db_conn.close()
+        return [(row, err) for row in write_objs]
+
+    return failed
+
+
+if __name__ == '__main__':
+    # compare the dictionary cursor path with the former pandas path on a local MySQL stand-in
+    import os
+    import time
+    import tracemalloc
+
+    import mysql.connector
+    import pandas as pd
+
+    bench_conn = mysql.connector.connect(
+        host=os.getenv('BENCH_MYSQL_HOST', '127.0.0.1'), user=os.getenv('BENCH_MYSQL_USERNAME', 'root'),
+        password=os.getenv('BENCH_MYSQL_PASSWORD', ''), database='vgn'
+    )
+    bench_query = os.getenv('BENCH_QUERY', "SELECT * FROM vgn.collections")
+
+    for name, read in [
+        ('pandas', lambda: pd.read_sql(bench_query, bench_conn).to_dict('records')),
+        ('cursor', lambda: read_db(bench_conn, bench_query)),
+    ]:
+        read()  # warm up
+        tracemalloc.start()
+        start = time.time()
+        for _ in range(10):
+            rows = read()
+        elapsed = (time.time() - start) / 10
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name}: {len(rows)} rows, {elapsed * 1000:.1f}ms per read, peak {peak / 1024 / 1024:.1f}MiB")
+
+    bench_conn.close()
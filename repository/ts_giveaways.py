@@ -1,6 +1,5 @@
-import pandas as pd
-
 from repository.config import CNX_POOL
+from repository.repository import read_db
 
 
 def create_giveaway(guild_id, channel_id, creator_id, name, description, winners, duration):
@@ -61,11 +60,7 @@ def get_giveaway(gid):
     try:
         db_conn = CNX_POOL.get_connection()
         query = f"SELECT * from vgn.ts_giveaways WHERE id = {gid}"
-        # Execute SQL query and store results in a pandas dataframe
-        df = pd.read_sql(query, db_conn)
-
-        # Convert dataframe to a dictionary with headers
-        loaded = df.to_dict('records')
+        loaded = read_db(db_conn, query)
 
         db_conn.close()
 
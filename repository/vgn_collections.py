@@ -1,16 +1,23 @@
-import asyncio
-import pandas as pd
-
+from constants import EMPTY_PLAYER_COLLECTION
 from repository.config import CNX_POOL
-from provider.topshot.cadence.flow_collections import get_account_plays
+from repository.repository import read_db, write_many
 from provider.topshot.ts_provider import TS_PROVIDER
 
-TIERS = {'Common': 2, 'Fandom': 5, 'Rare': 10, 'Legendary': 25}
-TYPES = {
-    'Dunk': 'dunk', '3 Pointer': 'three_pointer', 'Assist': 'assist', 'Steal': 'steal', 'Block': 'block_shot',
-    'Jump Shot': 'jump_shot', 'Hook Shot': 'hook_shot', 'Handles': 'handle', 'Layup': 'layup', 'Reel': 'reel',
-    'Redemption': 'dunk'
-}
+COLLECTION_COLUMNS = ['dunk', 'three_pointer', 'badge', 'debut', 'assist', 'steal', 'block_shot', 'jump_shot',
+                      'hook_shot', 'handle', 'layup', 'reel', 'team']
+COLLECTION_UPSERT_QUERY = \
+    "INSERT INTO vgn.collections (user_id, player_id, {}) VALUES ({}) ON DUPLICATE KEY UPDATE {}".format(
+        ', '.join(COLLECTION_COLUMNS),
+        ', '.join(['%s'] * (len(COLLECTION_COLUMNS) + 2)),
+        ', '.join([f"{column}=VALUES({column})" for column in COLLECTION_COLUMNS])
+    )
+
+
+def collection_records(user_id, coll):
+    return [
+        tuple([user_id, player_id] + [coll[player_id][column] for column in COLLECTION_COLUMNS])
+        for player_id in coll
+    ]
 
 
 def upsert_collection(user_id, plays):
@@ -46,25 +53,9 @@ def upsert_collection(user_id, plays):
     try:
         coll, not_found_plays = build_vgn_collection(plays)
 
-        sql_records = [
-            (user_id, player_id, coll[player_id]['dunk'], coll[player_id]['three_pointer'],
-             coll[player_id]['badge'], coll[player_id]['debut'], coll[player_id]['assist'], coll[player_id]['steal'],
-             coll[player_id]['block_shot'], coll[player_id]['jump_shot'], coll[player_id]['hook_shot'],
-             coll[player_id]['handle'], coll[player_id]['layup'], coll[player_id]['reel'], coll[player_id]['team'])
-            for player_id in coll
-        ]
-
         db_conn = CNX_POOL.get_connection()
         cursor = db_conn.cursor()
-        query = "INSERT INTO vgn.collections (user_id, player_id, dunk, three_pointer, " \
-                "badge, debut, assist, steal, block_shot, " \
-                "jump_shot, hook_shot, handle, layup, reel, team) " \
-                "VALUES(%s, %s , %s, %s, %s , %s, %s, %s , %s, %s, %s , %s, %s, %s , %s) ON DUPLICATE KEY UPDATE " \
-                "dunk=VALUES(dunk), three_pointer=VALUES(three_pointer), " \
-                "badge=VALUES(badge), debut=VALUES(debut), assist=VALUES(assist), steal=VALUES(steal), " \
-                "block_shot=VALUES(block_shot), jump_shot=VALUES(jump_shot), hook_shot=VALUES(hook_shot), " \
-                "handle=VALUES(handle), layup=VALUES(layup), reel=VALUES(reel), team=VALUES(team)"
-        cursor.executemany(query, sql_records)
+        cursor.executemany(COLLECTION_UPSERT_QUERY, collection_records(user_id, coll))
         db_conn.commit()
         db_conn.close()
     except Exception as err:
@@ -104,65 +95,58 @@ def build_vgn_collection(plays):
         """
 
     player_collections = {}
-    team_collections = {}
     not_found_plays = []
+    collection_plays = TS_PROVIDER.collection_plays
 
-    for play_id in plays:
+    for play_id, sets in plays.items():
         if play_id not in TS_PROVIDER.play_info:
             not_found_plays.append(play_id)
             continue
 
-        for set_id in plays[play_id]:
-            play = None
-            for play_with_set_info in TS_PROVIDER.play_info[play_id]:
-                if play_with_set_info['setFlowId'] == set_id:
-                    play = play_with_set_info
-                    break
+        for set_id, count in sets.items():
+            play = collection_plays.get((play_id, set_id))
             if play is None:
                 not_found_plays.append(play_id * 10000 + set_id)
                 continue
 
-            count = plays[play_id][set_id]
-            player_id = play['playerId']
-
-            if player_id is not None and player_id != 0:
-                if player_id not in TS_PROVIDER.player_moments \
-                        or 'isNBA' not in TS_PROVIDER.player_moments[player_id] \
-                        or not TS_PROVIDER.player_moments[player_id]['isNBA']:
-                    continue
-
-                if player_id not in player_collections:
-                    player_collections[player_id] = {
-                        'dunk': 0,
-                        'three_pointer': 0,
-                        'badge': 0,
-                        'debut': 0,
-                        'assist': 0,
-                        'steal': 0,
-                        'block_shot': 0,
-                        'jump_shot': 0,
-                        'hook_shot': 0,
-                        'handle': 0,
-                        'layup': 0,
-                        'reel': 0,
-                        'team': 0  # TODO: cache a player_id -> team mapping
-                    }
-
-                points = TIERS[play['tier']] * count
-                player_collections[player_id][TYPES[play['playType']]] += points
-
-                for badge in play['badges']:
-                    if badge != 'TSD':
-                        player_collections[player_id]['badge'] += points
-                    else:
-                        player_collections[player_id]['debut'] += points
-        else:
-            # TODO build team collection
-            pass
+            player_id, column, tier_points, badges, debuts = play
+            if player_id is None:
+                continue
+
+            collection = player_collections.get(player_id)
+            if collection is None:
+                # TODO: cache a player_id -> team mapping for the 'team' column, and build team collections
+                collection = dict(EMPTY_PLAYER_COLLECTION)
+                player_collections[player_id] = collection
+
+            points = tier_points * count
+            collection[column] += points
+            collection['badge'] += points * badges
+            collection['debut'] += points * debuts
 
     return player_collections, not_found_plays
 
 
+def upsert_collections(user_plays, chunk_size=500):
+    """
+    Upsert the collections of many users in one batched transaction.
+
+    Args:
+        user_plays: A dictionary of user_id --> playID --> setID --> count
+        chunk_size: The number of rows sent per batch.
+
+    Returns:
+        The set of user ids whose collection failed to be written.
+    """
+    records = []
+    for user_id, plays in user_plays.items():
+        coll, _ = build_vgn_collection(plays)
+        records.extend(collection_records(user_id, coll))
+
+    failed = write_many(CNX_POOL, COLLECTION_UPSERT_QUERY, records, chunk_size)
+    return {row[0] for row, _ in failed}
+
+
 def get_collections(user_ids, player_ids):
     if user_ids is None or len(user_ids) == 0:
         return None
@@ -176,11 +160,7 @@ def get_collections(user_ids, player_ids):
         if player_ids is not None and len(player_ids) > 0:
             query += f"AND player_id IN ({', '.join([str(player_id) for player_id in player_ids])})"
 
-        # Execute SQL query and store results in a pandas dataframe
-        df = pd.read_sql(query, db_conn)
-
-        # Convert dataframe to a dictionary with headers
-        loaded = df.to_dict('records')
+        loaded = read_db(db_conn, query)
 
         db_conn.close()
 
@@ -198,6 +178,20 @@ def get_collections(user_ids, player_ids):
 
 
 if __name__ == '__main__':
-    plays = asyncio.run(get_account_plays('0xad955e5d8047ef82'))
-    vgn_collection, not_found_plays = build_vgn_collection(plays)
-    print(upsert_collection(723723650909601833, plays))
+    # benchmark on a synthetic whale collection of 50k moments
+    import random
+    import time
+
+    random.seed(11)
+    all_plays = list(TS_PROVIDER.collection_plays.keys())
+    whale_plays = {}
+    for _ in range(50000):
+        bench_play_id, bench_set_id = random.choice(all_plays)
+        whale_plays.setdefault(bench_play_id, {})
+        whale_plays[bench_play_id][bench_set_id] = whale_plays[bench_play_id].get(bench_set_id, 0) + 1
+
+    TS_PROVIDER.collection_plays  # load the snapshot before timing
+    start = time.time()
+    vgn_collection, not_found_plays = build_vgn_collection(whale_plays)
+    print(f"50000 moments, {sum([len(sets) for sets in whale_plays.values()])} (play, set) pairs: "
+          f"{len(vgn_collection)} players in {(time.time() - start) * 1000:.1f}ms")
@@ -1,6 +1,5 @@
-import pandas as pd
-
 from repository.config import CNX_POOL
+from repository.repository import read_db
 
 
 def get_lineup(user_id, game_date):
@@ -25,11 +24,7 @@ def get_lineups(game_date, submitted=False):
         if submitted:
             query += " AND submitted = true"
 
-        # Execute SQL query and store results in a pandas dataframe
-        df = pd.read_sql(query, db_conn)
-
-        # Convert dataframe to a dictionary with headers
-        lineups = df.to_dict('records')
+        lineups = read_db(db_conn, query)
 
         db_conn.commit()
         db_conn.close()
@@ -49,11 +44,7 @@ def get_submission_count(game_date):
         query = "SELECT COUNT(*) AS submissions FROM vgn.lineups " \
                 "WHERE game_date = '{}' AND submitted = TRUE".format(game_date)
 
-        # Execute SQL query and store results in a pandas dataframe
-        df = pd.read_sql(query, db_conn)
-
-        # Convert dataframe to a dictionary with headers
-        submissions = df.to_dict('records')[0]['submissions']
+        submissions = read_db(db_conn, query)[0]['submissions']
 
         db_conn.commit()
         db_conn.close()
@@ -75,11 +66,7 @@ def get_weekly_ranks(game_dates, count):
                 "GROUP BY u.id ORDER BY total_score DESC LIMIT {}"\
             .format(', '.join("'" + date + "'" for date in game_dates), count)
 
-        # Execute SQL query and store results in a pandas dataframe
-        df = pd.read_sql(query, db_conn)
-
-        # Convert dataframe to a dictionary with headers
-        leaderboard = df.to_dict('records')
+        leaderboard = read_db(db_conn, query)
 
         db_conn.commit()
         db_conn.close()
@@ -101,11 +88,7 @@ def get_weekly_score(game_dates, user_id):
                 "(SELECT * FROM vgn.users WHERE id = {}) u ON l.user_id = u.id " \
             .format(', '.join("'" + date + "'" for date in game_dates), user_id)
 
-        # Execute SQL query and store results in a pandas dataframe
-        df = pd.read_sql(query, db_conn)
-
-        # Convert dataframe to a dictionary with headers
-        score = df.to_dict('records')
+        score = read_db(db_conn, query)
 
         db_conn.commit()
         db_conn.close()
@@ -116,7 +99,7 @@ def get_weekly_score(game_dates, user_id):
             db_conn.close()
         return {}
 
-    if len(score) > 0:
+    if len(score) > 0 and score[0]['total_score'] is not None:
         return score[0]['total_score']
     return 0
 
@@ -140,18 +123,48 @@ def upsert_lineup(lineup):
         return False, "DB error: {}".format(err)
 
 
-def upsert_score(user_id, game_date, score):
+def update_scores(scores, chunk_size=500, pool=CNX_POOL):
+    """
+    Write the final scores of many lineups in one transaction.
+
+    Rows are sent as parameterized UPDATE batches of `chunk_size`, only existing lineups are updated.
+
+    Args:
+        scores: A list of (user_id, game_date, score) tuples.
+        chunk_size: The number of rows sent per executemany batch.
+        pool: The connection pool to write with.
+
+    Returns:
+        The number of lineups found and updated, summed from the row counts of the batches, so scores of missing
+        lineups are not counted. 0 if the transaction was rolled back.
+    """
+    if len(scores) == 0:
+        return 0
+
+    query = "UPDATE vgn.lineups SET score=%s WHERE user_id=%s AND game_date=%s"
+    rows = [(score, user_id, game_date) for user_id, game_date, score in scores]
+
+    db_conn = None
+    written = 0
     try:
-        db_conn = CNX_POOL.get_connection()
+        db_conn = pool.get_connection()
+        db_conn.start_transaction()
         cursor = db_conn.cursor()
-        query = "UPDATE vgn.lineups SET score = {} " \
-                "WHERE user_id = {} AND game_date = '{}'".format(score, user_id, game_date)
-        cursor.execute(query)
+        for i in range(0, len(rows), chunk_size):
+            cursor.executemany(query, rows[i:i + chunk_size])
+            written += max(cursor.rowcount, 0)
         db_conn.commit()
         db_conn.close()
     except Exception as err:
         print("DB error: {}".format(err))
 
+        if db_conn is not None:
+            db_conn.rollback()
+            db_conn.close()
+        return 0
+
+    return written
+
 
 def submit_lineup(user_id, game_date):
     try:
@@ -170,4 +183,32 @@ def submit_lineup(user_id, game_date):
 
 if __name__ == '__main__':
     # get_lineups("04/11/2023")
-    get_lineup("100", "04/11/2023")
+    # get_lineup("100", "04/11/2023")
+
+    # benchmark the nightly score upload against a local MySQL stand-in holding the vgn schema
+    import os
+    import random
+    import time
+
+    import mysql.connector.pooling
+    from mysql.connector.constants import ClientFlag
+
+    bench_pool = mysql.connector.pooling.MySQLConnectionPool(
+        pool_name='benchPool', pool_size=1, client_flags=[ClientFlag.FOUND_ROWS], host=os.getenv('BENCH_MYSQL_HOST', '127.0.0.1'),
+        user=os.getenv('BENCH_MYSQL_USERNAME', 'root'), password=os.getenv('BENCH_MYSQL_PASSWORD', ''), database='vgn'
+    )
+    bench_date = "01/01/2000"
+    bench_scores = [(user_id, bench_date, random.random() * 300) for user_id in range(1, 5001)]
+
+    start = time.time()
+    for user_id, game_date, score in bench_scores:
+        conn = bench_pool.get_connection()
+        conn.cursor().execute(
+            "UPDATE vgn.lineups SET score = %s WHERE user_id = %s AND game_date = %s", (score, user_id, game_date))
+        conn.commit()
+        conn.close()
+    print(f"per-row updates: {time.time() - start:.2f}s for {len(bench_scores)} rows")
+
+    start = time.time()
+    written = update_scores(bench_scores, pool=bench_pool)
+    print(f"batched update: {time.time() - start:.2f}s for {written} rows")
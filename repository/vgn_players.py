@@ -1,47 +1,113 @@
 #!/usr/bin/env python3
 
 import random
-import time
-
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 
 from provider.nba.players import get_player_avg_stats, fresh_team_players, get_player_stats_dashboard
 from repository.config import CNX_POOL
-
-
-def upsert_player_with_stats(id):
+from repository.repository import read_db, write_many
+from utils import RateLimiter
+
+
+PLAYER_UPSERT_QUERY = \
+    "INSERT INTO vgn.players (id, full_name, first_name, last_name, jersey_number, current_team," \
+    "points_recent, points_avg, three_pointers_recent, three_pointers_avg," \
+    "defensive_rebounds_recent, defensive_rebounds_avg, offensive_rebounds_recent, offensive_rebounds_avg," \
+    "assists_recent, assists_avg, steals_recent, steals_avg, blocks_recent, blocks_avg," \
+    "field_goal_misses_recent, field_goal_misses_avg, free_throw_misses_recent, free_throw_misses_avg," \
+    "turnovers_recent, turnovers_avg, fouls_recent, fouls_avg, wins_recent, wins_avg," \
+    "double_double_recent, double_double_avg, triple_double_recent, triple_double_avg," \
+    "quadruple_double_recent, quadruple_double_avg, five_double_recent, five_double_avg, is_current) " \
+    "VALUES(%s, %s, %s, %s, %s, %s," \
+    "%s, %s, %s, %s," \
+    "%s, %s, %s, %s," \
+    "%s, %s, %s, %s, %s, %s," \
+    "%s, %s, %s, %s," \
+    "%s, %s, %s, %s, %s, %s," \
+    "%s, %s, %s, %s," \
+    "%s, %s, %s, %s, TRUE" \
+    ") AS new ON DUPLICATE KEY UPDATE full_name = new.full_name, first_name = new.first_name, " \
+    "last_name = new.last_name, jersey_number = new.jersey_number, current_team = new.current_team, " \
+    "points_recent = new.points_recent, points_avg = new.points_avg, " \
+    "three_pointers_recent = new.three_pointers_recent, three_pointers_avg = new.three_pointers_avg, " \
+    "defensive_rebounds_recent = new.defensive_rebounds_recent, defensive_rebounds_avg = new.defensive_rebounds_avg, " \
+    "offensive_rebounds_recent = new.offensive_rebounds_recent, offensive_rebounds_avg = new.offensive_rebounds_avg, " \
+    "assists_recent = new.assists_recent, assists_avg = new.assists_avg, " \
+    "steals_recent = new.steals_recent, steals_avg = new.steals_avg, " \
+    "blocks_recent = new.blocks_recent, blocks_avg = new.blocks_avg, " \
+    "field_goal_misses_recent = new.field_goal_misses_recent, field_goal_misses_avg = new.field_goal_misses_avg, " \
+    "free_throw_misses_recent = new.free_throw_misses_recent, free_throw_misses_avg = new.free_throw_misses_avg, " \
+    "turnovers_recent = new.turnovers_recent, turnovers_avg = new.turnovers_avg, " \
+    "fouls_recent = new.fouls_recent, fouls_avg = new.fouls_avg, " \
+    "wins_recent = new.wins_recent, wins_avg = new.wins_avg, " \
+    "double_double_recent = new.double_double_recent, double_double_avg = new.double_double_avg, " \
+    "triple_double_recent = new.triple_double_recent, triple_double_avg = new.triple_double_avg, " \
+    "quadruple_double_recent = new.quadruple_double_recent, quadruple_double_avg = new.quadruple_double_avg, " \
+    "five_double_recent = new.five_double_recent, five_double_avg = new.five_double_avg, is_current = TRUE"
+
+DASHBOARD_UPSERT_QUERY = \
+    "INSERT INTO vgn.players (id, full_name, current_team," \
+    "points_recent, points_avg, three_pointers_recent, three_pointers_avg," \
+    "defensive_rebounds_recent, defensive_rebounds_avg, offensive_rebounds_recent, offensive_rebounds_avg," \
+    "assists_recent, assists_avg, steals_recent, steals_avg, blocks_recent, blocks_avg," \
+    "field_goal_misses_recent, field_goal_misses_avg, free_throw_misses_recent, free_throw_misses_avg," \
+    "turnovers_recent, turnovers_avg, fouls_recent, fouls_avg, wins_recent, wins_avg," \
+    "double_double_recent, double_double_avg, triple_double_recent, triple_double_avg," \
+    "quadruple_double_recent, quadruple_double_avg, five_double_recent, five_double_avg," \
+    "minutes_recent, minutes_avg, fouls_drawn_recent, fouls_drawn_avg, is_current) " \
+    "VALUES(%s, %s, %s," \
+    "%s, %s, %s, %s," \
+    "%s, %s, %s, %s," \
+    "%s, %s, %s, %s, %s, %s," \
+    "%s, %s, %s, %s," \
+    "%s, %s, %s, %s, %s, %s," \
+    "%s, %s, %s, %s," \
+    "%s, %s, %s, %s," \
+    "%s, %s, %s, %s, TRUE" \
+    ") AS new ON DUPLICATE KEY UPDATE full_name = new.full_name, current_team = new.current_team, " \
+    "points_recent = new.points_recent, points_avg = new.points_avg, " \
+    "three_pointers_recent = new.three_pointers_recent, three_pointers_avg = new.three_pointers_avg, " \
+    "defensive_rebounds_recent = new.defensive_rebounds_recent, defensive_rebounds_avg = new.defensive_rebounds_avg, " \
+    "offensive_rebounds_recent = new.offensive_rebounds_recent, offensive_rebounds_avg = new.offensive_rebounds_avg, " \
+    "assists_recent = new.assists_recent, assists_avg = new.assists_avg, " \
+    "steals_recent = new.steals_recent, steals_avg = new.steals_avg, " \
+    "blocks_recent = new.blocks_recent, blocks_avg = new.blocks_avg, " \
+    "field_goal_misses_recent = new.field_goal_misses_recent, field_goal_misses_avg = new.field_goal_misses_avg, " \
+    "free_throw_misses_recent = new.free_throw_misses_recent, free_throw_misses_avg = new.free_throw_misses_avg, " \
+    "turnovers_recent = new.turnovers_recent, turnovers_avg = new.turnovers_avg, " \
+    "fouls_recent = new.fouls_recent, fouls_avg = new.fouls_avg, " \
+    "wins_recent = new.wins_recent, wins_avg = new.wins_avg, " \
+    "double_double_recent = new.double_double_recent, double_double_avg = new.double_double_avg, " \
+    "triple_double_recent = new.triple_double_recent, triple_double_avg = new.triple_double_avg, " \
+    "quadruple_double_recent = new.quadruple_double_recent, quadruple_double_avg = new.quadruple_double_avg, " \
+    "five_double_recent = new.five_double_recent, five_double_avg = new.five_double_avg," \
+    "minutes_recent = new.minutes_recent, minutes_avg = new.minutes_avg," \
+    "fouls_drawn_recent = new.fouls_drawn_recent, fouls_drawn_avg = new.fouls_drawn_avg, is_current = TRUE"
+
+# NBA stats API pacing of the per-player fetches, each fetch makes 2 requests
+NBA_API_FETCHES_PER_SECOND = 1.0
+NBA_API_WORKERS = 4
+
+
+def build_player_with_stats(id):
     """
-    Adds a new player to the vgn.players MySQL table, given their ID.
+    Fetches a player's info and average stats from the NBA API and builds the parameters of PLAYER_UPSERT_QUERY.
 
     Args:
-        id: An integer representing the ID of the player to add.
+        id: An integer representing the ID of the player.
 
     Returns:
-        None.
-
-    Raises:
-        None.
-
-    Examples:
-        >>> upsert_player_with_stats(201939)
-        Inserted new player id: 201939, name: curry, stephen.
-
-    This function fetches the player's average stats using the `get_player_avg_stats` function, and inserts them
-    into the vgn.players MySQL table. The function parses the player's information and statistics, and constructs
-    an INSERT statement with the values. If the insertion is successful, the function prints a message to indicate
-    that the player was inserted successfully. If an error occurs during fetching or parsing, the function prints
-    an error message with the details.
+        A tuple of query parameters, or None if the player could not be fetched or parsed.
     """
-
     try:
         info, stats = get_player_avg_stats(id)
     except Exception as err:
         print(f"Failed player id: {id}, fetch error {err}")
-        return
+        return None
 
     if info is None:
         print(f"Failed player id: {id}, no info")
-        return
+        return None
     if stats is None:
         stats = {
             'PTS': 0.0,
@@ -64,9 +130,9 @@ def upsert_player_with_stats(id):
         }
 
     try:
-        full_name = info['DISPLAY_FIRST_LAST'][0].replace('\'', '\\\'')
-        first_name = info['FIRST_NAME'][0].replace('\'', '\\\'')
-        last_name = info['LAST_NAME'][0].replace('\'', '\\\'')
+        full_name = info['DISPLAY_FIRST_LAST'][0]
+        first_name = info['FIRST_NAME'][0]
+        last_name = info['LAST_NAME'][0]
 
         if info['JERSEY'][0] == '00':
             jersey = 100
@@ -81,68 +147,79 @@ def upsert_player_with_stats(id):
         td_rate = stats['TD3'] / stats['GP'] if stats['GP'] > 0 else 0.0
     except Exception as err:
         print(f"Failed player id: {id}, parse error {err}, {info}")
-        return
+        return None
 
-    try:
-        db_conn = CNX_POOL.get_connection()
-        cursor = db_conn.cursor()
-        query = \
-            "INSERT INTO vgn.players (id, full_name, first_name, last_name, jersey_number, current_team," \
-            "points_recent, points_avg, three_pointers_recent, three_pointers_avg," \
-            "defensive_rebounds_recent, defensive_rebounds_avg, offensive_rebounds_recent, offensive_rebounds_avg," \
-            "assists_recent, assists_avg, steals_recent, steals_avg, blocks_recent, blocks_avg," \
-            "field_goal_misses_recent, field_goal_misses_avg, free_throw_misses_recent, free_throw_misses_avg," \
-            "turnovers_recent, turnovers_avg, fouls_recent, fouls_avg, wins_recent, wins_avg," \
-            "double_double_recent, double_double_avg, triple_double_recent, triple_double_avg," \
-            "quadruple_double_recent, quadruple_double_avg, five_double_recent, five_double_avg, is_current) " \
-            "VALUES({}, '{}' ,'{}', '{}', {}, '{}'," \
-            "{}, {}, {}, {}," \
-            "{}, {}, {}, {}," \
-            "{}, {}, {}, {}, {}, {}," \
-            "{}, {}, {}, {}," \
-            "{}, {}, {}, {}, {}, {}," \
-            "{}, {}, {}, {}," \
-            "{}, {}, {}, {}, TRUE" \
-            ") AS new ON DUPLICATE KEY UPDATE full_name = new.full_name, first_name = new.first_name, " \
-            "last_name = new.last_name, jersey_number = new.jersey_number, current_team = new.current_team, " \
-            "points_recent = new.points_recent, points_avg = new.points_avg, " \
-            "three_pointers_recent = new.three_pointers_recent, three_pointers_avg = new.three_pointers_avg, " \
-            "defensive_rebounds_recent = new.defensive_rebounds_recent, defensive_rebounds_avg = new.defensive_rebounds_avg, " \
-            "offensive_rebounds_recent = new.offensive_rebounds_recent, offensive_rebounds_avg = new.offensive_rebounds_avg, " \
-            "assists_recent = new.assists_recent, assists_avg = new.assists_avg, " \
-            "steals_recent = new.steals_recent, steals_avg = new.steals_avg, " \
-            "blocks_recent = new.blocks_recent, blocks_avg = new.blocks_avg, " \
-            "field_goal_misses_recent = new.field_goal_misses_recent, field_goal_misses_avg = new.field_goal_misses_avg, " \
-            "free_throw_misses_recent = new.free_throw_misses_recent, free_throw_misses_avg = new.free_throw_misses_avg, " \
-            "turnovers_recent = new.turnovers_recent, turnovers_avg = new.turnovers_avg, " \
-            "fouls_recent = new.fouls_recent, fouls_avg = new.fouls_avg, " \
-            "wins_recent = new.wins_recent, wins_avg = new.wins_avg, " \
-            "double_double_recent = new.double_double_recent, double_double_avg = new.double_double_avg, " \
-            "triple_double_recent = new.triple_double_recent, triple_double_avg = new.triple_double_avg, " \
-            "quadruple_double_recent = new.quadruple_double_recent, quadruple_double_avg = new.quadruple_double_avg, " \
-            "five_double_recent = new.five_double_recent, five_double_avg = new.five_double_avg, is_current = TRUE" \
-            "".format(
-                id, full_name, first_name, last_name, jersey, team,
-                stats['PTS'], stats['PTS'], stats['FG3M'], stats['FG3M'],
-                stats['DREB'], stats['DREB'], stats['OREB'], stats['OREB'],
-                stats['AST'], stats['AST'], stats['STL'], stats['STL'], stats['BLK'], stats['BLK'],
-                stats['FGA'] - stats['FGM'], stats['FGA'] - stats['FGM'], stats['FTA'] - stats['FTM'],
-                stats['FTA'] - stats['FTM'],
-                stats['TOV'], stats['TOV'], stats['PF'], stats['PF'], win_rate, win_rate,
-                dd_rate, dd_rate, td_rate, td_rate,
-                0.0, 0.0, 0.0, 0.0
-            )
-        cursor.execute(query)
-        db_conn.commit()
-        db_conn.close()
-    except Exception as err:
-        print(f"Failed player id: {id}, db error {err}")
+    return tuple(float(value) if hasattr(value, 'item') else value for value in (
+        id, full_name, first_name, last_name, jersey, team,
+        stats['PTS'], stats['PTS'], stats['FG3M'], stats['FG3M'],
+        stats['DREB'], stats['DREB'], stats['OREB'], stats['OREB'],
+        stats['AST'], stats['AST'], stats['STL'], stats['STL'], stats['BLK'], stats['BLK'],
+        stats['FGA'] - stats['FGM'], stats['FGA'] - stats['FGM'], stats['FTA'] - stats['FTM'],
+        stats['FTA'] - stats['FTM'],
+        stats['TOV'], stats['TOV'], stats['PF'], stats['PF'], win_rate, win_rate,
+        dd_rate, dd_rate, td_rate, td_rate,
+        0.0, 0.0, 0.0, 0.0
+    ))
 
-        if db_conn is not None:
-            db_conn.close()
-        return
 
-    print(f"Upserted player id: {id}, name: {full_name}.")
+def upsert_player_with_stats(id):
+    """
+    Adds a new player to the vgn.players MySQL table, given their ID.
+
+    Args:
+        id: An integer representing the ID of the player to add.
+
+    Returns:
+        None.
+
+    Raises:
+        None.
+
+    Examples:
+        >>> upsert_player_with_stats(201939)
+        Inserted new player id: 201939, name: curry, stephen.
+
+    This function fetches the player's average stats using the `get_player_avg_stats` function, and inserts them
+    into the vgn.players MySQL table. If the insertion is successful, the function prints a message to indicate
+    that the player was inserted successfully. If an error occurs during fetching or parsing, the function prints
+    an error message with the details.
+    """
+    upsert_players_with_stats([id])
+
+
+def upsert_players_with_stats(player_ids):
+    """
+    Adds or updates many players in the vgn.players MySQL table, given their IDs.
+
+    The NBA API fetches run in a small worker pool sharing one rate limiter, the fetched players are then written
+    in one batched transaction.
+
+    Args:
+        player_ids: A list of player IDs.
+
+    Returns:
+        A list of the player IDs that could not be upserted.
+    """
+    limiter = RateLimiter(NBA_API_FETCHES_PER_SECOND)
+
+    def fetch(player_id):
+        limiter.acquire()
+        return build_player_with_stats(player_id)
+
+    with ThreadPoolExecutor(max_workers=NBA_API_WORKERS) as executor:
+        rows = [row for row in executor.map(fetch, player_ids) if row is not None]
+
+    failed = write_many(CNX_POOL, PLAYER_UPSERT_QUERY, rows)
+    for row, err in failed:
+        print(f"Failed player id: {row[0]}, db error {err}")
+
+    failed_ids = {row[0] for row, _ in failed}
+    for row in rows:
+        if row[0] not in failed_ids:
+            print(f"Upserted player id: {row[0]}, name: {row[1]}.")
+
+    fetched_ids = {row[0] for row in rows}
+    return [pid for pid in player_ids if pid not in fetched_ids or pid in failed_ids]
 
 
 def get_player(player_id):
@@ -192,11 +269,7 @@ def get_players(player_ids, order_by=None):
         if order_by is not None:
             query += " ORDER BY {} ".format(', '.join([o[0] + " " + o[1] + " " for o in order_by]))
 
-        # Execute SQL query and store results in a pandas dataframe
-        df = pd.read_sql(query, db_conn)
-
-        # Convert dataframe to a dictionary with headers
-        players = df.to_dict('records')
+        players = read_db(db_conn, query)
 
         db_conn.close()
 
@@ -214,11 +287,7 @@ def get_all_team_players(current_only = True):
         if current_only:
             query += " AND is_current = TRUE"
 
-        # Execute SQL query and store results in a pandas dataframe
-        df = pd.read_sql(query, db_conn)
-
-        # Convert dataframe to a dictionary with headers
-        records = df.to_dict('records')
+        records = read_db(db_conn, query)
 
         db_conn.close()
 
@@ -256,11 +325,7 @@ def get_empty_players_stats(player_ids, order_by=None):
         if order_by is not None:
             query += " ORDER BY {} ".format(', '.join([o[0] + " " + o[1] + " " for o in order_by]))
 
-        # Execute SQL query and store results in a pandas dataframe
-        df = pd.read_sql(query, db_conn)
-
-        # Convert dataframe to a dictionary with headers
-        loaded = df.to_dict('records')
+        loaded = read_db(db_conn, query)
 
         db_conn.close()
 
@@ -304,62 +369,15 @@ def reformat_dashboard(raw_player_stats):
 
 def update_player_stats_from_dashboard(player_ids):
     player_stats = reformat_dashboard(get_player_stats_dashboard())
+
+    failed = write_many(CNX_POOL, DASHBOARD_UPSERT_QUERY, player_stats)
     err_ids = []
+    for player, err in failed:
+        err_ids.append(player[0])
+        print(f"DB error: {err}, player: {player[0]} {player[1]}")
 
-    for player in player_stats:
-        try:
-            db_conn = CNX_POOL.get_connection()
-            cursor = db_conn.cursor()
-            query = \
-                "INSERT INTO vgn.players (id, full_name, current_team," \
-                "points_recent, points_avg, three_pointers_recent, three_pointers_avg," \
-                "defensive_rebounds_recent, defensive_rebounds_avg, offensive_rebounds_recent, offensive_rebounds_avg," \
-                "assists_recent, assists_avg, steals_recent, steals_avg, blocks_recent, blocks_avg," \
-                "field_goal_misses_recent, field_goal_misses_avg, free_throw_misses_recent, free_throw_misses_avg," \
-                "turnovers_recent, turnovers_avg, fouls_recent, fouls_avg, wins_recent, wins_avg," \
-                "double_double_recent, double_double_avg, triple_double_recent, triple_double_avg," \
-                "quadruple_double_recent, quadruple_double_avg, five_double_recent, five_double_avg," \
-                "minutes_recent, minutes_avg, fouls_drawn_recent, fouls_drawn_avg, is_current) " \
-                "VALUES(%s, %s, %s," \
-                "%s, %s, %s, %s," \
-                "%s, %s, %s, %s," \
-                "%s, %s, %s, %s, %s, %s," \
-                "%s, %s, %s, %s," \
-                "%s, %s, %s, %s, %s, %s," \
-                "%s, %s, %s, %s," \
-                "%s, %s, %s, %s," \
-                "%s, %s, %s, %s, TRUE" \
-                ") AS new ON DUPLICATE KEY UPDATE full_name = new.full_name, current_team = new.current_team, " \
-                "points_recent = new.points_recent, points_avg = new.points_avg, " \
-                "three_pointers_recent = new.three_pointers_recent, three_pointers_avg = new.three_pointers_avg, " \
-                "defensive_rebounds_recent = new.defensive_rebounds_recent, defensive_rebounds_avg = new.defensive_rebounds_avg, " \
-                "offensive_rebounds_recent = new.offensive_rebounds_recent, offensive_rebounds_avg = new.offensive_rebounds_avg, " \
-                "assists_recent = new.assists_recent, assists_avg = new.assists_avg, " \
-                "steals_recent = new.steals_recent, steals_avg = new.steals_avg, " \
-                "blocks_recent = new.blocks_recent, blocks_avg = new.blocks_avg, " \
-                "field_goal_misses_recent = new.field_goal_misses_recent, field_goal_misses_avg = new.field_goal_misses_avg, " \
-                "free_throw_misses_recent = new.free_throw_misses_recent, free_throw_misses_avg = new.free_throw_misses_avg, " \
-                "turnovers_recent = new.turnovers_recent, turnovers_avg = new.turnovers_avg, " \
-                "fouls_recent = new.fouls_recent, fouls_avg = new.fouls_avg, " \
-                "wins_recent = new.wins_recent, wins_avg = new.wins_avg, " \
-                "double_double_recent = new.double_double_recent, double_double_avg = new.double_double_avg, " \
-                "triple_double_recent = new.triple_double_recent, triple_double_avg = new.triple_double_avg, " \
-                "quadruple_double_recent = new.quadruple_double_recent, quadruple_double_avg = new.quadruple_double_avg, " \
-                "five_double_recent = new.five_double_recent, five_double_avg = new.five_double_avg," \
-                "minutes_recent = new.minutes_recent, minutes_avg = new.minutes_avg," \
-                "fouls_drawn_recent = new.fouls_drawn_recent, fouls_drawn_avg = new.fouls_drawn_avg, is_current = TRUE"
-            cursor.execute(query, player)
-            db_conn.commit()
-            db_conn.close()
-
-            if player[0] in player_ids:
-                player_ids.remove(player[0])
-        except Exception as err:
-            err_ids.append(player[0])
-            print(f"DB error: {err}, player: {player[0]} {player[1]}")
-
-            if db_conn is not None:
-                db_conn.close()
+    upserted_ids = {player[0] for player in player_stats} - set(err_ids)
+    player_ids = [pid for pid in player_ids if pid not in upserted_ids]
 
     print(f"Upserted {len(player_stats) - len(err_ids)} players.")
     print(f"Failed players: {err_ids}")
@@ -396,9 +414,7 @@ def reload_players():
     player_ids = update_player_stats_from_dashboard(player_ids)
     print(f"Players not upserted: {player_ids}")
     random.shuffle(player_ids)
-    for player_id in player_ids:
-        upsert_player_with_stats(player_id)
-        time.sleep(1.0)
+    upsert_players_with_stats(player_ids)
 
     current_player_ids = [int(pid) for pid in current_player_ids]
     non_current_ids = list(filter(lambda p: p not in current_player_ids, db_player_ids))
@@ -1,7 +1,5 @@
-import pandas as pd
-
 from repository.config import CNX_POOL
-from repository.repository import rw_db
+from repository.repository import read_db, rw_db
 
 
 def insert_user(discord_id, topshot_username, flow_address):
@@ -57,11 +55,7 @@ def get_users(discord_ids):
     try:
         db_conn = CNX_POOL.get_connection()
         query = "SELECT * from vgn.users WHERE id IN ({})".format(', '.join([str(user_id) for user_id in discord_ids]))
-        # Execute SQL query and store results in a pandas dataframe
-        df = pd.read_sql(query, db_conn)
-
-        # Convert dataframe to a dictionary with headers
-        loaded = df.to_dict('records')
+        loaded = read_db(db_conn, query)
 
         db_conn.close()
 
@@ -73,3 +67,19 @@ def get_users(discord_ids):
 
     except Exception:
         return None
+
+
+def get_all_users():
+    """
+    :return: a list of {id, topshot_username, flow_address} of all registered users, None on database error
+    """
+    try:
+        db_conn = CNX_POOL.get_connection()
+        loaded = read_db(db_conn, "SELECT id, topshot_username, flow_address FROM vgn.users")
+        db_conn.close()
+
+        return loaded
+
+    except Exception as err:
+        print(f"DB error: {err}")
+        return None
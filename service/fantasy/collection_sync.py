@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import json
+import os
+import pathlib
+import random
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from provider.topshot.cadence.flow_collections import get_account_moment_ids, get_account_plays
+from provider.topshot.ts_provider import TS_PROVIDER
+from repository.vgn_collections import upsert_collections
+from repository.vgn_users import get_all_users
+from service.runtime import run_blocking
+
+SYNC_STATE_PATH = os.path.join(pathlib.Path(__file__).parent.resolve(), 'resource/collection_sync.json')
+FLOW_CONCURRENCY = 8
+FLOW_RETRIES = 3
+FLOW_BACKOFF_SECONDS = 2.0
+
+
+async def with_retry(call: Callable[[], Awaitable[Any]], retries: int = FLOW_RETRIES,
+                     backoff: float = FLOW_BACKOFF_SECONDS) -> Any:
+    """
+    Await a call, retrying it with exponential backoff and jitter when it raises.
+
+    :param: call: a function returning a new awaitable on each attempt
+    :param: retries: number of retries after the first attempt
+    :param: backoff: delay before the first retry, doubled on each retry
+    :return: the result of the first successful attempt
+    :raise: the error of the last attempt
+    """
+    for attempt in range(retries + 1):
+        try:
+            return await call()
+        except Exception:
+            if attempt == retries:
+                raise
+            await asyncio.sleep(backoff * (2 ** attempt) * (0.5 + random.random()))
+
+
+def hash_moment_ids(moment_ids, reference: str) -> str:
+    """
+    :param: moment_ids: moment ids of an account
+    :param: reference: content hash of the reference data, a new one invalidates all stored hashes
+    :return: hash of the moment ids and the reference data
+    """
+    content = reference + ':' + ','.join([str(moment_id) for moment_id in sorted(moment_ids)])
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def load_sync_state() -> Dict[str, str]:
+    try:
+        with open(SYNC_STATE_PATH, 'r') as state_file:
+            return json.load(state_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def store_sync_state(state: Dict[str, str]) -> None:
+    try:
+        os.makedirs(os.path.dirname(SYNC_STATE_PATH), exist_ok=True)
+        with open(SYNC_STATE_PATH + '.tmp', 'w') as state_file:
+            json.dump(state, state_file)
+        os.replace(SYNC_STATE_PATH + '.tmp', SYNC_STATE_PATH)
+    except OSError as err:
+        print(f"Failed to store collection sync state: {err}")
+
+
+class CollectionSync:
+    """
+    Nightly resync of the collections of all registered users.
+
+    Accounts are queried on Flow with bounded concurrency. The cheap moment id list is read first, and the full
+    collection script only runs for accounts whose moment ids, or the Top Shot reference data, changed since the last
+    sync. All changed collections are then written in one batched transaction.
+    """
+
+    def __init__(self, concurrency: int = FLOW_CONCURRENCY):
+        self.concurrency = concurrency
+        self.lock = asyncio.Lock()
+
+    async def run(self) -> str:
+        """
+        :return: a summary of the sync
+        """
+        if self.lock.locked():
+            return "Collection sync is already running."
+
+        async with self.lock:
+            return await self.__run()
+
+    async def __run(self) -> str:
+        users = await run_blocking(get_all_users)
+        if users is None:
+            return "Collection sync failed to load users."
+
+        state = load_sync_state()
+        reference = await run_blocking(lambda: TS_PROVIDER.collection_plays_hash)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def load(user) -> Optional[tuple]:
+            async with semaphore:
+                address = user['flow_address']
+                moment_ids = await with_retry(lambda: get_account_moment_ids(address))
+                moment_hash = hash_moment_ids(moment_ids, reference)
+                if state.get(str(user['id'])) == moment_hash:
+                    return None
+
+                plays = await with_retry(lambda: get_account_plays(address))
+                return user['id'], moment_hash, plays
+
+        results = await asyncio.gather(*[load(user) for user in users if user['flow_address']],
+                                       return_exceptions=True)
+
+        changed = {}
+        hashes = {}
+        failed = 0
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Failed to load collection: {result}")
+                failed += 1
+            elif result is not None:
+                user_id, moment_hash, plays = result
+                changed[user_id] = plays
+                hashes[user_id] = moment_hash
+
+        not_written = await run_blocking(upsert_collections, changed) if len(changed) > 0 else set()
+        for user_id, moment_hash in hashes.items():
+            if user_id not in not_written:
+                state[str(user_id)] = moment_hash
+        store_sync_state(state)
+
+        return f"Collection sync: {len(users)} users, {len(changed) - len(not_written)} updated, " \
+               f"{len(users) - len(changed) - failed} unchanged, {failed + len(not_written)} failed."
+
+
+COLLECTION_SYNC = CollectionSync()
@@ -0,0 +1,181 @@
+import bisect
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from constants import STATS_SCORE
+from service.fantasy.scoring import LINEUP_WEIGHTS, stat_vector
+
+
+class Leaderboard:
+    """
+    Incremental ranking of the daily fantasy lineups.
+
+    Each lineup slot keeps its own weighted score. On every refresh only the players whose scoring stats changed are
+    re-scored, and the new scores are fanned out to the lineups holding them through a player -> (user, slot) index.
+    The collection multipliers of all holders of a player are stacked in one matrix, so re-scoring a player is a
+    single matrix-vector product against the player's stat vector.
+    Users are kept ordered by (-score, submission order), the same order a stable descending sort gives, so the
+    top N and the rank of a single user are cheap lookups.
+
+    Readers never take a lock: the scores and the order are published together as one tuple after each refresh.
+    """
+
+    def __init__(self):
+        self.seq: Dict[int, int] = {}
+        self.holders: Dict[int, List[Tuple[int, int]]] = {}
+        self.holder_multipliers: Dict[int, np.ndarray] = {}
+        self.slot_scores: Dict[int, List[float]] = {}
+        self.fingerprints: Dict[int, Optional[tuple]] = {}
+        self.state: Tuple[Dict[int, float], List[Tuple[float, int, int]]] = ({}, [])
+
+    def reset(self, lineups: Dict[int, List[Optional[int]]], multipliers: Dict[int, Dict[int, np.ndarray]]) -> None:
+        """
+        Start a new game day.
+
+        :param: lineups: {user_id: list of the 8 player ids of the lineup}, in submission order
+        :param: multipliers: {user_id: {player_id: collection multiplier vector}}, see scoring.multiplier_vector
+        """
+        self.seq = {}
+        self.holders = {}
+        self.slot_scores = {}
+        self.fingerprints = {}
+
+        for user_id, player_ids in lineups.items():
+            self.seq[user_id] = len(self.seq)
+            self.slot_scores[user_id] = [0.0] * len(LINEUP_WEIGHTS)
+            for slot, player_id in enumerate(player_ids):
+                if player_id is None:
+                    continue
+                self.holders.setdefault(player_id, []).append((user_id, slot))
+                self.fingerprints[player_id] = None
+
+        self.holder_multipliers = {
+            player_id: np.array([multipliers[user_id][player_id] * LINEUP_WEIGHTS[slot] for user_id, slot in holders])
+            for player_id, holders in self.holders.items()
+        }
+        self.state = ({}, [])
+
+    def apply(self, player_stats: Dict[int, Dict[str, Any]]) -> int:
+        """
+        Apply the latest player stats and re-rank the lineups holding players whose stats changed.
+
+        :param: player_stats: {player_id: enriched boxscore statistics}, players without stats score 0
+        :return: the number of re-scored users
+        """
+        dirty = set()
+        for player_id, holders in self.holders.items():
+            player = player_stats.get(player_id)
+            fingerprint = self.__fingerprint(player)
+            if fingerprint == self.fingerprints[player_id]:
+                continue
+
+            self.fingerprints[player_id] = fingerprint
+            slot_scores = (self.holder_multipliers[player_id] @ stat_vector(player)).tolist()
+            for (user_id, slot), slot_score in zip(holders, slot_scores):
+                self.slot_scores[user_id][slot] = slot_score
+                dirty.add(user_id)
+
+        scores, order = self.state
+        if len(scores) == 0 or len(dirty) * 8 > len(order):
+            scores = {user_id: sum(self.slot_scores[user_id]) for user_id in self.seq}
+            order = sorted((-score, self.seq[user_id], user_id) for user_id, score in scores.items())
+        elif len(dirty) > 0:
+            scores = dict(scores)
+            order = list(order)
+            for user_id in dirty:
+                del order[bisect.bisect_left(order, (-scores[user_id], self.seq[user_id], user_id))]
+                scores[user_id] = sum(self.slot_scores[user_id])
+                bisect.insort(order, (-scores[user_id], self.seq[user_id], user_id))
+
+        self.state = (scores, order)
+        return len(dirty)
+
+    def top(self, n: int) -> List[int]:
+        """
+        :param: n: number of users
+        :return: user ids of the top n lineups
+        """
+        _, order = self.state
+        return [user_id for _, _, user_id in order[:n]]
+
+    def score(self, user_id: int) -> Optional[float]:
+        """
+        :param: user_id: user id
+        :return: the lineup score, or None if the lineups are not ranked yet
+        """
+        scores, _ = self.state
+        return scores.get(user_id)
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """
+        :param: user_id: user id
+        :return: the 1-based rank of the lineup, or None if the lineups are not ranked yet
+        """
+        scores, order = self.state
+        if user_id not in scores:
+            return None
+
+        return bisect.bisect_left(order, (-scores[user_id], self.seq[user_id], user_id)) + 1
+
+    def size(self) -> int:
+        _, order = self.state
+        return len(order)
+
+    @staticmethod
+    def __fingerprint(player: Optional[Dict[str, Any]]) -> Optional[tuple]:
+        if player is None:
+            return ()
+
+        return tuple(player[stats] for stats in STATS_SCORE)
+
+
+if __name__ == '__main__':
+    # benchmark, the equivalence with a full ranking is checked in tests/test_leaderboard.py
+    import random
+    import time
+
+    from service.fantasy.scoring import multiplier_vectors
+    from utils import compute_vgn_score
+
+    random.seed(7)
+    all_players = list(range(1, 301))
+    all_lineups = {user: random.sample(all_players, 8) for user in range(1, 20001)}
+    all_collections = {user: {} for user in all_lineups}
+
+    def random_stats():
+        stats = {key: random.randint(0, 12) for key in STATS_SCORE}
+        stats['win'] = random.randint(0, 1)
+        for key in ['doubleDouble', 'tripleDouble', 'quadrupleDouble', 'fiveDouble']:
+            stats[key] = 0
+        return stats
+
+    def full_ranking(stats):
+        user_scores = {}
+        for user_id, player_ids in all_lineups.items():
+            vgn_scores = [compute_vgn_score(stats.get(pid), all_collections[user_id].get(pid)) for pid in player_ids]
+            user_scores[user_id] = sum([vgn_scores[0] * 1.5, vgn_scores[1], vgn_scores[2], vgn_scores[3],
+                                        vgn_scores[4], vgn_scores[5] * 0.5, vgn_scores[6] * 0.5, vgn_scores[7] * 0.5])
+        user_ids = list(user_scores.keys())
+        user_ids.sort(key=lambda uid: user_scores[uid], reverse=True)
+        return user_ids
+
+    board = Leaderboard()
+    board.reset(all_lineups, {user: multiplier_vectors({pid: None for pid in ids}) for user, ids in all_lineups.items()})
+    current = {pid: random_stats() for pid in all_players}
+    board.apply(current)
+
+    for _ in range(5):
+        current = dict(current)
+        for pid in random.sample(all_players, 10):
+            current[pid] = random_stats()
+
+        start = time.time()
+        rescored = board.apply(current)
+        incremental = time.time() - start
+
+        start = time.time()
+        full_ranking(current)
+        full = time.time() - start
+
+        print(f"rescored {rescored} users: incremental {incremental * 1000:.1f}ms, full {full * 1000:.1f}ms")
@@ -1,9 +1,12 @@
-import math
+import copy
+import threading
 
 from provider.nba.nba_provider import NBA_PROVIDER
+from provider.registry import REGISTRY
 from repository.vgn_collections import get_collections
 from repository.vgn_lineups import get_lineups, upsert_lineup, submit_lineup
 from repository.vgn_players import get_players
+from service.fantasy.scoring import score_players
 from utils import compute_vgn_score, truncate_message, compute_vgn_scores
 
 SALARY_CAP = 165.00
@@ -32,6 +35,9 @@ class LineupProvider:
             10: 1,
             5: 1,
         }
+        self.lock = threading.RLock()
+        # guards the lineups and collections changed by interactions against a reload publishing its staged state
+        self.state_lock = threading.Lock()
         self.reload()
 
     def __load_players(self):
@@ -57,6 +63,9 @@ class LineupProvider:
                 group += 1
             i -= 1
 
+        # score all players in one pass instead of one compute_vgn_score call each
+        scores = score_players([player['id'] for player in players], {player['id']: player for player in players})
+
         index = 0
         self.player_ids = []  # ensure players have indexes assigned
         for player in players:
@@ -65,7 +74,8 @@ class LineupProvider:
 
             self.players[player_id] = player
             self.players[player_id]['index'] = index
-            self.players[player_id]['formatted'], self.players[player_id]['score'] = self.formatted_player(player, None)
+            self.players[player_id]['formatted'], self.players[player_id]['score'] = \
+                self.formatted_player(player, None, scores[player_id])
             self.player_ids.append(player_id)
 
             self.team_to_players[self.player_to_team[player_id]].append(player_id)
@@ -82,24 +92,34 @@ class LineupProvider:
             self.collections = get_collections(self.lineups.keys(), self.players.keys())
 
     def reload(self):
-        coming_game_date = NBA_PROVIDER.get_coming_game_date()
-        if self.coming_game_date != coming_game_date:
-            self.coming_game_date = coming_game_date
-            self.team_to_opponent = {}
-            self.team_to_players = {}
-            self.formatted_teams = {}
-
-            self.player_to_team = {}
-            self.players = {}
-            self.player_ids = []
-
-            self.lineups = {}
-            self.collections = {}
-
-            self.formatted_schedule = self.__formatted_schedule()
-
-        self.__load_players()
-        self.__load_lineups_and_collections()
+        with self.lock:
+            # build the new state on a staged copy and publish it at once, interactions may read the provider meanwhile
+            staged = copy.copy(self)
+            coming_game_date = NBA_PROVIDER.get_coming_game_date()
+            new_date = self.coming_game_date != coming_game_date
+            for attr in ['team_to_opponent', 'team_to_players', 'formatted_teams', 'player_to_team', 'players',
+                         'lineups', 'collections', 'salary_pages']:
+                setattr(staged, attr, {} if new_date and attr != 'salary_pages' else dict(getattr(self, attr)))
+            staged.player_ids = []
+
+            if new_date:
+                staged.coming_game_date = coming_game_date
+                staged.formatted_schedule = staged.__formatted_schedule()
+
+            staged.__load_players()
+            staged.__load_lineups_and_collections()
+
+            with self.state_lock:
+                if not new_date:
+                    # lineups created or edited during the reload are already saved, the in-memory ones are the latest
+                    staged.lineups.update(self.lineups)
+                    if staged.collections is not None:
+                        for user_id in self.collections.keys() - staged.collections.keys():
+                            staged.collections[user_id] = self.collections[user_id]
+
+                for lineup in staged.lineups.values():
+                    lineup.provider = self
+                self.__dict__.update(staged.__dict__)
 
     def __create_lineup(self, user_id):
         self.lineups[user_id] = Lineup(
@@ -120,16 +140,18 @@ class LineupProvider:
         )
 
     def get_or_create_lineup(self, user_id):
-        if user_id not in self.lineups:
-            self.__create_lineup(user_id)
+        with self.state_lock:
+            if user_id not in self.lineups:
+                self.__create_lineup(user_id)
 
-        return self.lineups[user_id]
+            return self.lineups[user_id]
 
     def load_user_collection(self, user_id):
         collection = get_collections([user_id], self.player_ids)
 
         if collection is not None:
-            self.collections[user_id] = collection[user_id]
+            with self.state_lock:
+                self.collections[user_id] = collection[user_id]
 
     def get_user_collection(self, user_id):
         if user_id not in self.collections:
@@ -147,8 +169,9 @@ class LineupProvider:
             return ""
         return f"**({injury})**"
 
-    def formatted_player(self, player, collection):
-        score = compute_vgn_score(player, collection)
+    def formatted_player(self, player, collection, score=None):
+        if score is None:
+            score = compute_vgn_score(player, collection)
         return \
             "***{}.*** **{} +{:.2f}v {}** vs *{}* **${:.2f}m** {}\n" \
             "{:.2f}p {:.2f}r {:.2f}a {:.2f}s {:.2f}b\n".format(
@@ -258,24 +281,18 @@ class Lineup:
         self.user_id = db_lineup['user_id']
         self.game_date = db_lineup['game_date']
         self.player_ids = [
-            self.__cast_player_id(db_lineup['captain_1']),
-            self.__cast_player_id(db_lineup['starter_2']),
-            self.__cast_player_id(db_lineup['starter_3']),
-            self.__cast_player_id(db_lineup['starter_4']),
-            self.__cast_player_id(db_lineup['starter_5']),
-            self.__cast_player_id(db_lineup['bench_6']),
-            self.__cast_player_id(db_lineup['bench_7']),
-            self.__cast_player_id(db_lineup['bench_8']),
+            db_lineup['captain_1'],
+            db_lineup['starter_2'],
+            db_lineup['starter_3'],
+            db_lineup['starter_4'],
+            db_lineup['starter_5'],
+            db_lineup['bench_6'],
+            db_lineup['bench_7'],
+            db_lineup['bench_8'],
         ]
         self.submitted = db_lineup['submitted']
         self.provider = provider
 
-    @staticmethod
-    def __cast_player_id(db_player_id):
-        if db_player_id is not None and not math.isnan(float(db_player_id)):
-            return db_player_id
-        return None
-
     def formatted(self):
         message = self.provider.formatted_schedule + "\n"
 
@@ -415,4 +432,4 @@ class Lineup:
         return total_salary
 
 
-LINEUP_PROVIDER = LineupProvider()
+LINEUP_PROVIDER = REGISTRY.register('fantasy_lineup', LineupProvider)
@@ -1,14 +1,17 @@
 import datetime
+import threading
 
-from nba_api.live.nba.endpoints import boxscore
-
+from provider.nba.boxscore_cache import BOXSCORE_CACHE
 from provider.nba.nba_provider import NBAProvider, NBA_PROVIDER
+from provider.registry import REGISTRY
 from repository.vgn_collections import get_collections
-from repository.vgn_lineups import get_lineups, upsert_score, get_weekly_ranks, get_submission_count
+from repository.vgn_lineups import get_lineups, update_scores, get_weekly_ranks, get_submission_count
 from repository.vgn_players import get_empty_players_stats
 from repository.vgn_users import get_users
+from service.fantasy.leaderboard import Leaderboard
 from service.fantasy.lineup import Lineup, LINEUP_PROVIDER
-from utils import compute_vgn_score, truncate_message, compute_vgn_scores, get_game_info, to_slash_date
+from service.fantasy.scoring import multiplier_vectors, score_players
+from utils import truncate_message, compute_vgn_scores, get_game_info, to_slash_date
 
 
 class RankingProvider:
@@ -21,9 +24,9 @@ class RankingProvider:
         self.games = []
 
         self.player_stats = {}
-        self.scores = {}
-        self.leaderboard = {}
+        self.board = Leaderboard()
         self.player_leaderboard = []
+        self.lock = threading.RLock()
 
         self.update()
 
@@ -36,39 +39,52 @@ class RankingProvider:
 
         loaded = get_lineups(self.current_game_date, True)
         player_ids = []
+        lineups = {}
+        collections = {}
+        multipliers = {}
+        player_stats = {}
         for lineup in loaded:
-            self.lineups[lineup['user_id']] = Lineup(lineup, self)
+            lineups[lineup['user_id']] = Lineup(lineup, self)
 
-        if len(self.lineups) > 0:
-            all_collections = get_collections(self.lineups.keys(), game_day_players)
-            all_users = get_users(self.lineups.keys())
+        if len(lineups) > 0:
+            all_collections = get_collections(lineups.keys(), game_day_players)
+            all_users = get_users(lineups.keys())
 
-            for user_id in self.lineups:
-                self.collections[user_id] = {
+            for user_id in lineups:
+                collections[user_id] = {
                     0: all_users[user_id]['topshot_username']
                 }
-                player_ids.extend(self.lineups[user_id].player_ids)
-                for player_id in self.lineups[user_id].player_ids:
+                player_ids.extend(lineups[user_id].player_ids)
+                for player_id in lineups[user_id].player_ids:
                     if player_id is None:
                         continue
 
-                    self.collections[user_id][player_id] = all_collections[user_id].get(player_id)
+                    collections[user_id][player_id] = all_collections[user_id].get(player_id)
+                multipliers[user_id] = multiplier_vectors(
+                    {player_id: collections[user_id][player_id] for player_id in collections[user_id] if player_id != 0})
 
             player_ids = list(set(player_ids))
             if None in player_ids:
                 player_ids.remove(None)
-            self.player_stats = get_empty_players_stats(player_ids)
+            player_stats = get_empty_players_stats(player_ids)
+
+        return lineups, collections, multipliers, player_stats
 
     def reload(self):
-        self.lineups = {}
-        self.collections = {}
-        self.player_stats = {}
-        self.scores = {}
-        self.leaderboard = {}
-        self.player_leaderboard = []
-        self.__load_lineups_and_collections()
+        with self.lock:
+            lineups, collections, multipliers, player_stats = self.__load_lineups_and_collections()
+            board = Leaderboard()
+            board.reset({user_id: lineup.player_ids for user_id, lineup in lineups.items()}, multipliers)
+
+            # publish the new day at once, interactions may read the provider from the event loop meanwhile
+            self.lineups, self.collections, self.player_stats = lineups, collections, player_stats
+            self.board, self.player_leaderboard = board, []
 
     def update(self):
+        with self.lock:
+            self.__update()
+
+    def __update(self):
         scoreboard = NBAProvider.get_scoreboard()
         new_status = self.get_status(scoreboard['games'])
         if new_status == "NO_GAME" or new_status == "PRE_GAME":
@@ -113,7 +129,7 @@ class RankingProvider:
         all_player_stats = {}
         for game_id in self.games:
             try:
-                game_stats = boxscore.BoxScore(game_id=game_id).get_dict()['game']
+                game_stats = BOXSCORE_CACHE.get(game_id)
             except Exception:
                 continue
 
@@ -132,39 +148,23 @@ class RankingProvider:
                 if raw_stats['played'] == '1':
                     self.record_player_stats(all_player_stats, raw_stats, game_info, win)
 
-        user_scores = {}
-        for user_id in self.lineups:
-            vgn_scores = [compute_vgn_score(
-                all_player_stats.get(player_id),
-                self.collections[user_id].get(player_id)
-            ) for player_id in self.lineups[user_id].player_ids]
-            user_scores[user_id] = {
-                'score': sum([vgn_scores[0] * 1.5, vgn_scores[1], vgn_scores[2], vgn_scores[3], vgn_scores[4],
-                              vgn_scores[5] * 0.5, vgn_scores[6] * 0.5, vgn_scores[7] * 0.5])
-            }
-
-        user_ids = list(user_scores.keys())
-        user_ids.sort(key=lambda uid: user_scores[uid]['score'], reverse=True)
-
-        leaderboard = []
-        for i, user_id in enumerate(user_ids):
-            user_scores[user_id]['rank'] = i + 1
-            leaderboard.append(user_id)
-
-        self.scores = user_scores
-        self.leaderboard = leaderboard
-
-        player_scores = {}
-        for player_id in all_player_stats:
-            self.player_stats[player_id] = all_player_stats[player_id]
-            player_scores[player_id] = compute_vgn_score(all_player_stats[player_id])
+        # only the lineups holding players whose stats changed are re-scored
+        self.board.apply(all_player_stats)
+
+        player_stats = dict(self.player_stats)
+        player_stats.update(all_player_stats)
+        player_scores = score_players(list(all_player_stats.keys()), all_player_stats)
         player_ids = list(player_scores.keys())
         player_ids.sort(key=lambda pid: player_scores[pid], reverse=True)
-        self.player_leaderboard = player_ids
+
+        self.player_stats, self.player_leaderboard = player_stats, player_ids
 
     def __upload_leaderboard(self):
-        for user_id in self.lineups:
-            upsert_score(user_id, self.lineups[user_id].game_date, self.scores[user_id]['score'])
+        written = update_scores([
+            (user_id, self.lineups[user_id].game_date, self.board.score(user_id) or 0.0) for user_id in self.lineups
+        ])
+        if written < len(self.lineups):
+            print(f"Uploaded {written} of {len(self.lineups)} lineup scores.")
 
     def formatted_leaderboard(self, top):
         if self.status != "IN_GAME" and self.status != "POST_GAME":
@@ -174,9 +174,9 @@ class RankingProvider:
 
         message = "***Leaderboard {}***\n\n".format(self.current_game_date)
         messages = []
-        for i in range(0, min(top, len(self.leaderboard))):
+        for i, user_id in enumerate(self.board.top(top)):
             new_message = "#**{}.**  **{}** *+{:.2f}v*\n".format(
-                i + 1, self.collections[self.leaderboard[i]][0], self.scores[self.leaderboard[i]]['score'])
+                i + 1, self.collections[user_id][0], self.board.score(user_id))
             message, _ = truncate_message(messages, message, new_message, 1950)
 
         message, _ = truncate_message(messages, message, "Total submissions: **{}**\n".format(len(self.lineups)), 1950)
@@ -223,12 +223,13 @@ class RankingProvider:
         if user_id not in self.lineups:
             return ["User lineup not found."]
 
-        if user_id not in self.scores:
+        score = self.board.score(user_id)
+        if score is None:
             return ["Scores are not updated yet."]
 
         messages = []
         message = "**{} {:.2f}v Rank#{}**\n".format(
-            self.collections[user_id][0], self.scores[user_id]['score'], self.scores[user_id]['rank']
+            self.collections[user_id][0], score, self.board.rank(user_id)
         )
         for i in range(0, 8):
             new_message = self.formatted_player(user_id, i)
@@ -342,4 +343,4 @@ class RankingProvider:
             return "POST_GAME"
 
 
-RANK_PROVIDER = RankingProvider()
+RANK_PROVIDER = REGISTRY.register('fantasy_ranking', RankingProvider)
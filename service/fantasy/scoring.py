@@ -0,0 +1,136 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from constants import EMPTY_PLAYER_COLLECTION, STATS_PLAY_TYPE, STATS_SCORE
+
+LINEUP_WEIGHTS = np.array([1.5, 1.0, 1.0, 1.0, 1.0, 0.5, 0.5, 0.5])
+
+SCORED_STATS = list(STATS_PLAY_TYPE.keys())
+DOUBLES = ['doubleDouble', 'tripleDouble', 'quadrupleDouble', 'fiveDouble']
+# feature columns: scored stats, point bonus, multi-doubles, foul-out
+FEATURES = SCORED_STATS + ['pointBonus'] + DOUBLES + ['foulOut']
+FEATURE_COUNT = len(FEATURES)
+
+STATS_WEIGHTS = np.array([STATS_SCORE[stats] for stats in SCORED_STATS])
+STATS_SIGNS = np.where(STATS_WEIGHTS > 0.0, 1.0, -1.0)
+DOUBLES_WEIGHTS = np.array([STATS_SCORE[stats] for stats in DOUBLES])
+FOUL_OUT_SCORE = -5.0
+
+
+def stat_vector(player: Optional[Dict[str, Any]]) -> np.ndarray:
+    """
+    Build the feature vector of a player, all zeros when the player has no stats.
+
+    :param: player: enriched boxscore statistics of a player
+    :return: a vector of FEATURE_COUNT values
+    """
+    vector = np.zeros(FEATURE_COUNT)
+    if player is None:
+        return vector
+
+    for i, stats in enumerate(SCORED_STATS):
+        vector[i] = player[stats]
+
+    point_bonus = int(player['points'] / 10)
+    vector[len(SCORED_STATS)] = float(point_bonus) * float(point_bonus + 1) / 2.0
+
+    for i, stats in enumerate(DOUBLES):
+        vector[len(SCORED_STATS) + 1 + i] = player[stats]
+
+    vector[-1] = 1.0 if player['foulsPersonal'] >= 6 else 0.0
+    return vector
+
+
+def multiplier_vector(collection: Optional[Dict[str, Any]] = None) -> np.ndarray:
+    """
+    Build the per-feature score multipliers of a collection, the stat weights with the collection bonus applied.
+
+    :param: collection: collection of a user for a player, None for no collection
+    :return: a vector of FEATURE_COUNT values
+    """
+    if collection is None:
+        collection = EMPTY_PLAYER_COLLECTION
+
+    play_types = np.array([float(collection[STATS_PLAY_TYPE[stats]]) for stats in SCORED_STATS])
+    return np.concatenate([
+        STATS_WEIGHTS * (1000.0 + STATS_SIGNS * play_types) / 1000.0,
+        [(1000.0 + float(collection['reel'])) / 1000.0],
+        DOUBLES_WEIGHTS,
+        [FOUL_OUT_SCORE],
+    ])
+
+
+def multiplier_vectors(collections: Dict[int, Any]) -> Dict[int, np.ndarray]:
+    """
+    :param: collections: {player_id: collection} of one user
+    :return: {player_id: multiplier vector}
+    """
+    return {player_id: multiplier_vector(collection) for player_id, collection in collections.items()}
+
+
+def stats_matrix(player_ids: List[int], player_stats: Dict[int, Dict[str, Any]]) -> np.ndarray:
+    """
+    :param: player_ids: list of player ids, one row each
+    :param: player_stats: {player_id: enriched boxscore statistics}
+    :return: a (players x FEATURE_COUNT) matrix
+    """
+    matrix = np.zeros((len(player_ids), FEATURE_COUNT))
+    for i, player_id in enumerate(player_ids):
+        matrix[i] = stat_vector(player_stats.get(player_id))
+
+    return matrix
+
+
+def collection_tensor(lineups: Dict[int, List[Optional[int]]],
+                      collections: Dict[int, Dict[int, Any]]) -> np.ndarray:
+    """
+    :param: lineups: {user_id: list of the 8 player ids of the lineup}
+    :param: collections: {user_id: {player_id: collection}}
+    :return: a (users x 8 x FEATURE_COUNT) tensor of multipliers, in the order of `lineups`
+    """
+    tensor = np.zeros((len(lineups), len(LINEUP_WEIGHTS), FEATURE_COUNT))
+    for u, (user_id, player_ids) in enumerate(lineups.items()):
+        for slot, player_id in enumerate(player_ids):
+            if player_id is not None:
+                tensor[u, slot] = multiplier_vector(collections[user_id].get(player_id))
+
+    return tensor
+
+
+def score_lineups(lineups: Dict[int, List[Optional[int]]], collections: Dict[int, Dict[int, Any]],
+                  player_stats: Dict[int, Dict[str, Any]]) -> Dict[int, float]:
+    """
+    Score all lineups at once, equivalent to the weighted sum of `utils.compute_vgn_score` over each lineup.
+
+    :param: lineups: {user_id: list of the 8 player ids of the lineup}
+    :param: collections: {user_id: {player_id: collection}}
+    :param: player_stats: {player_id: enriched boxscore statistics}
+    :return: {user_id: lineup score}
+    """
+    if len(lineups) == 0:
+        return {}
+
+    player_ids = list({pid for ids in lineups.values() for pid in ids if pid is not None})
+    rows = {player_id: i for i, player_id in enumerate(player_ids)}
+    # the extra last row stays empty, it stands for the empty slots
+    matrix = np.vstack([stats_matrix(player_ids, player_stats), np.zeros((1, FEATURE_COUNT))])
+    indexes = np.array([[len(player_ids) if pid is None else rows[pid] for pid in ids] for ids in lineups.values()])
+
+    slot_scores = np.einsum('usk,usk->us', matrix[indexes], collection_tensor(lineups, collections))
+    return dict(zip(lineups.keys(), (slot_scores @ LINEUP_WEIGHTS).tolist()))
+
+
+def score_players(player_ids: List[int], player_stats: Dict[int, Dict[str, Any]]) -> Dict[int, float]:
+    """
+    Score players without any collection bonus, equivalent to `utils.compute_vgn_score(player)`.
+
+    :param: player_ids: list of player ids
+    :param: player_stats: {player_id: enriched boxscore statistics}
+    :return: {player_id: score}
+    """
+    if len(player_ids) == 0:
+        return {}
+
+    return dict(zip(player_ids, (stats_matrix(player_ids, player_stats) @ multiplier_vector()).tolist()))
+
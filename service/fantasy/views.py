@@ -1,11 +1,14 @@
 import discord
 
 import utils
-from repository.vgn_collections import upsert_collection as repo_upsert_collection
 from repository.vgn_lineups import get_weekly_score
-from repository.vgn_users import get_user
+from provider.registry import REGISTRY
 from service.fantasy.ranking import RANK_PROVIDER
-from provider.topshot.cadence.flow_collections import get_account_plays
+from service.runtime import run_blocking
+
+# providers the fantasy views read, warmed up before the views are posted
+FANTASY_PROVIDERS = ['nba', 'fantasy_lineup', 'fantasy_ranking']
+LOADING_MESSAGE = "The game is still loading, please retry in a minute."
 
 
 class FantasyView(discord.ui.View):
@@ -27,6 +30,10 @@ class MainStartButton(discord.ui.Button['Start']):
     async def callback(self, interaction: discord.Interaction):
         assert self.view is not None
         view: MainPage = self.view
+        if not REGISTRY.are_ready(FANTASY_PROVIDERS):
+            await interaction.response.send_message(content=LOADING_MESSAGE, ephemeral=True, delete_after=60.0)
+            return
+
         message, new_view = view.launch_fantasy(interaction.user.id)
 
         await interaction.response.send_message(content=message, view=new_view, ephemeral=True, delete_after=600.0)
@@ -94,7 +101,6 @@ class LineupSubmitButton(discord.ui.Button['LineupSubmit']):
 
         message, new_view = view.submit_lineup()
         await interaction.response.edit_message(content=message, view=new_view)
-        await view.reload_collection()
 
 
 class LineupRemoveButton(discord.ui.Button['LineupRemove']):
@@ -140,7 +146,7 @@ class LineupWeekScoreButton(discord.ui.Button['LineupWeek']):
     async def callback(self, interaction: discord.Interaction):
         assert self.view is not None
         view: LineupView = self.view
-        message, new_view = view.check_week_score()
+        message, new_view = await view.check_week_score()
 
         await interaction.response.edit_message(content=message, view=new_view)
 
@@ -182,38 +188,16 @@ class LineupView(FantasyView):
     def check_score(self):
         return RANK_PROVIDER.formatted_user_score(self.user_id)[0], self
 
-    def check_week_score(self):
+    async def check_week_score(self):
         if RANK_PROVIDER.current_game_date == "":
             date = self.lineup_provider.coming_game_date
         else:
             date = RANK_PROVIDER.current_game_date
 
         dates = utils.get_the_past_week(date)
-        score = get_weekly_score(dates, self.user_id)
+        score = await run_blocking(get_weekly_score, dates, self.user_id)
         return f"Total score {dates[0]}~{dates[-1]}: **{score}**", self
 
-    async def reload_collection(self):
-        vgn_user = get_user(self.user_id)
-
-        if vgn_user is None:
-            return "Account not found, contact admin for registration.", self, False
-
-        user_id = vgn_user[0]
-        flow_address = vgn_user[2]
-
-        try:
-            plays = await get_account_plays(flow_address)
-        except:
-            return "Failed to fetch collection, try again or contact admin.", self, False
-
-        try:
-            message = repo_upsert_collection(user_id, plays)
-        except:
-            return "Failed to update database, try again or contact admin.", self, False
-
-        self.lineup_provider.load_user_collection(self.user_id)
-        return message, self, True
-
 
 class RemovePlayerButton(discord.ui.Button['RemovePlayer']):
     def __init__(self, row, player_name, pos_idx):
@@ -1,6 +1,8 @@
-import math
+import copy
+import threading
 
 from provider.nba.nba_provider import NBA_PROVIDER
+from provider.registry import REGISTRY
 from provider.topshot.fb_provider import FB_PROVIDER
 from repository.fb_lineups import get_lineups, upsert_lineup
 from repository.vgn_players import get_players
@@ -13,23 +15,17 @@ class Lineup:
         self.user_id = db_lineup['user_id']
         self.game_date = db_lineup['game_date']
         self.player_ids: [int] = [
-            self.__cast_player_id(db_lineup['player_1']),
-            self.__cast_player_id(db_lineup['player_2']),
-            self.__cast_player_id(db_lineup['player_3']),
-            self.__cast_player_id(db_lineup['player_4']),
-            self.__cast_player_id(db_lineup['player_5']),
-            self.__cast_player_id(db_lineup['player_6']),
-            self.__cast_player_id(db_lineup['player_7']),
-            self.__cast_player_id(db_lineup['player_8']),
+            db_lineup['player_1'],
+            db_lineup['player_2'],
+            db_lineup['player_3'],
+            db_lineup['player_4'],
+            db_lineup['player_5'],
+            db_lineup['player_6'],
+            db_lineup['player_7'],
+            db_lineup['player_8'],
         ]
         self.service = service
 
-    @staticmethod
-    def __cast_player_id(db_player_id):
-        if db_player_id is not None and not math.isnan(float(db_player_id)):
-            return db_player_id
-        return None
-
     def formatted(self):
         message = self.service.formatted_schedule + "\n"
 
@@ -122,6 +118,9 @@ class LineupService(FastBreakService):
         self.lineups = {}
         self.formatted_teams = {}
         self.formatted_fb_schedule = ""
+        self.lock = threading.RLock()
+        # guards the lineups changed by interactions against a reload publishing its staged state
+        self.state_lock = threading.Lock()
         self.reload()
 
     def __load_players(self):
@@ -161,28 +160,39 @@ class LineupService(FastBreakService):
             self.lineups[lineup['user_id']] = Lineup(lineup, self)
 
     def reload(self):
-        FB_PROVIDER.reload()
-        coming_game_date = FB_PROVIDER.get_coming_game_date()
-        if self.coming_game_date != coming_game_date:
-            self.coming_game_date = coming_game_date
-            self.team_to_opponent = {}
-            self.team_to_players = {}
-            self.player_to_team = {}
-            self.players = {}
-            self.player_ids = []
-            self.formatted_teams = {}
-            self.lineups = {}
-
-            fb_schedule = "**Schedule**\n\n"
-            for d in FB_PROVIDER.fb_info:
-                fb = FastBreak(FB_PROVIDER.fb_info[d])
-                fb_schedule += f"**{d}**\n{fb.get_formatted()[2:-4]}\n"
-            self.formatted_fb_schedule = fb_schedule
-
-        self.fb = FastBreak(FB_PROVIDER.get_fb(self.coming_game_date))
-        self.formatted_schedule = self.__formatted_schedule()
-        self.__load_players()
-        self.__load_lineups()
+        with self.lock:
+            FB_PROVIDER.reload()
+
+            # build the new state on a staged copy and publish it at once, interactions may read the service meanwhile
+            staged = copy.copy(self)
+            coming_game_date = FB_PROVIDER.get_coming_game_date()
+            new_date = self.coming_game_date != coming_game_date
+            for attr in ['team_to_opponent', 'team_to_players', 'player_to_team', 'players', 'formatted_teams',
+                         'lineups']:
+                setattr(staged, attr, {} if new_date else dict(getattr(self, attr)))
+
+            if new_date:
+                staged.coming_game_date = coming_game_date
+
+                fb_schedule = "**Schedule**\n\n"
+                for d in FB_PROVIDER.fb_info:
+                    fb = FastBreak(FB_PROVIDER.fb_info[d])
+                    fb_schedule += f"**{d}**\n{fb.get_formatted()[2:-4]}\n"
+                staged.formatted_fb_schedule = fb_schedule
+
+            staged.fb = FastBreak(FB_PROVIDER.get_fb(staged.coming_game_date))
+            staged.formatted_schedule = staged.__formatted_schedule()
+            staged.__load_players()
+            staged.__load_lineups()
+
+            with self.state_lock:
+                if not new_date:
+                    # lineups created or edited during the reload are already saved, the in-memory ones are the latest
+                    staged.lineups.update(self.lineups)
+
+                for lineup in staged.lineups.values():
+                    lineup.service = self
+                self.__dict__.update(staged.__dict__)
 
     def __create_lineup(self, user_id):
         self.lineups[user_id] = Lineup(
@@ -202,10 +212,11 @@ class LineupService(FastBreakService):
         )
 
     def get_or_create_lineup(self, user_id) -> Lineup:
-        if user_id not in self.lineups:
-            self.__create_lineup(user_id)
+        with self.state_lock:
+            if user_id not in self.lineups:
+                self.__create_lineup(user_id)
 
-        return self.lineups[user_id]
+            return self.lineups[user_id]
 
     def get_opponent(self, player_id):
         return self.team_to_opponent[self.player_to_team[player_id]]
@@ -237,4 +248,4 @@ class LineupService(FastBreakService):
         return message
 
 
-LINEUP_SERVICE = LineupService()
+LINEUP_SERVICE = REGISTRY.register('fastbreak_lineup', LineupService)
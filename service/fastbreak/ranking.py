@@ -1,8 +1,9 @@
 import datetime
+import threading
 
-from nba_api.live.nba.endpoints import boxscore
-
+from provider.nba.boxscore_cache import BOXSCORE_CACHE
 from provider.nba.nba_provider import NBAProvider, NBA_PROVIDER
+from provider.registry import REGISTRY
 from provider.topshot.fb_provider import FB_PROVIDER
 from repository.fb_lineups import get_lineups
 from repository.vgn_players import get_empty_players_stats
@@ -21,42 +22,46 @@ class RankingService(FastBreakService):
 
         self.status = "PRE_GAME"
         self.player_stats = {}
+        self.lock = threading.RLock()
 
         self.update()
 
     def __load_lineups(self):
+        lineups = {}
+        player_stats = {}
         if self.fb is None:
-            return
-
-        game_day_players = []
-        for game_id, game in NBA_PROVIDER.get_games_on_date(self.current_game_date).items():
-            for team in [game['homeTeam'], game['awayTeam']]:
-                for player in NBA_PROVIDER.get_players_for_team(team):
-                    game_day_players.append(player)
+            return lineups, player_stats
 
         loaded = get_lineups(self.current_game_date)
         player_ids = []
         for lineup in loaded:
             new_lineup = Lineup(lineup, self)
             if new_lineup.is_valid():
-                self.lineups[lineup['user_id']] = new_lineup
+                lineups[lineup['user_id']] = new_lineup
 
-        if len(self.lineups) > 0:
-            for user_id in self.lineups:
-                player_ids.extend(self.lineups[user_id].player_ids)
+        if len(lineups) > 0:
+            for user_id in lineups:
+                player_ids.extend(lineups[user_id].player_ids)
 
             player_ids = list(set(player_ids))
             if None in player_ids:
                 player_ids.remove(None)
-            self.player_stats = get_empty_players_stats(player_ids)
+            player_stats = get_empty_players_stats(player_ids)
+
+        return lineups, player_stats
 
     def reload(self):
-        FB_PROVIDER.reload()
-        self.fb = FastBreak(FB_PROVIDER.get_fb(self.current_game_date))
-        self.lineups = {}
-        self.__load_lineups()
+        with self.lock:
+            FB_PROVIDER.reload()
+            self.fb = FastBreak(FB_PROVIDER.get_fb(self.current_game_date))
+            lineups, player_stats = self.__load_lineups()
+            self.lineups, self.player_stats = lineups, player_stats
 
     def update(self):
+        with self.lock:
+            self.__update()
+
+    def __update(self):
         scoreboard = NBAProvider.get_scoreboard()
         new_status = self.get_status(scoreboard['games'])
         if new_status == "NO_GAME" or new_status == "PRE_GAME":
@@ -87,7 +92,7 @@ class RankingService(FastBreakService):
         for game_id in self.games:
             # noinspection PyBroadException
             try:
-                game_stats = boxscore.BoxScore(game_id=game_id).get_dict()['game']
+                game_stats = BOXSCORE_CACHE.get(game_id)
             except Exception:
                 continue
 
@@ -110,8 +115,10 @@ class RankingService(FastBreakService):
                     player_stats[player_id]['name'] = player['name']
                     player_stats[player_id]['gameInfo'] = game_info
 
-        for player_id in player_stats:
-            self.player_stats[player_id] = player_stats[player_id]
+        # publish a merged copy at once so readers never see a half updated dictionary
+        merged = dict(self.player_stats)
+        merged.update(player_stats)
+        self.player_stats = merged
 
     def formatted_user_score(self, user_id):
         if self.status == "NO_GAME" or self.status == "PRE_GAME":
@@ -170,4 +177,4 @@ class RankingService(FastBreakService):
             return "POST_GAME"
 
 
-RANK_SERVICE = RankingService()
+RANK_SERVICE = REGISTRY.register('fastbreak_ranking', RankingService)
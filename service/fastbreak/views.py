@@ -1,9 +1,14 @@
 import discord
 
+from provider.registry import REGISTRY
 from provider.topshot.fb_provider import FB_PROVIDER
 from service.fastbreak.lineup import LineupService
 from service.fastbreak.ranking import RankingService, RANK_SERVICE
 
+# providers the fastbreak views read, warmed up before the views are posted
+FASTBREAK_PROVIDERS = ['nba', 'fastbreak', 'fastbreak_lineup', 'fastbreak_ranking']
+LOADING_MESSAGE = "Fastbreak is still loading, please retry in a minute."
+
 
 class FastBreakView(discord.ui.View):
     def __init__(self, lineup_service, user_id):
@@ -24,6 +29,10 @@ class MainStartButton(discord.ui.Button['Start']):
     async def callback(self, interaction: discord.Interaction):
         assert self.view is not None
         view: MainPage = self.view
+        if not REGISTRY.are_ready(FASTBREAK_PROVIDERS):
+            await interaction.response.send_message(content=LOADING_MESSAGE, ephemeral=True, delete_after=60.0)
+            return
+
         message, new_view = view.launch_fb(interaction.user.id)
 
         await interaction.response.send_message(content=message, view=new_view, ephemeral=True, delete_after=600.0)
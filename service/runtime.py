@@ -0,0 +1,22 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+MAX_WORKERS = 4
+
+EXECUTOR = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="vgn-worker")
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking call (provider update, repository query, message formatting) in the bounded worker pool.
+
+    The Discord event loop keeps serving interactions while the call runs. Providers updated this way build their new
+    state aside and swap it in at the end, so interactions never observe a half-updated provider.
+
+    :param: func: the blocking function
+    :return: whatever the function returns
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(EXECUTOR, functools.partial(func, *args, **kwargs))
@@ -0,0 +1,22 @@
+from constants import EMPTY_PLAYER_COLLECTION, STATS_SCORE
+
+
+def random_stats(rng):
+    """
+    :param: rng: random.Random of the test
+    :return: a boxscore line of a player, in the keys of STATS_SCORE
+    """
+    stats = {key: float(rng.randint(0, 15)) for key in STATS_SCORE}
+    stats['points'] = float(rng.randint(0, 60))
+    stats['foulsPersonal'] = float(rng.randint(0, 6))
+    stats['win'] = float(rng.randint(0, 1))
+    return stats
+
+
+def random_collection(rng):
+    """
+    :param: rng: random.Random of the test
+    :return: a player collection, or None for a player the user does not collect
+    """
+    collection = {key: rng.randint(0, 300) for key in EMPTY_PLAYER_COLLECTION}
+    return rng.choice([None, collection])
@@ -0,0 +1,29 @@
+import unittest
+
+from provider.topshot.ts_provider import hash_collection_plays
+from service.fantasy.collection_sync import hash_moment_ids
+
+
+class CollectionSyncHashTest(unittest.TestCase):
+    """
+    Stored sync hashes only change with the moment ids of an account or with the content of the reference data.
+    """
+
+    def test_hash_moment_ids(self):
+        self.assertEqual(hash_moment_ids([3, 1, 2], 'a'), hash_moment_ids([1, 2, 3], 'a'))
+        self.assertNotEqual(hash_moment_ids([1, 2, 3], 'a'), hash_moment_ids([1, 2, 4], 'a'))
+        self.assertNotEqual(hash_moment_ids([1, 2, 3], 'a'), hash_moment_ids([1, 2, 3], 'b'))
+
+    def test_hash_collection_plays(self):
+        play_info = {1: [], 2: []}
+        collection_plays = {(1, 10): (5, 'forward', 1, 0, 0), (2, 10): (None, 'guard', 2, 1, 1)}
+        reordered = {(2, 10): (None, 'guard', 2, 1, 1), (1, 10): (5, 'forward', 1, 0, 0)}
+
+        reference = hash_collection_plays(play_info, collection_plays)
+        self.assertEqual(reference, hash_collection_plays({2: [], 1: []}, reordered))
+        self.assertNotEqual(reference, hash_collection_plays(play_info, {(1, 10): (5, 'forward', 2, 0, 0)}))
+        self.assertNotEqual(reference, hash_collection_plays({1: [], 2: [], 3: []}, collection_plays))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from grpclib.const import Status
+from grpclib.exceptions import GRPCError, StreamTerminatedError
+
+from provider.topshot.cadence import flow_client_pool
+from provider.topshot.cadence.flow_client_pool import FlowClientPool
+
+
+class FakeChannel:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClient:
+    def __init__(self, host=None, port=None):
+        self.channel = FakeChannel()
+        self.error = None
+
+    async def execute_script(self, script, at_block_height=None):
+        if self.error is not None:
+            raise self.error
+        return script
+
+
+class FlowClientPoolTest(unittest.TestCase):
+    """
+    Only transport errors drop a client, and the channels of a previous loop are closed.
+    """
+
+    def setUp(self):
+        patcher = mock.patch.object(flow_client_pool, 'flow_client', FakeClient)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pool = FlowClientPool(size=1)
+
+    def fail_with(self, error):
+        async def run():
+            client = self.pool.clients[0]
+            client.error = error
+            with self.assertRaises(type(error)):
+                await self.pool.execute_script('script')
+            return client
+
+        return run()
+
+    def test_transport_errors_drop_the_client(self):
+        async def run():
+            for error in [StreamTerminatedError('reset'), ConnectionResetError('reset'),
+                          GRPCError(Status.UNAVAILABLE, 'unavailable')]:
+                await self.pool.execute_script('script')
+                client = await self.fail_with(error)
+                self.assertTrue(client.channel.closed)
+                self.assertIsNone(self.pool.clients[0])
+
+        asyncio.run(run())
+
+    def test_script_errors_keep_the_client(self):
+        async def run():
+            for error in [GRPCError(Status.INVALID_ARGUMENT, 'bad script'), ValueError('bad result')]:
+                await self.pool.execute_script('script')
+                client = await self.fail_with(error)
+                self.assertFalse(client.channel.closed)
+                self.assertIs(self.pool.clients[0], client)
+                client.error = None
+
+        asyncio.run(run())
+
+    def test_new_loop_closes_old_channels(self):
+        async def run():
+            return await self.pool.execute_script('script')
+
+        asyncio.run(run())
+        client = self.pool.clients[0]
+        asyncio.run(run())
+
+        self.assertTrue(client.channel.closed)
+        self.assertIsNot(self.pool.clients[0], client)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import asyncio
+import unittest
+import warnings
+
+from gql import GraphQLRequest
+
+from provider.topshot.graphql.gateway import GraphQLGateway
+
+QUERY = """
+    query search($id: ID) {
+        getPlay(id: $id) { id }
+    }
+"""
+
+
+class FakeSession:
+    def __init__(self):
+        self.requests = []
+
+    async def execute(self, request, **kwargs):
+        self.requests.append(request)
+        return {'variables': request.variable_values}
+
+
+class GraphQLGatewayTest(unittest.TestCase):
+    """
+    Every call sends its own variables, the parsed document is the only state shared between calls.
+    """
+
+    def test_execute_sends_own_variables(self):
+        async def run():
+            gateway = GraphQLGateway(rate=1000, burst=1000)
+            gateway.loop = asyncio.get_running_loop()
+            gateway.lock = asyncio.Lock()
+            gateway.session = FakeSession()
+
+            results = [await gateway.execute(QUERY, {'id': '1'}), await gateway.execute(QUERY),
+                       await gateway.execute(QUERY, {})]
+            return gateway.session.requests, results
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', DeprecationWarning)
+            requests, results = asyncio.run(run())
+
+        self.assertEqual(results, [{'variables': {'id': '1'}}, {'variables': {}}, {'variables': {}}])
+        self.assertTrue(all(isinstance(request, GraphQLRequest) for request in requests))
+        self.assertEqual(len({id(request) for request in requests}), 3)
+        self.assertEqual(len({id(request.document) for request in requests}), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import unittest
+
+import requests
+
+from provider.nba.injuries import InjurySource, merge_injuries, parse_cbs_injuries, parse_espn_injuries
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'injuries')
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as file:
+        return file.read()
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(headers)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class InjuriesTest(unittest.TestCase):
+    """
+    Parse saved copies of the CBS and ESPN injury pages, surrounded by page markup the strainers must skip.
+    """
+
+    def test_parse_cbs_injuries(self):
+        self.assertEqual(parse_cbs_injuries(read_fixture('cbs.html')), {
+            'Jayson Tatum': 'OUT season',
+            'Kristaps Porzingis': 'Game Time Decision',
+            'Jamal Murray': 'OUT until Nov 1',
+        })
+
+    def test_parse_espn_injuries(self):
+        self.assertEqual(parse_espn_injuries(read_fixture('espn.html')), {
+            'Jayson Tatum': 'Out',
+            'Jrue Holiday': 'Day-To-Day',
+            'Aaron Gordon': 'Out',
+        })
+
+    def test_merge_injuries(self):
+        cbs = parse_cbs_injuries(read_fixture('cbs.html'))
+        espn = parse_espn_injuries(read_fixture('espn.html'))
+
+        self.assertEqual(merge_injuries(cbs, espn), {
+            'Jayson Tatum': 'OUT season',
+            'Kristaps Porzingis': 'Game Time Decision',
+            'Jamal Murray': 'OUT until Nov 1',
+            'Jrue Holiday': 'Day-To-Day',
+            'Aaron Gordon': 'Out',
+        })
+
+    def test_source_keeps_last_injuries(self):
+        source = InjurySource('CBS', 'https://example.com', parse_cbs_injuries)
+        session = FakeSession([
+            FakeResponse(200, read_fixture('cbs.html'), {'ETag': '"v1"'}),
+            FakeResponse(304),
+            FakeResponse(200, b'<div class="TableBase"></div>'),
+            requests.ConnectionError('offline'),
+        ])
+
+        injuries = source.fetch(session)
+        self.assertEqual(len(injuries), 3)
+        self.assertEqual(source.fetch(session), injuries)
+        self.assertEqual(session.requests[1]['If-None-Match'], '"v1"')
+        # a page whose layout changed is not published
+        self.assertEqual(source.fetch(session), injuries)
+        self.assertEqual(source.fetch(session), injuries)
+
+
+if __name__ == '__main__':
+    unittest.main()
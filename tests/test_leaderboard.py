@@ -0,0 +1,78 @@
+import random
+import unittest
+
+from service.fantasy.leaderboard import Leaderboard
+from service.fantasy.scoring import multiplier_vectors
+from tests.factories import random_collection, random_stats
+from utils import compute_vgn_score
+
+
+class LeaderboardTest(unittest.TestCase):
+    """
+    The incremental board must rank the lineups exactly like scoring every lineup and sorting them.
+    """
+
+    def setUp(self):
+        self.rng = random.Random(7)
+        self.players = list(range(1, 101))
+        self.lineups = {
+            user_id: self.rng.sample(self.players, 7) + [self.rng.choice([None, self.rng.choice(self.players)])]
+            for user_id in range(1, 2001)
+        }
+        self.collections = {
+            user_id: {player_id: random_collection(self.rng) for player_id in player_ids if player_id is not None}
+            for user_id, player_ids in self.lineups.items()
+        }
+
+    def full_ranking(self, stats):
+        user_scores = {}
+        for user_id, player_ids in self.lineups.items():
+            scores = [compute_vgn_score(stats.get(player_id), self.collections[user_id].get(player_id))
+                      if player_id is not None else 0.0 for player_id in player_ids]
+            user_scores[user_id] = sum([scores[0] * 1.5, scores[1], scores[2], scores[3], scores[4],
+                                        scores[5] * 0.5, scores[6] * 0.5, scores[7] * 0.5])
+
+        user_ids = list(user_scores.keys())
+        user_ids.sort(key=lambda user_id: user_scores[user_id], reverse=True)
+        return user_ids, user_scores
+
+    def assertBoardMatches(self, board, stats):
+        expected, scores = self.full_ranking(stats)
+        ranked = board.top(len(self.lineups))
+        self.assertCountEqual(ranked, expected)
+
+        for rank, user_id in enumerate(ranked):
+            self.assertEqual(board.rank(user_id), rank + 1)
+            self.assertAlmostEqual(board.score(user_id), scores[user_id], places=6)
+            # lineups with equal scores may differ in the last float bits and swap, any other difference is an error
+            self.assertAlmostEqual(scores[user_id], scores[expected[rank]], places=6)
+
+    def test_incremental_updates_match_full_ranking(self):
+        board = Leaderboard()
+        board.reset(self.lineups, {user_id: multiplier_vectors(collection)
+                                   for user_id, collection in self.collections.items()})
+
+        current = {player_id: random_stats(self.rng) for player_id in self.players}
+        board.apply(current)
+        self.assertBoardMatches(board, current)
+
+        for changed in [1, 5, 20, 0]:
+            current = dict(current)
+            for player_id in self.rng.sample(self.players, changed):
+                current[player_id] = random_stats(self.rng)
+
+            board.apply(current)
+            self.assertBoardMatches(board, current)
+
+    def test_missing_stats_score_zero(self):
+        board = Leaderboard()
+        board.reset(self.lineups, {user_id: multiplier_vectors(collection)
+                                   for user_id, collection in self.collections.items()})
+
+        current = {player_id: random_stats(self.rng) for player_id in self.players[:50]}
+        board.apply(current)
+        self.assertBoardMatches(board, current)
+
+
+if __name__ == '__main__':
+    unittest.main()
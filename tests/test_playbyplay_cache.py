@@ -0,0 +1,89 @@
+import copy
+import random
+import unittest
+
+from provider.nba.playbyplay_cache import ActionIndex, MADE_SHOT, MADE_THREE, action_kinds, action_order
+
+PLAYERS = {player_id: 'BOS' if player_id <= 10 else 'DEN' for player_id in range(1, 21)}
+
+
+def random_action(rng, action_number, order_number):
+    person_id = rng.randint(1, 20)
+    return {
+        'actionNumber': action_number,
+        'orderNumber': order_number,
+        'actionType': rng.choice(['2pt', '3pt', 'freethrow', 'rebound', 'foul']),
+        'shotResult': rng.choice(['Made', 'Missed']),
+        'personId': person_id,
+        'teamTricode': PLAYERS[person_id],
+    }
+
+
+def scan(actions, kind, players=None, team=None):
+    """
+    :return: (first, last) action of the kind, by a full scan of the actions
+    """
+    matches = [action for action in actions if kind in action_kinds(action)
+               and (not players or action['personId'] in players)
+               and (team is None or action['teamTricode'] == team)]
+    if len(matches) == 0:
+        return None, None
+
+    return min(matches, key=action_order), max(matches, key=action_order)
+
+
+class ActionIndexTest(unittest.TestCase):
+    """
+    After every refresh of a feed with new, corrected and deleted actions, the index must match a full scan of the
+    current actions.
+    """
+
+    def assertIndexMatches(self, index, actions, rng):
+        for kind in [MADE_SHOT, MADE_THREE]:
+            self.assertEqual((index.first(kind), index.last(kind)), scan(actions, kind))
+            for team in ['BOS', 'DEN']:
+                self.assertEqual((index.first_of_team(kind, team), index.last_of_team(kind, team)),
+                                 scan(actions, kind, team=team))
+            for _ in range(5):
+                players = set(rng.sample(sorted(PLAYERS), rng.randint(1, 4)))
+                self.assertEqual((index.first(kind, players), index.last(kind, players)),
+                                 scan(actions, kind, players=players))
+
+    def test_consume_matches_scan(self):
+        rng = random.Random(18)
+
+        for _ in range(20):
+            index = ActionIndex()
+            actions = []
+            next_number = 1
+            orders = iter(rng.sample(range(1, 100000), 5000))
+
+            for _ in range(40):
+                actions = copy.deepcopy(actions)  # every download is a new list of new dicts
+                for _ in range(rng.randint(0, 10)):
+                    actions.append(random_action(rng, next_number, next(orders)))
+                    next_number += 1
+
+                if len(actions) > 0 and rng.random() < 0.3:
+                    corrected = rng.choice(actions)
+                    corrected.update(random_action(rng, corrected['actionNumber'], corrected['orderNumber']))
+                if len(actions) > 0 and rng.random() < 0.2:
+                    actions.remove(rng.choice(actions))
+
+                index.consume(actions)
+                self.assertEqual(index.count, len(actions))
+                self.assertIndexMatches(index, actions, rng)
+
+    def test_consume_returns_new_actions(self):
+        rng = random.Random(3)
+        actions = [random_action(rng, number, number) for number in range(1, 11)]
+        index = ActionIndex()
+
+        self.assertEqual(index.consume(actions), 10)
+        self.assertEqual(index.consume(copy.deepcopy(actions)), 0)
+        self.assertEqual(index.consume(actions[:5] + [random_action(rng, 11, 11)]), 1)
+        self.assertEqual(index.count, 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
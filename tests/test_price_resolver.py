@@ -0,0 +1,54 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from provider.topshot.trade import price_resolver
+from provider.topshot.trade.price_resolver import ListingPriceCache, PriceResolver
+
+
+class FakeTopshotProvider:
+    set_info = {1: {'id': 'set-1'}}
+    play_info = {
+        10: [{'playerId': 'listed'}],
+        11: [{'playerId': 'unlisted'}],
+        12: [{'playerId': 'crowded'}],
+        13: [{'playerId': None}],
+    }
+    team_name_to_id = {}
+
+
+async def fake_listing_page(set_uuid, player_ids, team_ids):
+    if 'crowded' in player_ids:
+        # a full page of other plays of the player
+        return {100 + i: 5 for i in range(12)}, True
+    return ({10: 7} if 'listed' in player_ids else {}), False
+
+
+class PriceResolverTest(unittest.TestCase):
+    """
+    Only plays missing from a page which succeeded without reaching the listing limit are cached as unlisted.
+    """
+
+    def setUp(self):
+        for patcher in [mock.patch.object(price_resolver, 'TS_PROVIDER', FakeTopshotProvider()),
+                        mock.patch.object(price_resolver, 'get_listing_page', fake_listing_page)]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_resolve(self):
+        cache = ListingPriceCache()
+        collection = {1: {play_id: {'FullName': f"Play {play_id}", 'Count': 1} for play_id in [10, 11, 12, 13, 14]}}
+
+        asyncio.run(PriceResolver(cache=cache, page_sizes=[12, 1]).resolve(collection))
+
+        self.assertEqual({play_id: play['LowAsk'] for play_id, play in collection[1].items()},
+                         {10: 7, 11: 'N/A', 12: 'N/A', 13: 'N/A', 14: 'N/A'})
+        self.assertEqual(cache.get(1, 10), (True, 7))
+        self.assertEqual(cache.get(1, 11), (True, None))
+        # cut off by the listing limit, an unknown team, or no play info: nothing proves these plays unlisted
+        for play_id in [12, 13, 14]:
+            self.assertEqual(cache.get(1, play_id), (False, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
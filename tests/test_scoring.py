@@ -0,0 +1,49 @@
+import random
+import unittest
+
+from service.fantasy.scoring import score_lineups, score_players
+from tests.factories import random_collection, random_stats
+from utils import compute_vgn_score
+
+
+class ScoringTest(unittest.TestCase):
+    """
+    The vectorized scores must match compute_vgn_score, the reference scoring of a single player.
+    """
+
+    def setUp(self):
+        rng = random.Random(5)
+        self.stats = {player_id: random_stats(rng) for player_id in range(1, 201)}
+        del self.stats[7]  # a player who did not play
+        self.lineups = {
+            user_id: rng.sample(range(1, 201), 7) + [rng.choice([None, 7, rng.randint(1, 200)])]
+            for user_id in range(1, 2001)
+        }
+        self.collections = {
+            user_id: {player_id: random_collection(rng) for player_id in player_ids}
+            for user_id, player_ids in self.lineups.items()
+        }
+
+    def assertScoreEqual(self, score, reference):
+        self.assertLessEqual(abs(score - reference), 1e-9 * max(1.0, abs(reference)))
+
+    def test_score_lineups(self):
+        scores = score_lineups(self.lineups, self.collections, self.stats)
+
+        for user_id, player_ids in self.lineups.items():
+            reference = [compute_vgn_score(self.stats.get(player_id), self.collections[user_id].get(player_id))
+                         for player_id in player_ids]
+            reference = sum([reference[0] * 1.5, reference[1], reference[2], reference[3], reference[4],
+                             reference[5] * 0.5, reference[6] * 0.5, reference[7] * 0.5])
+            self.assertScoreEqual(scores[user_id], reference)
+
+    def test_score_players(self):
+        player_ids = list(range(1, 201))
+        scores = score_players(player_ids, self.stats)
+
+        for player_id in player_ids:
+            self.assertScoreEqual(scores[player_id], compute_vgn_score(self.stats.get(player_id)))
+
+
+if __name__ == '__main__':
+    unittest.main()
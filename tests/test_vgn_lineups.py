@@ -0,0 +1,69 @@
+import unittest
+
+from repository.vgn_lineups import update_scores
+
+
+class FakeCursor:
+    def __init__(self, lineups, fail):
+        self.lineups = lineups
+        self.fail = fail
+        self.rowcount = -1
+
+    def executemany(self, query, rows):
+        if self.fail:
+            raise RuntimeError('connection lost')
+        self.rowcount = len([row for row in rows if (row[1], row[2]) in self.lineups])
+
+
+class FakeConnection:
+    def __init__(self, lineups, fail):
+        self.cursor_obj = FakeCursor(lineups, fail)
+        self.committed = False
+        self.rolled_back = False
+
+    def start_transaction(self):
+        pass
+
+    def cursor(self):
+        return self.cursor_obj
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        pass
+
+
+class FakePool:
+    def __init__(self, lineups, fail=False):
+        self.connection = FakeConnection(lineups, fail)
+
+    def get_connection(self):
+        return self.connection
+
+
+class UpdateScoresTest(unittest.TestCase):
+    """
+    update_scores reports the lineups it updated, not the scores it was given.
+    """
+
+    def test_counts_updated_lineups(self):
+        lineups = {(user_id, "01/01/2000") for user_id in range(0, 10, 2)}
+        pool = FakePool(lineups)
+        scores = [(user_id, "01/01/2000", float(user_id)) for user_id in range(10)]
+
+        self.assertEqual(update_scores(scores, chunk_size=3, pool=pool), 5)
+        self.assertTrue(pool.connection.committed)
+
+    def test_rolled_back(self):
+        pool = FakePool(set(), fail=True)
+
+        self.assertEqual(update_scores([(1, "01/01/2000", 1.0)], pool=pool), 0)
+        self.assertTrue(pool.connection.rolled_back)
+
+
+if __name__ == '__main__':
+    unittest.main()
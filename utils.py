@@ -1,4 +1,7 @@
+import asyncio
 import datetime
+import hashlib
+import threading
 import time
 from typing import Dict, Union
 
@@ -151,29 +154,97 @@ def compute_vgn_scores(player, collection=None):
     return scores, total_score, total_bonus
 
 
-async def update_channel_messages(msgs, channels, messages_ids):
-    for channel in channels:
-        channel_id = channel.id
-        if channel_id not in messages_ids:
-            messages_ids[channel_id] = []
-        try:
-            for i in range(0, min(len(msgs), len(messages_ids[channel_id]))):
-                prev_message = await channel.fetch_message(messages_ids[channel_id][i])
-                await prev_message.edit(content=msgs[i])
+class RateLimiter:
+    """
+    Thread-safe limiter spacing calls evenly at `rate` calls per second, shared by the workers of a pool.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Block until the caller is allowed to make its call.
+        """
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# hash of the content last posted in each message, {message_id: hash}
+MESSAGE_HASHES: Dict[int, str] = {}
+# pause between two API calls on the same channel, discord allows 5 message edits per 5 seconds per channel
+CHANNEL_CALL_INTERVAL_SECONDS = 1.0
+
+
+def hash_message(msg: str) -> str:
+    return hashlib.sha1(msg.encode('utf-8')).hexdigest()
+
+
+async def update_channel_message_list(msgs, channel, message_ids):
+    """
+    Make the messages of one channel match `msgs`: edit the changed ones, send the missing ones, delete the extra ones.
+
+    Messages are edited through partial messages, an unchanged message costs no API call.
+
+    :param: msgs: list of message contents
+    :param: channel: discord channel
+    :param: message_ids: ids of the messages previously posted in the channel, updated in place
+    """
+    called = False
+    for i in range(0, min(len(msgs), len(message_ids))):
+        content_hash = hash_message(msgs[i])
+        if MESSAGE_HASHES.get(message_ids[i]) == content_hash:
+            continue
+
+        if called:
+            await asyncio.sleep(CHANNEL_CALL_INTERVAL_SECONDS)
+        await channel.get_partial_message(message_ids[i]).edit(content=msgs[i])
+        MESSAGE_HASHES[message_ids[i]] = content_hash
+        called = True
+
+    for i in range(len(message_ids), len(msgs)):
+        if called:
+            await asyncio.sleep(CHANNEL_CALL_INTERVAL_SECONDS)
+        new_message = await channel.send(msgs[i])
+        message_ids.append(new_message.id)
+        MESSAGE_HASHES[new_message.id] = hash_message(msgs[i])
+        called = True
 
-            for i in range(len(messages_ids[channel_id]), len(msgs)):
-                new_message = await channel.send(msgs[i])
-                messages_ids[channel_id].append(new_message.id)
+    if len(msgs) < len(message_ids):
+        redundant_ids = message_ids[len(msgs):]
+        await channel.delete_messages([channel.get_partial_message(message_id) for message_id in redundant_ids])
+        del message_ids[len(msgs):]
+        for message_id in redundant_ids:
+            MESSAGE_HASHES.pop(message_id, None)
 
-            if len(msgs) < len(messages_ids[channel_id]):
-                redundant_messages = [await channel.fetch_message(messages_ids[channel_id][i]) for i in range(len(msgs), len(messages_ids[channel_id]))]
-                await channel.delete_messages(redundant_messages)
-                messages_ids[channel.id] = messages_ids[channel.id][0:len(msgs)]
 
+async def update_channel_messages(msgs, channels, messages_ids):
+    """
+    Update the messages of all channels concurrently.
+
+    :param: msgs: list of message contents
+    :param: channels: list of discord channels
+    :param: messages_ids: {channel_id: ids of the messages previously posted in the channel}, updated in place
+    """
+    async def update(channel):
+        if channel.id not in messages_ids:
+            messages_ids[channel.id] = []
+        try:
+            await update_channel_message_list(msgs, channel, messages_ids[channel.id])
         except Exception as err:
             print(err)
-            continue
-        time.sleep(5)
+            # the next cycle edits all messages of the channel again
+            for message_id in messages_ids[channel.id]:
+                MESSAGE_HASHES.pop(message_id, None)
+
+    await asyncio.gather(*[update(channel) for channel in channels])
 
 
 async def send_channel_messages(msgs, channels):
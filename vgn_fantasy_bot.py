@@ -1,19 +1,23 @@
 #!/usr/bin/env python3
 
 import os
-from datetime import datetime
+from datetime import datetime, time, timezone
 
 import discord
 from discord.ext import commands, tasks
 from dotenv import load_dotenv
 
 from constants import TZ_ET
-from service.fantasy.views import MainPage
+from service.fantasy.views import FANTASY_PROVIDERS, MainPage
+from provider.nba.live_fetcher import LIVE_FETCHER
 from provider.nba.nba_provider import NBA_PROVIDER
+from provider.registry import REGISTRY
 from repository.vgn_collections import upsert_collection as repo_upsert_collection
 from repository.vgn_users import insert_user
 from service.fantasy import LINEUP_PROVIDER
+from service.fantasy.collection_sync import COLLECTION_SYNC
 from service.fantasy.ranking import RANK_PROVIDER
+from service.runtime import run_blocking
 from provider.topshot.cadence.flow_collections import get_account_plays
 from provider.topshot.graphql.get_address import get_flow_address
 from utils import update_channel_messages, get_the_past_week, send_channel_messages
@@ -51,8 +55,25 @@ PLAYERS_MESSAGE_IDS = {}
 VGN_EMOJI_ID = 1166225667952758815
 
 
+async def warm_up_providers() -> bool:
+    """
+    Build the providers which are not ready yet, a provider which failed is retried once its backoff passed.
+
+    :return: whether all providers are ready
+    """
+    if REGISTRY.are_ready(FANTASY_PROVIDERS):
+        return True
+
+    states = await run_blocking(REGISTRY.warm_up, FANTASY_PROVIDERS)
+    print(f"Providers: {states}")
+    return REGISTRY.are_ready(FANTASY_PROVIDERS)
+
+
 @bot.event
 async def on_ready():
+    # providers are built concurrently after login, before any view can reach them from the event loop
+    await warm_up_providers()
+
     for guild in bot.guilds:
         for channel in guild.channels:
             if channel.name in LB_CHANNEL_NAMES:
@@ -75,6 +96,7 @@ async def on_ready():
     update_leaderboard.start()
     update_games.start()
     refresh_entry.start()
+    sync_collections.start()
 
 
 async def load_and_upsert_collection(user_id, flow_address):
@@ -97,13 +119,35 @@ async def reload(context):
     if context.channel.id not in ADMIN_CHANNEL_IDS:
         return
 
-    NBA_PROVIDER.reload()
-    LINEUP_PROVIDER.reload()
-    RANK_PROVIDER.reload()
+    await run_blocking(NBA_PROVIDER.reload)
+    await run_blocking(LINEUP_PROVIDER.reload)
+    await run_blocking(RANK_PROVIDER.reload)
 
     await context.channel.send("reloaded")
 
 
+@bot.command(name='status', help="[Admin] Show the loading state of the providers")
+async def status(context):
+    if context.channel.id not in ADMIN_CHANNEL_IDS:
+        return
+
+    await context.channel.send(REGISTRY.formatted_status())
+
+
+@bot.command(name='resync', help="[Admin] Resync the collections of all users")
+async def resync(context):
+    if context.channel.id not in ADMIN_CHANNEL_IDS:
+        return
+
+    await context.channel.send(await sync_all_collections())
+
+
+async def sync_all_collections():
+    message = await COLLECTION_SYNC.run()
+    await run_blocking(LINEUP_PROVIDER.reload)
+    return message
+
+
 @bot.command(name='verify', help='[Admin] Insert a verified user record into db')
 async def verify_user(context, username, topshot_username):
     if context.channel.id not in ADMIN_CHANNEL_IDS:
@@ -137,35 +181,62 @@ async def verify_user(context, username, topshot_username):
 ############
 @tasks.loop(minutes=5)
 async def update_leaderboard():
+    # an error raised out of a routine stops it for good, the routines skip their tick until the providers are ready
+    if not await warm_up_providers():
+        return
+
+    try:
+        await refresh_leaderboard()
+    except Exception as err:
+        print(f"Failed to update leaderboard: {err}")
+
+
+async def refresh_leaderboard():
     init_status = RANK_PROVIDER.status
-    RANK_PROVIDER.update()
+    await LIVE_FETCHER.fetch_boxscores(RANK_PROVIDER.games)
+    await run_blocking(RANK_PROVIDER.update)
     new_status = RANK_PROVIDER.status
 
     global LB_MESSAGE_IDS
     if init_status == "POST_GAME" and new_status == "PRE_GAME":
         dates = get_the_past_week(RANK_PROVIDER.current_game_date)
-        messages = RANK_PROVIDER.formatted_weekly_leaderboard(dates, 20)
+        messages = await run_blocking(RANK_PROVIDER.formatted_weekly_leaderboard, dates, 20)
         await send_channel_messages(messages, LB_CHANNELS)
 
         PLAYERS_MESSAGE_IDS.clear()
         LB_MESSAGE_IDS.clear()
     else:
-        messages = RANK_PROVIDER.formatted_leaderboard(20)
+        messages = await run_blocking(RANK_PROVIDER.formatted_leaderboard, 20)
         messages.append("ET: **{}** , UPDATE EVERY 5 MINS".format(datetime.now(TZ_ET).strftime("%H:%M:%S")))
 
         await update_channel_messages(messages, LB_CHANNELS, LB_MESSAGE_IDS)
 
-        messages = RANK_PROVIDER.formatted_players(20)
+        messages = await run_blocking(RANK_PROVIDER.formatted_players, 20)
         messages.append("ET: **{}** , UPDATE EVERY 5 MINS".format(datetime.now(TZ_ET).strftime("%H:%M:%S")))
         await update_channel_messages(messages, PLAYERS_CHANNELS, PLAYERS_MESSAGE_IDS)
 
 
 @tasks.loop(minutes=2)
 async def update_games():
-    messages = [NBA_PROVIDER.get_scoreboard_message("VIDEO GAME NATION DAILY FANTASY"),
-                "ET: **{}** , UPDATE EVERY 2 MINS".format(datetime.now(TZ_ET).strftime("%H:%M:%S"))]
+    if not await warm_up_providers():
+        return
+
+    try:
+        messages = [NBA_PROVIDER.get_scoreboard_message("VIDEO GAME NATION DAILY FANTASY"),
+                    "ET: **{}** , UPDATE EVERY 2 MINS".format(datetime.now(TZ_ET).strftime("%H:%M:%S"))]
 
-    await update_channel_messages(messages, GAMES_CHANNELS, GAMES_MESSAGE_IDS)
+        await update_channel_messages(messages, GAMES_CHANNELS, GAMES_MESSAGE_IDS)
+    except Exception as err:
+        print(f"Failed to update games: {err}")
+
+
+# 16:00 UTC is noon ET in daylight saving time, 11am otherwise, before any lineup locks
+@tasks.loop(time=time(hour=16, tzinfo=timezone.utc))
+async def sync_collections():
+    try:
+        print(await sync_all_collections())
+    except Exception as err:
+        print(f"Failed to sync collections: {err}")
 
 
 @tasks.loop(minutes=2)